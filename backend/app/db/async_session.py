@@ -0,0 +1,79 @@
+"""Async engines and session factories for FastAPI endpoints.
+
+Same URLs, pool settings and connection setup as app.db.session, with the
+driver swapped for its asyncio counterpart (sqlite -> aiosqlite,
+postgresql -> asyncpg). Endpoints awaiting these sessions give the event
+loop back while the database works instead of holding a threadpool worker.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.db.instrumentation import SQL_STATS, instrument
+from app.db.session import (
+    DATABASE_URL,
+    MAX_OVERFLOW,
+    POOL_RECYCLE,
+    POOL_SIZE,
+    POOL_TIMEOUT,
+    READ_DATABASE_URL,
+    SQLITE_BUSY_TIMEOUT_MS,
+    _set_postgres_read_only,
+    _set_sqlite_pragmas,
+)
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_url(url: str) -> URL:
+    """`url` with the async driver of its backend."""
+    sa_url = make_url(url)
+    backend = sa_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return sa_url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_async_db_engine(url: str = DATABASE_URL, *, read_only: bool = False, **kwargs) -> AsyncEngine:
+    """Async counterpart of app.db.session.create_db_engine()."""
+    sa_url = async_url(url)
+    backend = sa_url.get_backend_name()
+    if backend == "sqlite":
+        engine = create_async_engine(sa_url, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}, **kwargs)
+        # connection events fire on the sync facade of the async engine
+        event.listen(engine.sync_engine, "connect", lambda conn, _record: _set_sqlite_pragmas(conn, read_only))
+        if SQL_STATS:
+            instrument(engine.sync_engine)
+        return engine
+
+    kwargs.setdefault("pool_size", POOL_SIZE)
+    kwargs.setdefault("max_overflow", MAX_OVERFLOW)
+    kwargs.setdefault("pool_recycle", POOL_RECYCLE)
+    kwargs.setdefault("pool_timeout", POOL_TIMEOUT)
+    kwargs.setdefault("pool_pre_ping", True)
+    engine = create_async_engine(sa_url, **kwargs)
+    if read_only:
+        event.listen(engine.sync_engine, "connect", lambda conn, _record: _set_postgres_read_only(conn))
+    if SQL_STATS:
+        instrument(engine.sync_engine)
+    return engine
+
+
+async_engine = create_async_db_engine(DATABASE_URL)
+
+async_read_engine = create_async_db_engine(READ_DATABASE_URL, read_only=True)
+
+# expire_on_commit=False: attributes stay loaded after commit, an async
+# session cannot lazy-load them during response serialization
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
@@ -1,7 +1,10 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.db.async_session import AsyncReadSessionLocal, AsyncSessionLocal
+from app.db.session import ReadSessionLocal, SessionLocal
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -10,3 +13,23 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Session on the read-only engine, for endpoints that never write."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async session on the read-only engine."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,221 @@
+"""Per-statement SQL timing, slow-query log and N+1 detection.
+
+instrument(engine) hooks before/after_cursor_execute. Statements are grouped
+by shape: literals and bound parameters become "?", and IN lists and
+multi-row VALUES collapse to one entry, so "WHERE id IN (?, ?, ?)" and
+"WHERE id IN (?)" count as the same statement. Per shape the process keeps
+the number of executions, total / max time and a latency histogram.
+
+Settings come from the environment:
+
+- SQL_STATS: set to 0 to leave engines created by app.db uninstrumented
+- SLOW_QUERY_MS: statements at least this slow are logged (default 200)
+- N_PLUS_ONE_THRESHOLD: a shape run more often than this inside one
+  transaction is reported as a likely N+1 (default 20; executemany and
+  multi-row INSERT batches are not counted)
+
+run_* jobs print summary() when they finish; the API serves snapshot()
+under /monitoring/sql.
+"""
+
+import bisect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SQL_STATS = os.getenv("SQL_STATS", "1") not in ("0", "false", "no", "")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "20"))
+
+# histogram bucket upper bounds, ms; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+SHAPE_MEMO_SIZE = 10_000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED = re.compile(r"\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+_shapes: dict[str, str] = {}
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with literals, parameters and list lengths folded away."""
+    shape = _shapes.get(statement)
+    if shape is None:
+        shape = _SPACE.sub(" ", statement).strip()
+        shape = _STRING.sub("?", shape)
+        shape = _PARAM.sub("?", shape)
+        shape = _NUMBER.sub("?", shape)
+        shape = _LIST.sub("(?, ...)", shape)
+        shape = _REPEATED.sub("(?, ...), ...", shape)
+        if len(_shapes) < SHAPE_MEMO_SIZE:
+            _shapes[statement] = shape
+    return shape
+
+
+def _new_entry() -> dict:
+    return {
+        "count": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "slow": 0,
+        "n_plus_one": 0,
+        "buckets": [0] * (len(BUCKETS_MS) + 1),
+    }
+
+
+def _percentile_ms(buckets: list[int], count: int, q: float) -> float | None:
+    """Upper bound of the histogram bucket holding the q-quantile."""
+    if not count:
+        return None
+    rank, seen = q * count, 0
+    for bound, n in zip((*BUCKETS_MS, None), buckets):
+        seen += n
+        if seen >= rank:
+            return float(bound) if bound is not None else None
+    return None
+
+
+class QueryStats:
+    """Process-wide per-shape statement statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+
+    def record(self, shape: str, elapsed_ms: float, *, slow: bool = False) -> None:
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                entry = self._entries[shape] = _new_entry()
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["slow"] += slow
+            entry["buckets"][bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def record_n_plus_one(self, shape: str) -> None:
+        with self._lock:
+            self._entries.setdefault(shape, _new_entry())["n_plus_one"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self, top: int | None = None, sort: str = "total_ms") -> list[dict]:
+        """Per-shape stats, largest `sort` value first."""
+        with self._lock:
+            entries = [(shape, dict(entry, buckets=list(entry["buckets"]))) for shape, entry in self._entries.items()]
+        rows = []
+        for shape, entry in entries:
+            count = entry["count"]
+            rows.append(
+                {
+                    "statement": shape,
+                    "count": count,
+                    "total_ms": round(entry["total_ms"], 3),
+                    "avg_ms": round(entry["total_ms"] / count, 3) if count else None,
+                    "max_ms": round(entry["max_ms"], 3),
+                    "p50_ms": _percentile_ms(entry["buckets"], count, 0.5),
+                    "p95_ms": _percentile_ms(entry["buckets"], count, 0.95),
+                    "slow": entry["slow"],
+                    "n_plus_one": entry["n_plus_one"],
+                    "histogram": dict(zip([*(f"<={b}" for b in BUCKETS_MS), f">{BUCKETS_MS[-1]}"], entry["buckets"])),
+                }
+            )
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:top] if top is not None else rows
+
+    def totals(self) -> dict:
+        rows = self.snapshot()
+        return {
+            "statements": len(rows),
+            "executions": sum(r["count"] for r in rows),
+            "total_ms": round(sum(r["total_ms"] for r in rows), 3),
+            "slow": sum(r["slow"] for r in rows),
+            "n_plus_one": sum(r["n_plus_one"] for r in rows),
+        }
+
+    def summary(self, top: int = 10, width: int = 120) -> str:
+        """Plain-text report: totals, the top statements by time, and N+1 suspects."""
+        totals = self.totals()
+        lines = [
+            f"SQL: {totals['executions']} executions of {totals['statements']} statements, "
+            f"{totals['total_ms'] / 1000:.2f}s total, {totals['slow']} slow (>= {SLOW_QUERY_MS:g} ms)"
+        ]
+        for row in self.snapshot(top):
+            lines.append(
+                f"  {row['total_ms']:>10.1f} ms  {row['count']:>7}x  max {row['max_ms']:.1f} ms  "
+                f"{row['statement'][:width]}"
+            )
+        suspects = [row for row in self.snapshot(sort="n_plus_one") if row["n_plus_one"]]
+        if suspects:
+            lines.append(f"Possible N+1 (> {N_PLUS_ONE_THRESHOLD} runs in one transaction):")
+            for row in suspects:
+                lines.append(f"  {row['n_plus_one']:>4} transactions  {row['count']:>7}x  {row['statement'][:width]}")
+        return "\n".join(lines)
+
+
+query_stats = QueryStats()
+
+
+def _begin(conn) -> None:
+    conn.info["sql_unit"] = Counter()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("sql_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed_ms = (time.perf_counter() - conn.info["sql_started"].pop()) * 1000
+    shape = statement_shape(statement)
+    slow = elapsed_ms >= SLOW_QUERY_MS
+    if slow:
+        logger.warning("slow query (%.1f ms): %s", elapsed_ms, _SPACE.sub(" ", statement)[:2000])
+    query_stats.record(shape, elapsed_ms, slow=slow)
+
+    # batched writes repeat by design
+    if executemany or "VALUES (?, ...), ..." in shape:
+        return
+    unit = conn.info.setdefault("sql_unit", Counter())
+    unit[shape] += 1
+    if unit[shape] == N_PLUS_ONE_THRESHOLD + 1:
+        query_stats.record_n_plus_one(shape)
+        logger.warning("possible N+1: ran more than %d times in one transaction: %s", N_PLUS_ONE_THRESHOLD, shape[:500])
+
+
+def _handle_error(context) -> None:
+    started = context.connection.info.get("sql_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument(engine) -> None:
+    """Attach the timing hooks to `engine` (a sync Engine; pass async engines' .sync_engine)."""
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "begin", _begin)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def print_sql_summary(top: int = 10, file=sys.stdout) -> None:
+    """Print the summary at the end of a run_* job, if anything was recorded."""
+    if query_stats.totals()["executions"]:
+        print(query_stats.summary(top), file=file)
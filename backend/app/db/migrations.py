@@ -0,0 +1,164 @@
+"""Versioned runner for the SQL files in backend/migrations.
+
+Each NNNN_name.sql file is one version. Applied versions are recorded in
+schema_migrations (version, name, checksum, applied_at) and never run again,
+so the runner can be called on every startup and from the CLI:
+
+    python -m app.db.migrations            # apply pending migrations
+    python -m app.db.migrations --status   # list applied / pending
+
+Statements run one by one. ALTER TABLE ... ADD COLUMN for a column that
+already exists is skipped, so databases that had migrations applied by hand
+before the tracking table existed are adopted without errors.
+
+The SQL files are written for SQLite (INTEGER PRIMARY KEY tables, scalar
+min()/max(), ...). On any other dialect the runner applies nothing and logs
+it; those databases get their tables from Base.metadata.create_all().
+"""
+
+import argparse
+import hashlib
+import logging
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, insert, select
+
+from app.db.session import DATABASE_URL, create_db_engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# dialects the SQL in MIGRATIONS_DIR is written for
+MIGRATION_DIALECTS = ("sqlite",)
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(20), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("checksum", String(64), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+_ADD_COLUMN = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(?:COLUMN\s+)?(\w+)", re.IGNORECASE)
+
+
+def migration_files(directory: Path = MIGRATIONS_DIR) -> list[tuple[str, Path]]:
+    """(version, path) of every migration, in version order."""
+    files = []
+    for path in sorted(directory.glob("*.sql")):
+        version, sep, _ = path.stem.partition("_")
+        if not sep or not version.isdigit():
+            raise ValueError(f"Migration file name must look like NNNN_name.sql: {path.name}")
+        files.append((version, path))
+    return files
+
+
+def split_statements(script: str) -> list[str]:
+    """Split a SQL script into complete statements (semicolons in strings are safe)."""
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if re.sub(r"--[^\n]*", "", statement).strip(" ;\n"):
+                statements.append(statement)
+            buffer = ""
+    if buffer.strip() and re.sub(r"--[^\n]*", "", buffer).strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def _checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def applied_versions(conn) -> dict[str, str]:
+    """{version: checksum} of applied migrations."""
+    schema_migrations.create(conn, checkfirst=True)
+    return dict(conn.execute(select(schema_migrations.c.version, schema_migrations.c.checksum)).all())
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return False
+    return any(c["name"] == column for c in inspector.get_columns(table))
+
+
+def _apply(conn, version: str, path: Path) -> None:
+    for statement in split_statements(path.read_text(encoding="utf-8")):
+        match = _ADD_COLUMN.match(re.sub(r"--[^\n]*\n", "", statement))
+        if match and _column_exists(conn, *match.groups()):
+            logger.info("migration %s: %s.%s already exists, skipped", version, *match.groups())
+            continue
+        conn.exec_driver_sql(statement)
+    conn.execute(
+        insert(schema_migrations).values(
+            version=version,
+            name=path.stem,
+            checksum=_checksum(path),
+            applied_at=datetime.utcnow(),
+        )
+    )
+
+
+def apply_migrations(engine=None, directory: Path = MIGRATIONS_DIR) -> list[str]:
+    """Apply pending migrations in order; returns the versions applied now.
+
+    Each migration runs in its own transaction and is recorded with it.
+    Applied files whose contents changed since are reported, not re-run.
+    Dialects outside MIGRATION_DIALECTS are left untouched.
+    """
+    engine = engine if engine is not None else create_db_engine(DATABASE_URL)
+    if engine.dialect.name not in MIGRATION_DIALECTS:
+        logger.warning("SQL migrations are SQLite-only; skipped on %s", engine.dialect.name)
+        return []
+    applied_now = []
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    for version, path in migration_files(directory):
+        if version in applied:
+            if applied[version] != _checksum(path):
+                logger.warning("migration %s changed after it was applied; not re-run", path.name)
+            continue
+        with engine.begin() as conn:
+            _apply(conn, version, path)
+        logger.info("applied migration %s", path.name)
+        applied_now.append(version)
+    return applied_now
+
+
+def migration_status(engine, directory: Path = MIGRATIONS_DIR) -> list[tuple[str, str, bool]]:
+    """(version, file name, applied) for every migration file."""
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [(version, path.name, version in applied) for version, path in migration_files(directory)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending SQL migrations.")
+    parser.add_argument("--db", default=DATABASE_URL, help="database URL (default: DATABASE_URL)")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    engine = create_db_engine(args.db)
+    if engine.dialect.name not in MIGRATION_DIALECTS:
+        parser.error(f"migrations are written for {', '.join(MIGRATION_DIALECTS)}, not {engine.dialect.name}")
+    if args.status:
+        for version, name, applied in migration_status(engine):
+            print(f"{'applied' if applied else 'pending'}  {name}")
+        return
+    applied = apply_migrations(engine)
+    print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(applied)}" if applied else ""))
+
+
+if __name__ == "__main__":
+    main()
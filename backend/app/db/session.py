@@ -1,15 +1,119 @@
-from sqlalchemy import create_engine
+"""Database engines and session factories.
+
+Settings come from the environment (or .env):
+
+- DATABASE_URL: read-write database, default sqlite:///./app.db
+- READ_DATABASE_URL: optional separate database for reads (e.g. a Postgres
+  replica); defaults to DATABASE_URL
+- DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT: server
+  database pool settings
+- SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_KB, SQLITE_MMAP_BYTES: SQLite tuning
+
+SQLite files are switched to WAL on connect, so readers see the last commit
+instead of waiting on a batch job's write lock. `engine`/`SessionLocal`
+write; `read_engine`/`ReadSessionLocal` connections are read-only.
+"""
+
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./app.db"
+from app.db.instrumentation import SQL_STATS, instrument
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL") or DATABASE_URL
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# seconds; recycled before server-side idle timeouts drop the connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # durable at checkpoints; a crash can lose the last commits, never corrupt
+    "synchronous": "NORMAL",
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    # negative cache_size is in KiB
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+
+def _set_sqlite_pragmas(dbapi_connection, read_only: bool) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _set_postgres_read_only(dbapi_connection) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+    finally:
+        cursor.close()
+    dbapi_connection.commit()
+
+
+def create_db_engine(url: str = DATABASE_URL, *, read_only: bool = False, **kwargs) -> Engine:
+    """Engine for `url` with this project's pool and connection settings.
+
+    SQLite gets the WAL pragmas on every new connection; server databases get
+    a sized pool with pre-ping and recycling. read_only engines refuse writes
+    at the connection level. Statements are timed unless SQL_STATS=0.
+    """
+    sa_url = make_url(url)
+    backend = sa_url.get_backend_name()
+    if backend == "sqlite":
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        engine = create_engine(sa_url, connect_args=connect_args, **kwargs)
+        event.listen(engine, "connect", lambda conn, _record: _set_sqlite_pragmas(conn, read_only))
+        if SQL_STATS:
+            instrument(engine)
+        return engine
+
+    kwargs.setdefault("pool_size", POOL_SIZE)
+    kwargs.setdefault("max_overflow", MAX_OVERFLOW)
+    kwargs.setdefault("pool_recycle", POOL_RECYCLE)
+    kwargs.setdefault("pool_timeout", POOL_TIMEOUT)
+    kwargs.setdefault("pool_pre_ping", True)
+    engine = create_engine(sa_url, **kwargs)
+    if read_only and backend == "postgresql":
+        event.listen(engine, "connect", lambda conn, _record: _set_postgres_read_only(conn))
+    if SQL_STATS:
+        instrument(engine)
+    return engine
+
+
+engine = create_db_engine(DATABASE_URL)
+
+read_engine = create_db_engine(READ_DATABASE_URL, read_only=True)
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
 )
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine,
+)
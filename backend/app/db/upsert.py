@@ -0,0 +1,195 @@
+"""Batched upserts for the ingest paths.
+
+Instead of one SELECT per item followed by an INSERT or UPDATE, rows are
+sent in batches as a single multi-row
+
+    INSERT ... ON CONFLICT (key) DO UPDATE SET ... [WHERE ...]
+
+per batch (SQLite >= 3.24 and PostgreSQL), so round trips grow with the
+number of batches, not rows. The conflict key must be backed by a unique
+constraint or index. How each non-key column is merged into an existing row
+is a per-column rule:
+
+- OVERWRITE: take the incoming value (the default)
+- IF_NOT_EMPTY: take the incoming value unless it is NULL or ''
+- KEEP: never change the stored value
+- a callable (existing, incoming) -> SQL expression, over the target table's
+  columns and the excluded (incoming) row's columns
+
+Counts are derived from one extra key lookup per batch: rows whose key
+already existed and were changed are "updated", new keys are "inserted".
+"""
+
+from collections.abc import Callable, Iterable, Sequence
+
+from sqlalchemy import String, Table, and_, case, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+OVERWRITE = "overwrite"
+
+IF_NOT_EMPTY = "if_not_empty"
+
+KEEP = "keep"
+
+RULES = (OVERWRITE, IF_NOT_EMPTY, KEEP)
+
+DEFAULT_BATCH_SIZE = 500
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _dialect_insert(db, table: Table):
+    name = db.get_bind().dialect.name
+    if name not in _INSERTS:
+        raise NotImplementedError(f"bulk upsert is not supported on '{name}'")
+    return _INSERTS[name](table)
+
+
+def _batches(rows: Sequence[dict], size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _dedupe(rows: Iterable[dict], key: Sequence[str], keep: str = "last") -> list[dict]:
+    """One row per key (a statement may touch a row only once)."""
+    by_key = {}
+    for row in rows:
+        value = tuple(row[k] for k in key)
+        if keep == "last" or value not in by_key:
+            by_key[value] = row
+    return list(by_key.values())
+
+
+def key_condition(table: Table, key: Sequence[str], values: Iterable[tuple]):
+    """WHERE clause matching rows whose `key` columns equal any of `values`.
+
+    NULLs in a key are matched with IS NULL, like an equality filter built by
+    hand would be.
+    """
+    groups: dict[tuple[bool, ...], list[tuple]] = {}
+    for value in values:
+        nulls = tuple(v is None for v in value)
+        groups.setdefault(nulls, []).append(value)
+
+    conditions = []
+    for nulls, group in groups.items():
+        present = [k for k, is_null in zip(key, nulls) if not is_null]
+        parts = [table.c[k].is_(None) for k, is_null in zip(key, nulls) if is_null]
+        if present:
+            cols = [table.c[k] for k in present]
+            picked = [tuple(v for v, is_null in zip(value, nulls) if not is_null) for value in group]
+            if len(cols) == 1:
+                parts.append(cols[0].in_([p[0] for p in picked]))
+            else:
+                parts.append(tuple_(*cols).in_(picked))
+        conditions.append(and_(*parts))
+    return or_(*conditions)
+
+
+def existing_keys(db, table: Table, key: Sequence[str], rows: Sequence[dict]) -> set[tuple]:
+    """Keys of `rows` that are already stored, in one query."""
+    values = {tuple(row[k] for k in key) for row in rows}
+    if not values:
+        return set()
+    stmt = select(*(table.c[k] for k in key)).where(key_condition(table, key, values))
+    return {tuple(found) for found in db.execute(stmt)}
+
+
+def provided(incoming):
+    """True where an incoming column holds a value: not NULL, and not '' for strings."""
+    if isinstance(incoming.type, String):
+        return and_(incoming.isnot(None), incoming != "")
+    return incoming.isnot(None)
+
+
+def _merge(rule, column: str, existing, incoming):
+    if callable(rule):
+        return rule(existing, incoming)
+    existing, incoming = existing[column], incoming[column]
+    if rule == OVERWRITE:
+        return incoming
+    if rule == IF_NOT_EMPTY:
+        return case((provided(incoming), incoming), else_=existing)
+    raise ValueError(f"Unknown merge rule '{rule}', expected one of: {', '.join(RULES)} or a callable")
+
+
+def bulk_upsert(
+    db,
+    table: Table,
+    rows: Iterable[dict],
+    key: Sequence[str],
+    *,
+    rules: dict[str, str | Callable] | None = None,
+    default_rule: str = OVERWRITE,
+    where: Callable | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, int]:
+    """Insert `rows` into `table`, merging into existing rows on `key` conflicts.
+
+    All rows must have the same columns. `rules` maps column -> merge rule for
+    existing rows (columns not listed use `default_rule`); `where(existing,
+    incoming)` optionally restricts which conflicting rows are updated at all.
+    Returns {"inserted", "updated", "unchanged"}.
+    """
+    if hasattr(table, "__table__"):
+        table = table.__table__
+    rules = rules or {}
+    rows = _dedupe(rows, key)
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+
+    columns = [c for c in rows[0] if c not in key]
+    for batch in _batches(rows, batch_size):
+        stmt = _dialect_insert(db, table).values(batch)
+        incoming = stmt.excluded
+        set_ = {
+            column: _merge(rules.get(column, default_rule), column, table.c, incoming)
+            for column in columns
+            if rules.get(column, default_rule) != KEEP
+        }
+        if set_:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[k] for k in key],
+                set_=set_,
+                where=where(table.c, incoming) if where is not None else None,
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c[k] for k in key])
+
+        existed = len(existing_keys(db, table, key, batch))
+        # rowcount covers inserted rows plus updated ones
+        changed = db.execute(stmt).rowcount
+        inserted = len(batch) - existed
+        counts["inserted"] += inserted
+        counts["updated"] += changed - inserted
+        counts["unchanged"] += existed - (changed - inserted)
+    return counts
+
+
+def get_or_create_ids(
+    db,
+    table: Table,
+    rows: Iterable[dict],
+    key: Sequence[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[tuple, int]:
+    """Ensure a row exists for each key and return {key tuple: id}.
+
+    Missing rows are inserted as given, the first row per key winning;
+    existing ones are left alone. The ids of the whole batch are then read
+    back: two statements per batch.
+    """
+    if hasattr(table, "__table__"):
+        table = table.__table__
+    rows = _dedupe(rows, key, keep="first")
+    ids: dict[tuple, int] = {}
+    for batch in _batches(rows, batch_size):
+        stmt = _dialect_insert(db, table).values(batch)
+        db.execute(stmt.on_conflict_do_nothing(index_elements=[table.c[k] for k in key]))
+        values = [tuple(row[k] for k in key) for row in batch]
+        found = select(table.c.id, *(table.c[k] for k in key)).where(key_condition(table, key, values))
+        for row_id, *value in db.execute(found):
+            ids[tuple(value)] = row_id
+    return ids
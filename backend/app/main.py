@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 
 from .router import api_router
 from .db.base import Base
+from .db.migrations import apply_migrations
 from .db.session import engine
 from .modules.companies.models import Company  # noqa: F401
 
@@ -18,6 +19,7 @@ app = FastAPI(
 
 @app.on_event("startup")
 def on_startup() -> None:
+    apply_migrations(engine)
     Base.metadata.create_all(bind=engine)
 
 
@@ -1,13 +1,19 @@
 from typing import List
 
 from app.modules.ai.langgraph.state import GraphState
+from app.modules.regions.aliases import alias_key, load_region_aliases
 
 
 def _match_regions(question: str, region_names: List[str]) -> List[str]:
+    aliases = load_region_aliases()
+    mentioned = {alias_key(name) for name in aliases.mentions(question)}
     q = question.lower()
     matches = []
     for name in region_names:
-        if isinstance(name, str) and name.lower() in q:
+        if not isinstance(name, str):
+            continue
+        # names the alias index does not know still match verbatim
+        if aliases.key(name) in mentioned or name.lower() in q:
             matches.append(name)
     return list(dict.fromkeys(matches))  # dedupe preserve order
 
@@ -1,7 +1,7 @@
 import json
 from pathlib import Path
 
-import pandas as pd
+from app.modules.analytics.parquet_store import read_frame
 
 
 BASE_DIR = Path(__file__).resolve().parents[4] / "data" / "analytics"
@@ -10,12 +10,16 @@ BASE_DIR = Path(__file__).resolve().parents[4] / "data" / "analytics"
 def load_analytics() -> dict:
     """Load precomputed analytics outputs without any transformations."""
     overview = json.loads((BASE_DIR / "overview_metrics.json").read_text(encoding="utf-8"))
-    regions = pd.read_csv(BASE_DIR / "region_summary.csv").to_dict(orient="records")
-    categories = pd.read_csv(BASE_DIR / "category_summary.csv").to_dict(orient="records")
-    prices = pd.read_csv(BASE_DIR / "price_distribution.csv").to_dict(orient="records")
+    regions = read_frame(BASE_DIR / "region_summary").to_dict(orient="records")
+    categories = read_frame(BASE_DIR / "category_summary").to_dict(orient="records")
+    prices = read_frame(BASE_DIR / "price_distribution").to_dict(orient="records")
+    # histogram output is newer than the other files; older exports may lack it
+    histogram_path = BASE_DIR / "price_histogram"
+    histogram = read_frame(histogram_path).to_dict(orient="records") if histogram_path.with_suffix(".csv").exists() else []
     return {
         "overview": overview,
         "regions": regions,
         "categories": categories,
         "prices": prices,
+        "price_histogram": histogram,
     }
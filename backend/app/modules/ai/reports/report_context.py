@@ -2,6 +2,7 @@ from typing import Any, Dict, List, Optional
 
 from app.modules.ai.loaders.analytics_loader import load_analytics
 from app.modules.ai.reports.report_types import ReportRequest, ReportType
+from app.modules.regions.aliases import load_region_aliases
 
 
 def _normalize_region(value: Any) -> str:
@@ -12,12 +13,6 @@ def _normalize_region(value: Any) -> str:
     return ""
 
 
-def _match_region_name(name: Any, target: str) -> bool:
-    if not isinstance(name, (str, int)):
-        return False
-    return _normalize_region(name).lower() == target.lower()
-
-
 def build_context(req: ReportRequest) -> Dict[str, Any]:
     data = load_analytics()
     ctx: Dict[str, Any] = {"type": req.type.value, "lang": req.lang}
@@ -31,14 +26,19 @@ def build_context(req: ReportRequest) -> Dict[str, Any]:
     if req.type == ReportType.REGION_COMPARISON:
         if not req.regions or len(req.regions) < 2:
             raise ValueError("region_comparison requires at least two regions")
+        aliases = load_region_aliases()
         requested = [_normalize_region(r) for r in req.regions]
+        wanted = {aliases.key(r) for r in requested}
         regions = data.get("regions") or []
         matched: List[Dict[str, Any]] = []
+        found = set()
         for region in regions:
             name = region.get("region") if isinstance(region, dict) else None
-            if any(_match_region_name(name, target) for target in requested):
+            key = aliases.key(_normalize_region(name))
+            if key in wanted:
                 matched.append(region)
-        missing = [r for r in requested if not any(_match_region_name(m.get("region"), r) for m in matched if isinstance(m, dict))]
+                found.add(key)
+        missing = [r for r in requested if aliases.key(r) not in found]
         if missing:
             raise ValueError(f"Regions not found: {', '.join(missing)}")
         ctx["regions"] = matched
@@ -0,0 +1,115 @@
+"""Single-scan aggregation over market_snapshot.
+
+The snapshot is filtered once (a boolean mask, no frame copy) and grouped once
+at the finest grain needed by all requested metrics. Coarser groupings and the
+overview are rolled up from that small table instead of rescanning the rows.
+"""
+
+import pandas as pd
+
+# Named groupings available out of the box; callers can pass more.
+GROUPINGS: dict[str, list[str]] = {
+    "by_region": ["region", "region_code"],
+    "by_category": ["category"],
+}
+
+DEFAULT_METRICS = ["overview", "by_region", "by_category", "price_distribution"]
+
+DISTRIBUTION_COLUMNS = ["region", "category", "price_value"]
+
+# Unit-price columns averaged alongside price_value when the frame has them.
+UNIT_PRICE_COLUMNS = {"price_per_l": "avg_price_per_l", "price_per_kg": "avg_price_per_kg"}
+
+
+def _rollup(fine: pd.DataFrame, keys: list[str], units: list[str]) -> pd.DataFrame:
+    aggs = {
+        "product_count": ("count", "sum"),
+        "_sum": ("sum", "sum"),
+        "min_price": ("min", "min"),
+        "max_price": ("max", "max"),
+    }
+    for col in units:
+        aggs[f"_{col}_count"] = (f"{col}_count", "sum")
+        aggs[f"_{col}_sum"] = (f"{col}_sum", "sum")
+    grouped = fine.groupby(keys, dropna=False, observed=True).agg(**aggs).reset_index()
+    grouped.insert(len(keys) + 1, "avg_price", grouped["_sum"] / grouped["product_count"])
+    for col in units:
+        # unit prices only exist for rows with a known pack size, so they have their own count
+        counts = grouped[f"_{col}_count"]
+        grouped[UNIT_PRICE_COLUMNS[col]] = (grouped[f"_{col}_sum"] / counts).where(counts > 0)
+    grouped.drop(columns=[c for c in grouped.columns if c.startswith("_")], inplace=True)
+    grouped["product_count"] = grouped["product_count"].astype("int64")
+    return grouped
+
+
+def _overview(fine: pd.DataFrame) -> dict:
+    total = int(fine["count"].sum())
+    if not total:
+        return {
+            "total_products": 0,
+            "distinct_regions": 0,
+            "distinct_categories": 0,
+            "avg_price": None,
+            "min_price": None,
+            "max_price": None,
+        }
+    return {
+        "total_products": total,
+        "distinct_regions": int(fine["region"].dropna().nunique()),
+        "distinct_categories": int(fine["category"].dropna().nunique()),
+        "avg_price": float(fine["sum"].sum() / total),
+        "min_price": float(fine["min"].min()),
+        "max_price": float(fine["max"].max()),
+    }
+
+
+def compute_metrics(
+    df: pd.DataFrame,
+    metrics: list[str] | None = None,
+    groupings: dict[str, list[str]] | None = None,
+) -> dict:
+    """Compute the requested metrics in one pass over priced rows.
+
+    `metrics` names entries of GROUPINGS/`groupings` plus "overview" and
+    "price_distribution". Results have the same shapes as the functions in
+    aggregations.py: a dict for the overview, DataFrames otherwise. Groupings
+    gain avg_price_per_l / avg_price_per_kg when `df` has the unit-price columns.
+    """
+    metrics = metrics or DEFAULT_METRICS
+    all_groupings = {**GROUPINGS, **(groupings or {})}
+    unknown = [m for m in metrics if m not in all_groupings and m not in ("overview", "price_distribution")]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+
+    mask = df["price_value"].notna()
+    results: dict = {}
+
+    fine_keys: list[str] = []
+    if "overview" in metrics:
+        fine_keys += ["region", "category"]
+    for name in metrics:
+        for key in all_groupings.get(name, []):
+            if key not in fine_keys:
+                fine_keys.append(key)
+
+    if fine_keys:
+        units = [col for col in UNIT_PRICE_COLUMNS if col in df.columns]
+        # accumulate in float64 even when the columns were downcast on load
+        values = pd.DataFrame({col: df[col][mask].astype("float64") for col in ["price_value", *units]})
+        keys = [df[k][mask] for k in fine_keys]
+        grouped = values.groupby(keys, dropna=False, observed=True).agg(
+            {"price_value": ["count", "sum", "min", "max"], **{col: ["count", "sum"] for col in units}}
+        )
+        grouped.columns = [fn if col == "price_value" else f"{col}_{fn}" for col, fn in grouped.columns]
+        fine = grouped.reset_index()
+
+        for name in metrics:
+            if name in all_groupings:
+                results[name] = _rollup(fine, all_groupings[name], units)
+        if "overview" in metrics:
+            results["overview"] = _overview(fine)
+
+    if "price_distribution" in metrics:
+        results["price_distribution"] = df.loc[mask, DISTRIBUTION_COLUMNS]
+
+    return results
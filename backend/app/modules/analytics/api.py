@@ -0,0 +1,101 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from sqlalchemy.exc import OperationalError
+
+from app.modules.analytics import payloads
+from app.modules.analytics.plots import plot_cache
+from app.modules.analytics.plots.plot_registry import PLOTS
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Clients may reuse a response but must revalidate it; revalidation is a cheap 304.
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _serve(name: str, request: Request) -> Response:
+    try:
+        etag, body = payloads.get_payload(name)
+    except OperationalError:
+        raise HTTPException(status_code=503, detail="market_snapshot is not built yet")
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/overview")
+def overview(request: Request) -> Response:
+    return _serve("overview", request)
+
+
+@router.get("/regions")
+def regions(request: Request) -> Response:
+    return _serve("regions", request)
+
+
+@router.get("/categories")
+def categories(request: Request) -> Response:
+    return _serve("categories", request)
+
+
+@router.get("/brands")
+def brands(request: Request) -> Response:
+    return _serve("brands", request)
+
+
+@router.get("/price-distribution")
+def price_distribution(request: Request) -> Response:
+    return _serve("price-distribution", request)
+
+
+@router.get("/plots/{name}")
+def plot(
+    name: str,
+    request: Request,
+    metric: str | None = None,
+    regions: list[str] | None = Query(None),
+    categories: list[str] | None = Query(None),
+    category: str | None = None,
+    region: str | None = None,
+    max_points: int | None = Query(None, ge=3, le=20000),
+    x_min: float | None = None,
+    x_max: float | None = None,
+) -> Response:
+    """Plotly figure JSON for a registered plot, rendered with the given filters.
+
+    Line plots are downsampled to `max_points` per series; pass the zoomed
+    x_min/x_max range to get full detail for it.
+    """
+    if name not in PLOTS:
+        raise HTTPException(status_code=404, detail=f"Unknown plot: {name}")
+    params = {
+        "metric": metric,
+        "regions": regions,
+        "categories": categories,
+        "category": category,
+        "region": region,
+        "max_points": max_points,
+        "x_min": x_min,
+        "x_max": x_max,
+    }
+    try:
+        key, params = plot_cache.plot_key(name, params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="analytics exports are not built yet")
+
+    # the key already identifies the figure, so revalidation never renders
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    _, body = plot_cache.get_plot(name, params)
+    return Response(content=body, media_type="application/json", headers=headers)
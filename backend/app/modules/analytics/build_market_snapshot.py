@@ -1,164 +1,576 @@
-import re
-import csv
-from pathlib import Path
+import argparse
+import math
+import time
 from collections import defaultdict
 from datetime import datetime
-import logging
 
-from sqlalchemy import delete, insert, select, join, func
+import numpy as np
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    join,
+    or_,
+    select,
+    update,
+)
 
 from app.db.session import SessionLocal
-from app.modules.analytics.models import market_snapshot
+from app.modules.analytics.export_market_snapshot_parquet import export_snapshot
+from app.modules.analytics.models import market_snapshot, snapshot_build_state, snapshot_region_counts
+from app.modules.analytics.parquet_store import SNAPSHOT_DIR, parquet_available
+from app.modules.analytics.snapshot_versions import (
+    create_shadow_table,
+    discard,
+    rollback,
+    swap_in,
+    update_active_row_count,
+)
 from app.modules.retail.parsed_models import retail_products_parsed
 from app.modules.retail.writer import retail_offers
 from app.modules.companies.models_discovered import CompanyDiscovered
-from app.modules.regions.models import Region
+from app.modules.regions.aliases import load_region_aliases
 
+DEFAULT_BATCH_SIZE = 5000
 
-def normalize_name(value) -> str | None:
-    if value is None:
-        return None
-    s = str(value).strip()
-    if not s:
-        return None
-    s = re.sub(r"\s+", " ", s)
-    return s
-
-
-def load_lr_map():
-    """Load lr_code -> region_name map from CSV if present."""
-    path = Path(__file__).resolve().parents[3] / "data" / "region_lr_map.csv"
-    if not path.exists():
-        logging.getLogger(__name__).info(
-            "region_lr_map.csv not found; numeric region codes will remain as region_code and region_name set to UNKNOWN"
-        )
-        return {}
-    code_to_name = {}
-    with path.open(encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            code = str(row.get("lr_code")).strip()
-            name = normalize_name(row.get("region_name"))
-            if not code or not code.isdigit() or not name:
-                continue
-            code_to_name[code] = name
-    # NOTE:
-    # region_lr_map.csv is generated from official Yandex Market geo source.
-    # This file is the ONLY allowed source for lr_code -> region_name mapping.
-    return code_to_name
-
-
-def build_region_maps(db):
-    code_to_name = load_lr_map()
-    name_to_code = {v.lower(): k for k, v in code_to_name.items()}
-
-    # keep region names from Region table for completeness (name lookup only)
-    stmt = select(Region.name)
-    for (name,) in db.execute(stmt):
-        norm_name = normalize_name(name)
-        if norm_name and norm_name.lower() not in name_to_code:
-            # no code, but allows name lookup
-            name_to_code[norm_name.lower()] = None
-    return code_to_name, name_to_code
-
-
-def resolve_region(value, code_to_name, name_to_code):
-    if value is None:
-        return None, None
-    raw = str(value).strip()
-    if not raw:
-        return None, None
-    # numeric code
-    if raw.isdigit():
-        if raw in code_to_name:
-            name = code_to_name[raw]
-            return name, raw
-        # keep numeric as both name and code to avoid UNKNOWN
-        return raw, raw
-    norm = normalize_name(raw)
-    if not norm:
-        return None, None
-    code = name_to_code.get(norm.lower())
-    return norm, code
-
-
-def build_company_counts(db) -> dict[str, int]:
+
+def company_region_column():
+    """Nearest-centre region when assigned, else the 2GIS search region."""
+    return func.coalesce(CompanyDiscovered.assigned_region, CompanyDiscovered.region)
+
+
+def build_company_counts(db, regions) -> dict[str, int]:
+    """Companies per canonical region name, whatever spelling 2GIS or the region table used."""
     counts = defaultdict(int)
-    stmt = select(CompanyDiscovered.region, func.count(func.distinct(CompanyDiscovered.id)))
-    stmt = stmt.group_by(CompanyDiscovered.region)
+    region = company_region_column()
+    stmt = select(region, func.count(func.distinct(CompanyDiscovered.id)))
+    stmt = stmt.group_by(region)
     for region, cnt in db.execute(stmt):
-        norm = normalize_name(region)
-        if norm:
-            counts[norm] += cnt
+        name = regions.canonical(region)
+        if name:
+            counts[name] += cnt
     return counts
 
 
-def main() -> None:
-    with SessionLocal() as db:
-        # rebuild snapshot: delete all rows
-        db.execute(delete(market_snapshot))
-
-        code_to_name, name_to_code = build_region_maps(db)
-        company_counts = build_company_counts(db)
-
-        j = join(retail_products_parsed, retail_offers, retail_products_parsed.c.retail_offer_id == retail_offers.c.id)
-        stmt = select(
-            retail_products_parsed.c.raw_name.label("product_name"),
-            retail_products_parsed.c.brand.label("brand_name"),
-            retail_products_parsed.c.product_type.label("category"),
-            retail_offers.c.price_value,
-            retail_offers.c.price_currency,
-            retail_products_parsed.c.region,
-            retail_products_parsed.c.parsed_at,
-        ).select_from(j)
-
-        rows = db.execute(stmt).mappings().all()
-
-        to_insert = []
-        unresolved_numeric = 0
-        for row in rows:
-            region_name, reg_code = resolve_region(row.get("region"), code_to_name, name_to_code)
-            if reg_code and reg_code.isdigit() and reg_code not in code_to_name:
-                unresolved_numeric += 1
-            count = company_counts.get(region_name, 0) if region_name else 0
-            collected_at = row.get("parsed_at") or datetime.utcnow()
-            to_insert.append(
-                {
-                    "product_name": row.get("product_name"),
-                    "brand_name": row.get("brand_name"),
-                    "category": row.get("category"),
-                    "price_value": row.get("price_value"),
-                    "price_currency": row.get("price_currency"),
-                    "region": region_name,
-                    "region_code": reg_code,
-                    "companies_count_region": count,
-                    "collected_at": collected_at.isoformat() if hasattr(collected_at, "isoformat") else str(collected_at),
-                }
-            )
+def select_snapshot_source():
+    j = join(retail_products_parsed, retail_offers, retail_products_parsed.c.retail_offer_id == retail_offers.c.id)
+    return select(
+        retail_products_parsed.c.id.label("source_parsed_id"),
+        retail_products_parsed.c.retail_offer_id,
+        retail_products_parsed.c.raw_name.label("product_name"),
+        retail_products_parsed.c.brand.label("brand_name"),
+        retail_products_parsed.c.product_type.label("category"),
+        retail_offers.c.price_value,
+        retail_offers.c.price_currency,
+        retail_products_parsed.c.region,
+        retail_products_parsed.c.parsed_at,
+        retail_products_parsed.c.weight_g,
+        retail_products_parsed.c.volume_ml,
+    ).select_from(j)
 
+
+def unit_prices(price, weight_g, volume_ml) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized (price_per_l, price_per_kg); NaN where the pack size is unknown."""
+    price = np.asarray(price, dtype="float64")
+    weight = np.asarray(weight_g, dtype="float64")
+    volume = np.asarray(volume_ml, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_l = np.where(volume > 0, price * 1000.0 / volume, np.nan)
+        per_kg = np.where(weight > 0, price * 1000.0 / weight, np.nan)
+    return per_l, per_kg
+
+
+def _unit_price_sql(price, size):
+    return case((size > 0, price * 1000.0 / size), else_=None)
+
+
+def to_snapshot_row(row, regions, company_counts) -> dict:
+    region_name, reg_code = regions.resolve(row.get("region"))
+    count = company_counts.get(region_name, 0) if region_name else 0
+    collected_at = row.get("parsed_at") or datetime.utcnow()
+    return {
+        "product_name": row.get("product_name"),
+        "brand_name": row.get("brand_name"),
+        "category": row.get("category"),
+        "price_value": row.get("price_value"),
+        "price_currency": row.get("price_currency"),
         # ensure region is string and not null
-        for r in to_insert:
-            r["region"] = str(r["region"] or "")
+        "region": str(region_name or ""),
+        "region_code": reg_code,
+        "companies_count_region": count,
+        "collected_at": collected_at.isoformat() if hasattr(collected_at, "isoformat") else str(collected_at),
+        "source_parsed_id": row.get("source_parsed_id"),
+    }
 
-        if to_insert:
-            db.execute(insert(market_snapshot), to_insert)
-        db.commit()
 
-        # stats
-        total = len(to_insert)
+def load_build_state(db):
+    stmt = select(snapshot_build_state).where(snapshot_build_state.c.id == 1)
+    return db.execute(stmt).mappings().first()
+
+
+def save_build_state(
+    db,
+    *,
+    last_offer_id,
+    last_parsed_at,
+    mode: str,
+    company_counts: dict[str, int],
+    built_at: datetime | None = None,
+) -> None:
+    db.execute(delete(snapshot_build_state))
+    db.execute(
+        insert(snapshot_build_state).values(
+            id=1,
+            last_offer_id=last_offer_id,
+            last_parsed_at=last_parsed_at,
+            mode=mode,
+            built_at=built_at or datetime.utcnow(),
+        )
+    )
+    db.execute(delete(snapshot_region_counts))
+    if company_counts:
+        db.execute(
+            insert(snapshot_region_counts),
+            [{"region": region, "companies_count": cnt} for region, cnt in company_counts.items()],
+        )
+
+
+def _max_or(current, value):
+    if value is None:
+        return current
+    if current is None:
+        return value
+    return max(current, value)
+
+
+def stream_into_snapshot(
+    db,
+    stmt,
+    regions,
+    company_counts,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    upsert: bool = False,
+    last_offer_id=None,
+    last_parsed_at=None,
+    target: Table = market_snapshot,
+) -> dict:
+    """Stream source rows through a server-side cursor and insert them batch by batch.
+
+    Memory is bounded by batch_size; region counts, unresolved codes and the
+    watermark are folded into the same pass. With upsert=True, existing rows with
+    the same source_parsed_id are replaced.
+    """
+    region_counts = defaultdict(int)
+    written = 0
+    replaced = 0
+    unresolved_numeric = 0
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size)).mappings()
+    for chunk in result.partitions():
+        batch = []
+        for row in chunk:
+            snap = to_snapshot_row(row, regions, company_counts)
+            reg_code = snap["region_code"]
+            if reg_code and reg_code.isdigit() and reg_code not in regions.code_to_name:
+                unresolved_numeric += 1
+            if snap["region"]:
+                region_counts[snap["region"]] += 1
+            last_offer_id = _max_or(last_offer_id, row.get("retail_offer_id"))
+            last_parsed_at = _max_or(last_parsed_at, row.get("parsed_at"))
+            batch.append(snap)
+
+        # None becomes NaN in the float arrays and is stored back as NULL
+        per_l, per_kg = unit_prices(
+            [r["price_value"] for r in chunk],
+            [r["weight_g"] for r in chunk],
+            [r["volume_ml"] for r in chunk],
+        )
+        for snap, l_price, kg_price in zip(batch, per_l.tolist(), per_kg.tolist()):
+            snap["price_per_l"] = None if math.isnan(l_price) else l_price
+            snap["price_per_kg"] = None if math.isnan(kg_price) else kg_price
+
+        if upsert:
+            ids = [r["source_parsed_id"] for r in batch]
+            deleted = db.execute(delete(target).where(target.c.source_parsed_id.in_(ids)))
+            replaced += deleted.rowcount or 0
+        db.execute(insert(target), batch)
+        written += len(batch)
+
+    return {
+        "written": written,
+        "replaced": replaced,
+        "unresolved_numeric": unresolved_numeric,
+        "region_counts": region_counts,
+        "last_offer_id": last_offer_id,
+        "last_parsed_at": last_parsed_at,
+    }
+
+
+def create_region_map_table(db, regions, company_counts) -> Table:
+    """Resolve each distinct raw region once and load the result into a temp table.
+
+    Only distinct region keys (tens of values) pass through Python; the mapping is
+    identical to regions.resolve(), including Cyrillic case folding that SQLite's
+    lower() cannot do. Company counts ride along keyed by the resolved name.
+    """
+    region_map = Table(
+        "tmp_snapshot_region_map",
+        MetaData(),
+        Column("raw_region", String, primary_key=True),
+        Column("region_name", String),
+        Column("region_code", String),
+        Column("unresolved", Integer),
+        Column("companies_count", Integer),
+        prefixes=["TEMPORARY"],
+    )
+    conn = db.connection()
+    region_map.drop(conn, checkfirst=True)
+    region_map.create(conn)
+
+    map_rows = []
+    stmt = (
+        select(retail_products_parsed.c.region)
+        .where(retail_products_parsed.c.region.isnot(None))
+        .distinct()
+    )
+    for raw in db.execute(stmt).scalars():
+        region_name, reg_code = regions.resolve(raw)
+        unresolved = bool(reg_code and reg_code.isdigit() and reg_code not in regions.code_to_name)
+        map_rows.append(
+            {
+                "raw_region": raw,
+                "region_name": region_name,
+                "region_code": reg_code,
+                "unresolved": int(unresolved),
+                "companies_count": company_counts.get(region_name, 0) if region_name else 0,
+            }
+        )
+    if map_rows:
+        db.execute(insert(region_map), map_rows)
+    return region_map
+
+
+def insert_snapshot_sql(
+    db,
+    regions,
+    company_counts,
+    *,
+    where=None,
+    upsert: bool = False,
+    target: Table = market_snapshot,
+) -> dict:
+    """Build snapshot rows with a single INSERT ... SELECT; no row data is fetched."""
+    region_map = create_region_map_table(db, regions, company_counts)
+
+    parsed = retail_products_parsed.c
+    source = (
+        join(retail_products_parsed, retail_offers, parsed.retail_offer_id == retail_offers.c.id)
+        .outerjoin(region_map, region_map.c.raw_region == parsed.region)
+    )
+    # same text as datetime.isoformat() in to_snapshot_row(): "T" separator and
+    # no fractional part when it is zero (SQLite stores DateTime as "... HH:MM:SS.000000")
+    stamp = func.replace(cast(func.coalesce(parsed.parsed_at, func.current_timestamp()), String), " ", "T")
+    collected_at = case((stamp.like("%.000000"), func.substr(stamp, 1, func.length(stamp) - 7)), else_=stamp)
+    stmt = select(
+        parsed.raw_name,
+        parsed.brand,
+        parsed.product_type,
+        retail_offers.c.price_value,
+        retail_offers.c.price_currency,
+        func.coalesce(region_map.c.region_name, ""),
+        region_map.c.region_code,
+        func.coalesce(region_map.c.companies_count, 0),
+        collected_at,
+        parsed.id,
+        _unit_price_sql(retail_offers.c.price_value, parsed.volume_ml),
+        _unit_price_sql(retail_offers.c.price_value, parsed.weight_g),
+    ).select_from(source)
+    watermark = select(func.max(parsed.retail_offer_id), func.max(parsed.parsed_at))
+    unresolved = (
+        select(func.count())
+        .select_from(retail_products_parsed.join(region_map, region_map.c.raw_region == parsed.region))
+        .where(region_map.c.unresolved == 1)
+    )
+    if where is not None:
+        stmt = stmt.where(where)
+        watermark = watermark.where(where)
+        unresolved = unresolved.where(where)
+
+    replaced = 0
+    if upsert:
+        changed_ids = select(parsed.id)
+        if where is not None:
+            changed_ids = changed_ids.where(where)
+        deleted = db.execute(delete(target).where(target.c.source_parsed_id.in_(changed_ids)))
+        replaced = deleted.rowcount or 0
+
+    columns = [
+        "product_name",
+        "brand_name",
+        "category",
+        "price_value",
+        "price_currency",
+        "region",
+        "region_code",
+        "companies_count_region",
+        "collected_at",
+        "source_parsed_id",
+        "price_per_l",
+        "price_per_kg",
+    ]
+    result = db.execute(insert(target).from_select(columns, stmt))
+    last_offer_id, last_parsed_at = db.execute(watermark).one()
+    unresolved_numeric = db.execute(unresolved).scalar_one()
+    region_map.drop(db.connection())
+
+    return {
+        "written": result.rowcount or 0,
+        "replaced": replaced,
+        "unresolved_numeric": unresolved_numeric,
+        "region_counts": None,
+        "last_offer_id": last_offer_id,
+        "last_parsed_at": last_parsed_at,
+    }
+
+
+def top_snapshot_regions(db, table: Table = market_snapshot, limit: int = 10) -> list[tuple[str, int]]:
+    cnt = func.count()
+    stmt = (
+        select(table.c.region, cnt)
+        .where(table.c.region != "")
+        .group_by(table.c.region)
+        .order_by(cnt.desc())
+        .limit(limit)
+    )
+    return [(region, count) for region, count in db.execute(stmt)]
+
+
+def build_full(db, batch_size: int = DEFAULT_BATCH_SIZE, sql: bool = False) -> dict:
+    """Rebuild the snapshot from every parsed offer into a shadow table and swap it in."""
+    started = time.perf_counter()
+    version, shadow = create_shadow_table(db)
+    db.commit()
+
+    try:
+        regions = load_region_aliases(db)
+        company_counts = build_company_counts(db, regions)
+
+        if sql:
+            stats = insert_snapshot_sql(db, regions, company_counts, target=shadow)
+        else:
+            stats = stream_into_snapshot(
+                db,
+                select_snapshot_source(),
+                regions,
+                company_counts,
+                batch_size=batch_size,
+                target=shadow,
+            )
+
         # top 10 regions by product count
-        region_counts = defaultdict(int)
-        for r in to_insert:
-            if r["region"]:
-                region_counts[r["region"]] += 1
-        top_regions = sorted(region_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-
-    print(f"market_snapshot rows: {total}")
-    if unresolved_numeric:
-        print(f"NOTICE: {unresolved_numeric} rows kept numeric region_code without external mapping (region_lr_map.csv missing/incomplete)")
-    print("Top 10 regions by product count:")
-    for reg, cnt in top_regions:
-        print(f"{reg}: {cnt}")
+        if stats["region_counts"] is None:
+            top_regions = top_snapshot_regions(db, shadow)
+        else:
+            top_regions = sorted(stats["region_counts"].items(), key=lambda x: x[1], reverse=True)[:10]
+        db.commit()
+    except Exception:
+        db.rollback()
+        discard(db, version)
+        db.commit()
+        raise
+
+    # short transaction: readers see either the old or the new snapshot, never a partial one
+    swap_in(
+        db,
+        version,
+        row_count=stats["written"],
+        build_seconds=time.perf_counter() - started,
+        mode="full-sql" if sql else "full",
+    )
+    save_build_state(
+        db,
+        last_offer_id=stats["last_offer_id"],
+        last_parsed_at=stats["last_parsed_at"],
+        mode="full",
+        company_counts=company_counts,
+    )
+    db.commit()
+
+    return {
+        "total": stats["written"],
+        "unresolved_numeric": stats["unresolved_numeric"],
+        "top_regions": top_regions,
+        "version": version,
+    }
+
+
+def refresh_company_counts(db, company_counts: dict[str, int]) -> int:
+    """Rewrite companies_count_region only for regions whose counts changed since the last build."""
+    stmt = select(snapshot_region_counts.c.region, snapshot_region_counts.c.companies_count)
+    previous = {region: cnt for region, cnt in db.execute(stmt)}
+    changed = 0
+    for region in set(previous) | set(company_counts):
+        cnt = company_counts.get(region, 0)
+        if previous.get(region, 0) == cnt:
+            continue
+        db.execute(
+            update(market_snapshot)
+            .where(market_snapshot.c.region == region)
+            .values(companies_count_region=cnt)
+        )
+        changed += 1
+    return changed
+
+
+def watermark_filter(state):
+    """Filter on retail_products_parsed selecting rows newer than the stored watermark."""
+    conditions = []
+    if state["last_offer_id"] is not None:
+        conditions.append(retail_products_parsed.c.retail_offer_id > state["last_offer_id"])
+    if state["last_parsed_at"] is not None:
+        conditions.append(retail_products_parsed.c.parsed_at > state["last_parsed_at"])
+    return or_(*conditions) if conditions else None
+
+
+def build_incremental(db, state, batch_size: int = DEFAULT_BATCH_SIZE, sql: bool = False) -> dict:
+    """Upsert snapshot rows for offers/parses newer than the stored watermark."""
+    regions = load_region_aliases(db)
+    company_counts = build_company_counts(db, regions)
+
+    # counts first, so rows upserted below are not rewritten twice
+    regions_refreshed = refresh_company_counts(db, company_counts)
+
+    where = watermark_filter(state)
+    if sql:
+        stats = insert_snapshot_sql(db, regions, company_counts, where=where, upsert=True)
+        stats["last_offer_id"] = _max_or(state["last_offer_id"], stats["last_offer_id"])
+        stats["last_parsed_at"] = _max_or(state["last_parsed_at"], stats["last_parsed_at"])
+    else:
+        stmt = select_snapshot_source()
+        if where is not None:
+            stmt = stmt.where(where)
+        stats = stream_into_snapshot(
+            db,
+            stmt,
+            regions,
+            company_counts,
+            batch_size=batch_size,
+            upsert=True,
+            last_offer_id=state["last_offer_id"],
+            last_parsed_at=state["last_parsed_at"],
+        )
+    # built_at is part of the snapshot token; a run that changed no rows keeps
+    # it, so payload caches and the Parquet export stay valid
+    changed = stats["written"] or regions_refreshed
+    save_build_state(
+        db,
+        last_offer_id=stats["last_offer_id"],
+        last_parsed_at=stats["last_parsed_at"],
+        mode="incremental",
+        company_counts=company_counts,
+        built_at=None if changed else state["built_at"],
+    )
+    total = db.execute(select(func.count()).select_from(market_snapshot)).scalar_one()
+    update_active_row_count(db, total)
+    db.commit()
+
+    return {
+        "total": total,
+        "inserted": stats["written"] - stats["replaced"],
+        "updated": stats["replaced"],
+        "regions_refreshed": regions_refreshed,
+        "unresolved_numeric": stats["unresolved_numeric"],
+    }
+
+
+def _export_parquet(args) -> None:
+    if args.parquet is False or not parquet_available():
+        return
+    rows = export_snapshot(SNAPSHOT_DIR)
+    print(f"Parquet snapshot: {rows} rows -> {SNAPSHOT_DIR}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build market_snapshot from parsed retail offers.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Delete and rebuild the whole snapshot (default: incremental from the last watermark).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows fetched and inserted per batch (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Swap the previous snapshot version back in and exit.",
+    )
+    parser.add_argument(
+        "--sql",
+        action="store_true",
+        help="Build with a single INSERT ... SELECT over a temporary region map (no rows fetched into Python).",
+    )
+    parser.add_argument(
+        "--parquet",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Refresh the Parquet export afterwards (default: after full builds and rollbacks only; "
+            "an export rewrites the whole dataset, so incremental builds need --parquet)."
+        ),
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+
+    if args.rollback:
+        with SessionLocal() as db:
+            version = rollback(db)
+            # the watermark belongs to the rolled-back build; next run rebuilds in full
+            db.execute(delete(snapshot_build_state))
+            db.commit()
+        print(f"market_snapshot rolled back to version {version}")
+        _export_parquet(args)
+        return
+
+    with SessionLocal() as db:
+        state = None if args.full else load_build_state(db)
+        if state is None:
+            if not args.full:
+                print("No previous snapshot build recorded; running full rebuild")
+            stats = build_full(db, batch_size=args.batch_size, sql=args.sql)
+        else:
+            stats = build_incremental(db, state, batch_size=args.batch_size, sql=args.sql)
+
+    if "version" in stats:
+        print(f"market_snapshot version: {stats['version']}")
+    print(f"market_snapshot rows: {stats['total']}")
+    if stats["unresolved_numeric"]:
+        print(f"NOTICE: {stats['unresolved_numeric']} rows kept numeric region_code without external mapping (region_lr_map.csv missing/incomplete)")
+    if "top_regions" in stats:
+        print("Top 10 regions by product count:")
+        for reg, cnt in stats["top_regions"]:
+            print(f"{reg}: {cnt}")
+    else:
+        print(f"Inserted: {stats['inserted']}, Updated: {stats['updated']}")
+        print(f"Regions with refreshed companies_count_region: {stats['regions_refreshed']}")
+        changed = stats["inserted"] or stats["updated"] or stats["regions_refreshed"]
+        if changed and args.parquet is None and parquet_available():
+            print("Parquet export not refreshed (pass --parquet); readers use the table until the next export")
+        if not (changed and args.parquet):
+            return
+    _export_parquet(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""Export market_snapshot to the partitioned Parquet dataset.
+
+build_market_snapshot runs the export after full builds and rollbacks, and
+after incremental builds that changed rows when given --parquet; this
+module's main() re-exports by hand. The dataset records the snapshot version
+token it was written from, and readers only use it while that token matches
+the database (parquet_snapshot_current), otherwise they read the live table.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy.exc import OperationalError
+
+from app.db.session import read_engine
+from app.modules.analytics.models import market_snapshot
+from app.modules.analytics.parquet_store import SNAPSHOT_DIR, dataset_token, write_manifest, write_snapshot
+from app.modules.analytics.snapshot_versions import snapshot_token
+
+CHUNK_SIZE = 50000
+
+
+def export_snapshot(root: Path = SNAPSHOT_DIR) -> int:
+    """Write the live snapshot to `root` and return the row count."""
+    s = market_snapshot.c
+    with read_engine.connect() as conn:
+        token = snapshot_token(conn)
+        # partition order lets the writer finish each partition in a single file
+        chunks = pd.read_sql(
+            market_snapshot.select().order_by(s.region_code, s.collected_at),
+            conn,
+            chunksize=CHUNK_SIZE,
+        )
+        total = write_snapshot(chunks, root)
+        # a build that finished while exporting leaves the dataset unmatched;
+        # an empty dataset has no schema to read, readers use the table
+        current = total and snapshot_token(conn) == token
+        write_manifest(root, token if current else None, total)
+    return total
+
+
+def parquet_snapshot_current(db, root: Path = SNAPSHOT_DIR) -> bool:
+    """True when the dataset at `root` was exported from the live snapshot."""
+    token = dataset_token(root)
+    if token is None:
+        return False
+    try:
+        return token == snapshot_token(db)
+    except OperationalError:
+        # no snapshot_versions / snapshot_build_state tables yet
+        return False
+
+
+def main() -> None:
+    total = export_snapshot(SNAPSHOT_DIR)
+    print(f"Exported {total} rows -> {SNAPSHOT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
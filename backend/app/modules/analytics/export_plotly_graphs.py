@@ -1,46 +1,62 @@
+import argparse
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import pandas as pd
-
+from app.modules.analytics.plots.plot_cache import plot_key, render_plot
 from app.modules.analytics.plots.plot_registry import PLOTS
 
 BASE_DIR = Path(__file__).resolve().parents[3] / "data" / "analytics"
 OUT_DIR = BASE_DIR / "plots"
 
 
-def load_sources():
-    region_summary = pd.read_csv(BASE_DIR / "region_summary.csv")
-    category_summary = pd.read_csv(BASE_DIR / "category_summary.csv")
-    price_distribution = pd.read_csv(BASE_DIR / "price_distribution.csv")
-    overview = json.loads((BASE_DIR / "overview_metrics.json").read_text(encoding="utf-8"))
-    return {
-        "region_summary": region_summary,
-        "category_summary": category_summary,
-        "price_distribution": price_distribution,
-        "overview": overview,
-    }
-
+def build_all(force: bool = False, workers: int | None = None) -> dict[str, str]:
+    """Render every registered plot whose cache key changed since the last export.
 
-def build_all():
-    sources = load_sources()
+    Keys are recorded in plots/manifest.json; stale plots are rendered in a
+    process pool. Returns {plot name: "rendered" | "cached"}.
+    """
     OUT_DIR.mkdir(parents=True, exist_ok=True)
+    manifest_path = OUT_DIR / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
 
-    # price_by_region
-    fig = PLOTS["price_by_region"]["builder"](sources["region_summary"])
-    (OUT_DIR / "price_by_region.json").write_text(fig.to_json(), encoding="utf-8")
+    status: dict[str, str] = {}
+    pending: dict[str, str] = {}
+    for name in PLOTS:
+        key, _ = plot_key(name, base_dir=BASE_DIR)
+        if not force and manifest.get(name) == key and (OUT_DIR / f"{name}.json").exists():
+            status[name] = "cached"
+        else:
+            pending[name] = key
+    if not pending:
+        return status
 
-    # category_distribution
-    fig = PLOTS["category_distribution"]["builder"](sources["category_summary"])
-    (OUT_DIR / "category_distribution.json").write_text(fig.to_json(), encoding="utf-8")
+    workers = min(len(pending), workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(render_plot, name, None, BASE_DIR) for name in pending}
+            rendered = {name: future.result() for name, future in futures.items()}
+    else:
+        rendered = {name: render_plot(name, None, BASE_DIR) for name in pending}
 
-    # price_trend
-    fig = PLOTS["price_trend"]["builder"](sources["price_distribution"])
-    (OUT_DIR / "price_trend.json").write_text(fig.to_json(), encoding="utf-8")
+    for name, body in rendered.items():
+        (OUT_DIR / f"{name}.json").write_text(body, encoding="utf-8")
+        manifest[name] = pending[name]
+        status[name] = "rendered"
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return status
 
 
 def main():
-    build_all()
+    parser = argparse.ArgumentParser(description="Export Plotly figures for the analytics exports.")
+    parser.add_argument("--force", action="store_true", help="Render every plot even if its inputs are unchanged.")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    args = parser.parse_args()
+
+    status = build_all(force=args.force, workers=args.workers)
+    for name, state in status.items():
+        print(f"{name}: {state}")
     print(f"Plots exported to: {OUT_DIR}")
 
 
@@ -3,6 +3,8 @@ from pathlib import Path
 
 import pandas as pd
 
+from app.modules.analytics.parquet_store import parquet_available, write_frame
+
 
 def save_json(data: dict, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -12,3 +14,11 @@ def save_json(data: dict, path: Path) -> None:
 def save_csv(df: pd.DataFrame, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def save_parquet(df: pd.DataFrame, path: Path) -> bool:
+    """Write df as Parquet; returns False when pyarrow is not installed."""
+    if not parquet_available():
+        return False
+    write_frame(df, path)
+    return True
@@ -0,0 +1,92 @@
+"""Binned price distributions and bounded drill-down samples.
+
+Consumers get per-(region, category) histogram bins plus a small random sample
+per group instead of one row per priced product, so payload size depends on
+the number of bins and groups, not on the catalogue size.
+"""
+
+import numpy as np
+import pandas as pd
+
+GROUP_KEYS = ["region", "category"]
+
+DEFAULT_BINS = 30
+
+DEFAULT_SAMPLE_SIZE = 50
+
+HISTOGRAM_COLUMNS = [*GROUP_KEYS, "bin_left", "bin_right", "count"]
+
+
+def _priced(df: pd.DataFrame) -> pd.DataFrame:
+    return df.loc[df["price_value"].notna(), [*GROUP_KEYS, "price_value"]]
+
+
+def _fixed_histogram(data: pd.DataFrame, bins: int) -> pd.DataFrame:
+    # shared equal-width edges keep groups comparable on one axis
+    prices = data["price_value"].to_numpy(dtype="float64")
+    edges = np.histogram_bin_edges(prices, bins=bins)
+    idx = np.clip(np.searchsorted(edges, prices, side="right") - 1, 0, len(edges) - 2)
+    counts = (
+        data.assign(_bin=idx)
+        .groupby([*GROUP_KEYS, "_bin"], dropna=False, observed=True)
+        .size()
+        .reset_index(name="count")
+    )
+    counts["bin_left"] = edges[counts["_bin"]]
+    counts["bin_right"] = edges[counts["_bin"] + 1]
+    return counts[HISTOGRAM_COLUMNS]
+
+
+def _adaptive_histogram(data: pd.DataFrame, bins: int) -> pd.DataFrame:
+    # per-group quantile edges: roughly equal counts per bin, narrow bins where prices cluster
+    frames = []
+    for keys, group in data.groupby(GROUP_KEYS, dropna=False, observed=True):
+        prices = group["price_value"].to_numpy(dtype="float64")
+        edges = np.unique(np.quantile(prices, np.linspace(0, 1, bins + 1)))
+        if len(edges) == 1:
+            edges = np.array([edges[0], edges[0]])
+        counts, _ = np.histogram(prices, bins=edges)
+        frames.append(
+            pd.DataFrame(
+                {
+                    GROUP_KEYS[0]: keys[0],
+                    GROUP_KEYS[1]: keys[1],
+                    "bin_left": edges[:-1],
+                    "bin_right": edges[1:],
+                    "count": counts,
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=HISTOGRAM_COLUMNS)
+    out = pd.concat(frames, ignore_index=True)
+    return out[out["count"] > 0].reset_index(drop=True)
+
+
+def price_histogram(df: pd.DataFrame, bins: int = DEFAULT_BINS, adaptive: bool = False) -> pd.DataFrame:
+    """Histogram of price_value per (region, category) in long format.
+
+    Fixed mode uses equal-width edges shared by all groups; adaptive mode uses
+    per-group quantile edges. Empty bins are omitted.
+    """
+    data = _priced(df)
+    if data.empty:
+        return pd.DataFrame(columns=HISTOGRAM_COLUMNS)
+    if adaptive:
+        return _adaptive_histogram(data, bins)
+    return _fixed_histogram(data, bins)
+
+
+def sample_per_group(df: pd.DataFrame, size: int = DEFAULT_SAMPLE_SIZE, seed: int = 0) -> pd.DataFrame:
+    """Uniform random sample of at most `size` priced rows per (region, category).
+
+    Same columns as aggregations.price_distribution; deterministic for a seed.
+    """
+    data = _priced(df)
+    shuffled = data.sample(frac=1.0, random_state=seed)
+    return (
+        shuffled.groupby(GROUP_KEYS, dropna=False, observed=True)
+        .head(size)
+        .sort_index()
+        .reset_index(drop=True)
+    )
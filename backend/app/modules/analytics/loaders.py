@@ -1,11 +1,102 @@
+import logging
+from pathlib import Path
+
 import pandas as pd
-from sqlalchemy import text
+from pandas.api.types import union_categoricals
+from sqlalchemy import select
+
+from app.db.session import read_engine
+from app.modules.analytics.models import market_snapshot
+from app.modules.analytics.export_market_snapshot_parquet import parquet_snapshot_current
+from app.modules.analytics.parquet_store import SNAPSHOT_DIR, read_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100000
+
+# Low-cardinality string columns stored as pandas category.
+CATEGORICAL_COLUMNS = ["region", "region_code", "category", "brand_name", "price_currency"]
+
+# kept float64: float32 turns 27.57 into 27.56999969482422 in API outputs
+PRICE_COLUMNS = ["price_value", "price_per_l", "price_per_kg"]
+
+# small non-negative integers, downcast to the narrowest unsigned type
+COUNT_COLUMNS = ["id", "source_parsed_id", "companies_count_region"]
+
+
+def _compact_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORICAL_COLUMNS:
+        if col in chunk:
+            chunk[col] = chunk[col].astype("category")
+    for col in PRICE_COLUMNS:
+        if col in chunk:
+            chunk[col] = pd.to_numeric(chunk[col]).astype("float64")
+    for col in COUNT_COLUMNS:
+        if col in chunk:
+            # columns with NULLs stay float64
+            chunk[col] = pd.to_numeric(chunk[col], downcast="unsigned")
+    if "collected_at" in chunk:
+        chunk["collected_at"] = pd.to_datetime(chunk["collected_at"], format="ISO8601", errors="coerce")
+    return chunk
+
+
+def _concat_compact(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks keeping categorical columns categorical (categories are unioned)."""
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks, ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df:
+            df[col] = union_categoricals([c[col] for c in chunks])
+    return df
+
+
+def _read_parquet(names: list[str], root: Path) -> pd.DataFrame:
+    # id restores the table's row order, which the partitioned layout loses
+    df = read_snapshot(columns=list(dict.fromkeys(["id", *names])), root=root)
+    df = df.sort_values("id", ignore_index=True)[names]
+    return _compact_chunk(df)
+
+
+def load_market_snapshot(
+    columns: list[str] | None = None,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    root: Path = SNAPSHOT_DIR,
+) -> pd.DataFrame:
+    """Load market_snapshot into a compact, typed DataFrame.
+
+    Only `columns` are selected (all when None). While the Parquet export at
+    `root` matches the live snapshot it is read instead of the table;
+    otherwise rows are read from the database in chunks. Low-cardinality
+    strings become category, ids and counts are downcast, prices stay float64
+    and collected_at is parsed to datetime64. The memory saved versus plain
+    object/64-bit columns is logged.
+    """
+    cols = [market_snapshot.c[name] for name in columns] if columns else list(market_snapshot.c)
+    stmt = select(*cols)
 
-from app.db.session import engine as sa_engine
+    chunks: list[pd.DataFrame] = []
+    raw_bytes = 0
+    with read_engine.connect() as conn:
+        if parquet_snapshot_current(conn, root):
+            df = _read_parquet([c.name for c in cols], root)
+            logger.info("market_snapshot loaded from %s: %d rows", root, len(df))
+            return df
+        for chunk in pd.read_sql(stmt, conn, chunksize=chunksize):
+            raw_bytes += int(chunk.memory_usage(deep=True).sum())
+            chunks.append(_compact_chunk(chunk))
 
+    if not chunks:
+        return pd.DataFrame(columns=[c.name for c in cols])
 
-def load_market_snapshot() -> pd.DataFrame:
-    """Load market_snapshot into a DataFrame without transformations."""
-    with sa_engine.connect() as conn:
-        df = pd.read_sql(text("SELECT * FROM market_snapshot"), conn)
+    df = _concat_compact(chunks)
+    compact_bytes = int(df.memory_usage(deep=True).sum())
+    logger.info(
+        "market_snapshot loaded: %d rows, %.1f MiB -> %.1f MiB (saved %.1f MiB)",
+        len(df),
+        raw_bytes / 2**20,
+        compact_bytes / 2**20,
+        (raw_bytes - compact_bytes) / 2**20,
+    )
     return df
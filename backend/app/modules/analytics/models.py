@@ -4,6 +4,8 @@ from sqlalchemy import (
     Integer,
     String,
     Float,
+    DateTime,
+    Index,
     MetaData,
 )
 
@@ -22,4 +24,79 @@ market_snapshot = Table(
     Column("region_code", String),
     Column("companies_count_region", Integer),
     Column("collected_at", String),
+    Column("source_parsed_id", Integer),
+    Column("price_per_l", Float),
+    Column("price_per_kg", Float),
+)
+
+# Also created by migrations 0009 and 0018; declared here so shadow tables
+# built by snapshot_versions get them too (under versioned names).
+Index("ux_market_snapshot_source_parsed_id", market_snapshot.c.source_parsed_id, unique=True)
+Index(
+    "ix_market_snapshot_region_category",
+    market_snapshot.c.region,
+    market_snapshot.c.category,
+    market_snapshot.c.price_value,
+)
+Index("ix_market_snapshot_category_region", market_snapshot.c.category, market_snapshot.c.region)
+
+# Watermark of the last snapshot build (single row, id=1).
+snapshot_build_state = Table(
+    "snapshot_build_state",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("last_offer_id", Integer),
+    Column("last_parsed_at", DateTime),
+    Column("mode", String),
+    Column("built_at", DateTime),
+)
+
+# companies_discovered counts per region as of the last snapshot build.
+snapshot_region_counts = Table(
+    "snapshot_region_counts",
+    metadata,
+    Column("region", String, primary_key=True),
+    Column("companies_count", Integer),
+)
+
+# One row per full snapshot build; status is active / previous / retired.
+snapshot_versions = Table(
+    "snapshot_versions",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("table_name", String, nullable=False),
+    Column("status", String, nullable=False),
+    Column("mode", String),
+    Column("row_count", Integer),
+    Column("build_seconds", Float),
+    Column("created_at", DateTime),
+    Column("activated_at", DateTime),
+)
+
+# Additive price aggregates maintained at ingest time. Missing key values are
+# stored as '' so the composite primary key can be used as an upsert target.
+price_rollups = Table(
+    "price_rollups",
+    metadata,
+    Column("region", String, primary_key=True, default=""),
+    Column("region_code", String, primary_key=True, default=""),
+    Column("category", String, primary_key=True, default=""),
+    Column("brand", String, primary_key=True, default=""),
+    Column("day", String, primary_key=True),
+    Column("price_count", Integer, nullable=False),
+    Column("price_sum", Float, nullable=False),
+    Column("price_min", Float),
+    Column("price_max", Float),
+    Column("price_sumsq", Float, nullable=False),
+)
+
+# Serialized t-digest of price_value per region / per category.
+price_sketches = Table(
+    "price_sketches",
+    metadata,
+    Column("dimension", String, primary_key=True),
+    Column("key", String, primary_key=True),
+    Column("sketch", String, nullable=False),
+    Column("price_count", Integer, nullable=False),
+    Column("updated_at", DateTime),
 )
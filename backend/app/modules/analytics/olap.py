@@ -0,0 +1,252 @@
+"""Ad-hoc group-by queries over the market snapshot, pushed down to an engine.
+
+A query is a list of dimensions, a list of measures and equality/IN filters.
+It is compiled for one of three backends and only the aggregated result is
+materialized in pandas:
+
+- "duckdb": DuckDB over the partitioned Parquet snapshot (optional dependency,
+  `pip install duckdb`); partition pruning on region_code/collected_date.
+- "arrow": pyarrow dataset scan + Table.group_by over the same Parquet files.
+- "sql": one GROUP BY statement against market_snapshot in the database.
+
+The Parquet backends read the last export_market_snapshot_parquet output,
+the SQL backend reads the live table. "auto" picks the first available in
+that order, and the Parquet ones only while the export matches the live
+snapshot version.
+
+    python -m app.modules.analytics.olap -d region -d category -m count -m avg_price -f category=молоко
+"""
+
+import argparse
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import and_, func, literal_column, select
+
+from app.db.session import ReadSessionLocal
+from app.modules.analytics.export_market_snapshot_parquet import parquet_snapshot_current
+from app.modules.analytics.models import market_snapshot
+from app.modules.analytics.parquet_store import SNAPSHOT_DIR, parquet_available, snapshot_dataset
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+try:
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - optional dependency
+    ds = None
+
+
+DIMENSIONS = ["region", "region_code", "category", "brand_name", "price_currency", "collected_date"]
+
+# measure -> (snapshot column, pyarrow aggregation); the SQL and DuckDB
+# aggregates are derived from the same entry through SQL_AGGREGATES
+MEASURES: dict[str, tuple[str, str]] = {
+    "count": ("price_value", "count"),
+    "avg_price": ("price_value", "mean"),
+    "min_price": ("price_value", "min"),
+    "max_price": ("price_value", "max"),
+    "sum_price": ("price_value", "sum"),
+    "distinct_products": ("product_name", "count_distinct"),
+    "avg_price_per_l": ("price_per_l", "mean"),
+    "avg_price_per_kg": ("price_per_kg", "mean"),
+}
+
+SQL_AGGREGATES = {
+    "count": func.count,
+    "mean": func.avg,
+    "min": func.min,
+    "max": func.max,
+    "sum": func.sum,
+    "count_distinct": lambda col: func.count(col.distinct()),
+}
+
+BACKENDS = ("auto", "duckdb", "arrow", "sql")
+
+
+def _validate(dimensions: list[str], measures: list[str], filters: dict) -> None:
+    unknown = [d for d in [*dimensions, *filters] if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {', '.join(unknown)}")
+    unknown = [m for m in measures if m not in MEASURES]
+    if unknown:
+        raise ValueError(f"Unknown measures: {', '.join(unknown)}")
+    if not measures:
+        raise ValueError("At least one measure is required")
+
+
+def _values(value) -> list[str]:
+    return [str(v) for v in value] if isinstance(value, (list, tuple, set)) else [str(value)]
+
+
+def _parquet_ready(root: Path, db=None) -> bool:
+    if not (root.exists() and any(root.rglob("*.parquet"))):
+        return False
+    if db is not None:
+        return parquet_snapshot_current(db, root)
+    with ReadSessionLocal() as session:
+        return parquet_snapshot_current(session, root)
+
+
+def choose_backend(backend: str = "auto", root: Path = SNAPSHOT_DIR, db=None) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+    if backend != "auto":
+        return backend
+    if (duckdb is not None or parquet_available()) and _parquet_ready(root, db):
+        return "duckdb" if duckdb is not None else "arrow"
+    return "sql"
+
+
+def _duckdb_measure(name: str) -> str:
+    col, fn = MEASURES[name]
+    return str(SQL_AGGREGATES[fn](literal_column(col)).compile())
+
+
+def _query_duckdb(dimensions, measures, filters, date_from, date_to, root: Path) -> pd.DataFrame:
+    if duckdb is None:
+        raise ImportError("duckdb is required for the duckdb backend (pip install duckdb)")
+    # identifiers come from the DIMENSIONS/MEASURES whitelists; values are bound parameters
+    where, params = [], []
+    for column, value in filters.items():
+        values = _values(value)
+        where.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if date_from:
+        where.append("collected_date >= ?")
+        params.append(str(date_from)[:10])
+    if date_to:
+        where.append("collected_date <= ?")
+        params.append(str(date_to)[:10])
+
+    select_list = [*dimensions, *(f"{_duckdb_measure(m)} AS {m}" for m in measures)]
+    pattern = str(root / "**" / "*.parquet").replace("'", "''")
+    sql = f"SELECT {', '.join(select_list)} FROM read_parquet('{pattern}', hive_partitioning = true, hive_types_autocast = false)"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if dimensions:
+        sql += f" GROUP BY {', '.join(dimensions)} ORDER BY {', '.join(dimensions)}"
+    with duckdb.connect() as con:
+        return con.execute(sql, params).df()
+
+
+def _query_arrow(dimensions, measures, filters, date_from, date_to, root: Path) -> pd.DataFrame:
+    dataset = snapshot_dataset(root)
+    expr = None
+    conditions = [ds.field(column).isin(_values(value)) for column, value in filters.items()]
+    if date_from:
+        conditions.append(ds.field("collected_date") >= str(date_from)[:10])
+    if date_to:
+        conditions.append(ds.field("collected_date") <= str(date_to)[:10])
+    for cond in conditions:
+        expr = cond if expr is None else expr & cond
+
+    aggregations = [MEASURES[m] for m in measures]
+    columns = sorted({*dimensions, *(column for column, _ in aggregations)})
+    table = dataset.to_table(columns=columns, filter=expr)
+    result = table.group_by(dimensions).aggregate(aggregations)
+    # pyarrow names outputs "<column>_<function>"
+    renamed = {f"{column}_{fn}": m for m, (column, fn) in zip(measures, aggregations)}
+    df = result.to_pandas().rename(columns=renamed)
+    df = df[[*dimensions, *measures]]
+    return df.sort_values(dimensions, ignore_index=True) if dimensions else df
+
+
+def _sql_column(name: str):
+    if name == "collected_date":
+        return func.substr(market_snapshot.c.collected_at, 1, 10).label("collected_date")
+    return market_snapshot.c[name]
+
+
+def _sql_measure(name: str):
+    col, fn = MEASURES[name]
+    return SQL_AGGREGATES[fn](market_snapshot.c[col]).label(name)
+
+
+def _query_sql(db, dimensions, measures, filters, date_from, date_to) -> pd.DataFrame:
+    dims = [_sql_column(d) for d in dimensions]
+    conditions = [_sql_column(column).in_(_values(value)) for column, value in filters.items()]
+    date_col = func.substr(market_snapshot.c.collected_at, 1, 10)
+    if date_from:
+        conditions.append(date_col >= str(date_from)[:10])
+    if date_to:
+        conditions.append(date_col <= str(date_to)[:10])
+
+    stmt = select(*dims, *(_sql_measure(m) for m in measures))
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+    if dims:
+        stmt = stmt.group_by(*dims).order_by(*dims)
+    return pd.DataFrame(db.execute(stmt).all(), columns=[*dimensions, *measures])
+
+
+def query(
+    dimensions: list[str],
+    measures: list[str],
+    filters: dict | None = None,
+    *,
+    date_from: date | str | None = None,
+    date_to: date | str | None = None,
+    backend: str = "auto",
+    db=None,
+    root: Path = SNAPSHOT_DIR,
+) -> pd.DataFrame:
+    """Group the snapshot by `dimensions` and compute `measures`.
+
+    `filters` maps a dimension to a value or a list of values (IN). The result
+    has one column per dimension and measure, sorted by the dimensions.
+    """
+    filters = filters or {}
+    _validate(dimensions, measures, filters)
+    backend = choose_backend(backend, root, db)
+    if backend == "duckdb":
+        return _query_duckdb(dimensions, measures, filters, date_from, date_to, root)
+    if backend == "arrow":
+        return _query_arrow(dimensions, measures, filters, date_from, date_to, root)
+    if db is not None:
+        return _query_sql(db, dimensions, measures, filters, date_from, date_to)
+    with ReadSessionLocal() as session:
+        return _query_sql(session, dimensions, measures, filters, date_from, date_to)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ad-hoc group-by over market_snapshot.")
+    parser.add_argument("-d", "--dimension", action="append", default=[], choices=DIMENSIONS)
+    parser.add_argument("-m", "--measure", action="append", default=[], choices=list(MEASURES))
+    parser.add_argument(
+        "-f",
+        "--filter",
+        action="append",
+        default=[],
+        help="dimension=value[,value...] (repeatable)",
+    )
+    parser.add_argument("--date-from")
+    parser.add_argument("--date-to")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto")
+    args = parser.parse_args()
+
+    filters = {}
+    for item in args.filter:
+        column, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--filter expects dimension=value, got '{item}'")
+        filters[column] = value.split(",")
+
+    backend = choose_backend(args.backend)
+    df = query(
+        args.dimension,
+        args.measure or ["count", "avg_price"],
+        filters,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        backend=backend,
+    )
+    print(f"backend: {backend}, rows: {len(df)}")
+    print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
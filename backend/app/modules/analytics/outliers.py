@@ -0,0 +1,102 @@
+"""Per-group price outlier detection before aggregation.
+
+Bounds are computed per (category, region) with groupby-transform, so every
+row is compared against its own group in one vectorized pass:
+
+- "iqr": [Q1 - k*IQR, Q3 + k*IQR], k defaults to 1.5
+- "mad": median ± k * 1.4826 * MAD, k defaults to 3.5
+
+Groups with fewer than `min_group_size` priced rows, or with zero spread, are
+left alone: their bounds would be noise.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+GROUP_KEYS = ["category", "region"]
+
+METHODS = ("iqr", "mad")
+
+ACTIONS = ("flag", "drop")
+
+DEFAULT_K = {"iqr": 1.5, "mad": 3.5}
+
+DEFAULT_MIN_GROUP_SIZE = 8
+
+# scales MAD to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+
+SUMMARY_COLUMNS = [*GROUP_KEYS, "rows", "outliers", "lower_bound", "upper_bound"]
+
+
+def outlier_bounds(
+    df: pd.DataFrame,
+    method: str = "iqr",
+    k: float | None = None,
+    min_group_size: int = DEFAULT_MIN_GROUP_SIZE,
+    column: str = "price_value",
+) -> tuple[pd.Series, pd.Series]:
+    """Row-aligned (lower, upper) bounds of each row's group; NaN where not applied."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown outlier method '{method}', expected one of: {', '.join(METHODS)}")
+    k = DEFAULT_K[method] if k is None else k
+    values = df[column].astype("float64")
+    grouped = values.groupby([df[key] for key in GROUP_KEYS], dropna=False, observed=True)
+
+    if method == "iqr":
+        q1 = grouped.transform("quantile", 0.25)
+        q3 = grouped.transform("quantile", 0.75)
+        spread = q3 - q1
+        lower, upper = q1 - k * spread, q3 + k * spread
+    else:
+        median = grouped.transform("median")
+        deviation = (values - median).abs()
+        spread = deviation.groupby([df[key] for key in GROUP_KEYS], dropna=False, observed=True).transform("median")
+        lower, upper = median - k * MAD_SCALE * spread, median + k * MAD_SCALE * spread
+
+    usable = (grouped.transform("count") >= min_group_size) & (spread > 0)
+    return lower.where(usable), upper.where(usable)
+
+
+def filter_outliers(
+    df: pd.DataFrame,
+    method: str = "iqr",
+    action: str = "drop",
+    k: float | None = None,
+    min_group_size: int = DEFAULT_MIN_GROUP_SIZE,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Flag or drop price outliers per (category, region).
+
+    Returns (frame, summary). With action="flag" the frame gains a boolean
+    is_outlier column; with "drop" outlier rows are removed. The summary has
+    one row per group that had outliers: rows, outliers and the bounds used.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown outlier action '{action}', expected one of: {', '.join(ACTIONS)}")
+    lower, upper = outlier_bounds(df, method=method, k=k, min_group_size=min_group_size)
+    price = df["price_value"]
+    is_outlier = ((price < lower) | (price > upper)).to_numpy()
+
+    keys = [df[key] for key in GROUP_KEYS]
+    summary = (
+        pd.DataFrame({"outliers": is_outlier, "lower_bound": lower, "upper_bound": upper}, index=df.index)
+        .groupby(keys, dropna=False, observed=True)
+        .agg(
+            rows=("outliers", "size"),
+            outliers=("outliers", "sum"),
+            lower_bound=("lower_bound", "first"),
+            upper_bound=("upper_bound", "first"),
+        )
+        .reset_index()
+    )
+    summary = summary.loc[summary["outliers"] > 0, SUMMARY_COLUMNS].reset_index(drop=True)
+    total = int(np.count_nonzero(is_outlier))
+    logger.info("price outliers (%s): %d of %d rows in %d groups", method, total, len(df), len(summary))
+
+    if action == "flag":
+        return df.assign(is_outlier=is_outlier), summary
+    return df.loc[~is_outlier], summary
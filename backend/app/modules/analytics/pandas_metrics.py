@@ -1,13 +1,22 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
 
-from app.db.session import engine as sa_engine
+from app.modules.analytics import loaders
+
+METRIC_COLUMNS = [
+    "product_name",
+    "brand_name",
+    "category",
+    "price_value",
+    "region",
+    "region_code",
+    "price_per_l",
+    "price_per_kg",
+]
 
 
 def load_market_snapshot() -> pd.DataFrame:
-    """Load market_snapshot into DataFrame, filter out null price/region."""
-    with sa_engine.connect() as conn:
-        df = pd.read_sql(text("SELECT * FROM market_snapshot"), conn)
+    """Load the typed market_snapshot columns used here, filter out null price/region."""
+    df = loaders.load_market_snapshot(columns=METRIC_COLUMNS)
     df = df[df["price_value"].notna() & df["region"].notna()]
     return df
 
@@ -24,7 +33,7 @@ def compute_overview_metrics(df: pd.DataFrame) -> dict:
 
 def prices_by_region(df: pd.DataFrame) -> pd.DataFrame:
     grouped = (
-        df.groupby(["region", "region_code"], dropna=False)["price_value"]
+        df.groupby(["region", "region_code"], dropna=False, observed=True)["price_value"]
         .agg(["mean", "median", "min", "max", "count"])
         .reset_index()
     )
@@ -43,7 +52,7 @@ def prices_by_region(df: pd.DataFrame) -> pd.DataFrame:
 
 def prices_by_category(df: pd.DataFrame) -> pd.DataFrame:
     grouped = (
-        df.groupby(["category"], dropna=False)["price_value"]
+        df.groupby(["category"], dropna=False, observed=True)["price_value"]
         .agg(["mean", "median", "count"])
         .reset_index()
     )
@@ -60,7 +69,7 @@ def prices_by_category(df: pd.DataFrame) -> pd.DataFrame:
 
 def brand_distribution(df: pd.DataFrame) -> pd.DataFrame:
     grouped = (
-        df.groupby(["brand_name"], dropna=False)
+        df.groupby(["brand_name"], dropna=False, observed=True)
         .agg(product_count=("product_name", "count"), regions_count=("region", "nunique"))
         .reset_index()
     )
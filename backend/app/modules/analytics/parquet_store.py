@@ -0,0 +1,175 @@
+"""Parquet (Arrow) storage for the snapshot and the analytics summary tables.
+
+The snapshot is written as a hive-partitioned dataset
+(region_code=<code>/collected_date=<YYYY-MM-DD>/part-*.parquet) so readers can
+prune partitions and project columns. Summary tables are single Parquet files
+next to their CSV counterparts. pyarrow is optional: without it readers fall
+back to the CSV files.
+
+A snapshot export carries a _snapshot.json manifest with the snapshot version
+token it was written from; pyarrow and the "*.parquet" globs skip it.
+SNAPSHOT_PARQUET_DIR overrides where the snapshot dataset lives.
+"""
+
+import itertools
+import json
+import logging
+import os
+import shutil
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ds = None
+    pq = None
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_PARQUET_DIR") or Path(__file__).resolve().parents[3] / "data" / "market_snapshot")
+
+MANIFEST_NAME = "_snapshot.json"
+
+PARTITION_COLUMNS = ["region_code", "collected_date"]
+
+MAX_PARTITIONS = 100_000
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet storage (pip install pyarrow)")
+
+
+def _partitioning():
+    schema = pa.schema([("region_code", pa.string()), ("collected_date", pa.string())])
+    return ds.partitioning(schema, flavor="hive")
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """Write a single DataFrame to one Parquet file."""
+    _require_pyarrow()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, compression="zstd")
+
+
+def read_frame(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Read `<path>.parquet` when available, otherwise `<path>.csv`.
+
+    `path` is given without suffix; `columns` projects the read in both cases.
+    """
+    parquet_path = path.with_suffix(".parquet")
+    if parquet_available() and parquet_path.exists():
+        return pq.read_table(parquet_path, columns=columns).to_pandas()
+    return pd.read_csv(path.with_suffix(".csv"), usecols=columns)
+
+
+def _with_partition_keys(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    out["region_code"] = out["region_code"].astype("string")
+    out["collected_date"] = out["collected_at"].astype("string").str.slice(0, 10)
+    return out
+
+
+def _stable_schema(schema):
+    # a column that is all-null in the first chunk must still accept values later
+    return pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema])
+
+
+def write_snapshot(chunks: Iterable[pd.DataFrame], root: Path = SNAPSHOT_DIR) -> int:
+    """Write snapshot chunks as a partitioned dataset and return the row count.
+
+    All chunks go through one streaming write, so each partition gets one file
+    as long as the chunks arrive ordered by region_code and collected_at.
+    The dataset is written next to `root` and moved into place at the end, so
+    readers never see a partially written dataset.
+    """
+    _require_pyarrow()
+    staging = root.with_name(root.name + ".tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    tables = (pa.Table.from_pandas(_with_partition_keys(c), preserve_index=False) for c in chunks if not c.empty)
+    first = next(tables, None)
+    total = 0
+    if first is not None:
+        schema = _stable_schema(first.schema)
+
+        def batches():
+            nonlocal total
+            for table in itertools.chain([first], tables):
+                total += table.num_rows
+                yield from table.cast(schema).to_batches()
+
+        ds.write_dataset(
+            batches(),
+            staging,
+            schema=schema,
+            format="parquet",
+            partitioning=_partitioning(),
+            basename_template="part-{i}.parquet",
+            # regions x days easily exceeds pyarrow's default cap of 1024
+            max_partitions=MAX_PARTITIONS,
+        )
+
+    if root.exists():
+        shutil.rmtree(root)
+    staging.rename(root)
+    return total
+
+
+def write_manifest(root: Path, token: str | None, rows: int) -> None:
+    """Record which snapshot version the dataset at `root` was exported from."""
+    (root / MANIFEST_NAME).write_text(json.dumps({"token": token, "rows": rows}), encoding="utf-8")
+
+
+def dataset_token(root: Path = SNAPSHOT_DIR) -> str | None:
+    """Snapshot version token of the dataset at `root`, None when unknown."""
+    try:
+        return json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8")).get("token")
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_dataset(root: Path = SNAPSHOT_DIR):
+    """The partitioned snapshot as a pyarrow dataset (nothing is read yet)."""
+    _require_pyarrow()
+    return ds.dataset(root, format="parquet", partitioning=_partitioning())
+
+
+def read_snapshot(
+    columns: list[str] | None = None,
+    region_codes: list[str] | None = None,
+    date_from: date | str | None = None,
+    date_to: date | str | None = None,
+    root: Path = SNAPSHOT_DIR,
+) -> pd.DataFrame:
+    """Read the partitioned snapshot with column projection and partition pruning."""
+    dataset = snapshot_dataset(root)
+
+    expr = None
+
+    def _and(cond):
+        return cond if expr is None else expr & cond
+
+    if region_codes:
+        expr = _and(ds.field("region_code").isin([str(c) for c in region_codes]))
+    if date_from:
+        expr = _and(ds.field("collected_date") >= str(date_from)[:10])
+    if date_to:
+        expr = _and(ds.field("collected_date") <= str(date_to)[:10])
+
+    table = dataset.to_table(columns=columns, filter=expr)
+    return table.to_pandas()
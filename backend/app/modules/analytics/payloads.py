@@ -0,0 +1,81 @@
+"""JSON payloads for the analytics API, computed once per snapshot version.
+
+The version token combines the active snapshot_versions id with the last build
+time (incremental builds update the live table in place). Payload bytes and
+their ETags are cached per process until the token changes. An ETag hashes
+the payload data only, so a rebuild that leaves a payload unchanged keeps
+its ETag and clients keep getting 304s; it is weak because the body's
+snapshot_version still differs.
+"""
+
+import hashlib
+import json
+import threading
+
+import pandas as pd
+
+from app.db.session import ReadSessionLocal
+from app.modules.analytics.aggregation_engine import compute_metrics
+from app.modules.analytics.histograms import price_histogram, sample_per_group
+from app.modules.analytics.loaders import load_market_snapshot
+from app.modules.analytics.pandas_metrics import brand_distribution
+from app.modules.analytics.snapshot_versions import snapshot_token
+
+PAYLOAD_NAMES = ("overview", "regions", "categories", "brands", "price-distribution")
+
+PAYLOAD_COLUMNS = [
+    "product_name",
+    "brand_name",
+    "region",
+    "region_code",
+    "category",
+    "price_value",
+    "price_per_l",
+    "price_per_kg",
+]
+
+_lock = threading.Lock()
+_cache: dict = {"token": None, "payloads": {}}
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def build_payloads(df: pd.DataFrame) -> dict[str, object]:
+    results = compute_metrics(df, ["overview", "by_region", "by_category"])
+    priced = df[df["price_value"].notna() & df["region"].notna()]
+    return {
+        "overview": results["overview"],
+        "regions": _records(results["by_region"]),
+        "categories": _records(results["by_category"]),
+        "brands": _records(brand_distribution(priced)),
+        "price-distribution": {
+            "bins": _records(price_histogram(df)),
+            "sample": _records(sample_per_group(df)),
+        },
+    }
+
+
+def _encode(token: str, payloads: dict[str, object]) -> dict[str, tuple[str, bytes]]:
+    encoded = {}
+    for name, data in payloads.items():
+        digest = hashlib.sha256(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+        body = json.dumps({"snapshot_version": token, "data": data}, ensure_ascii=False).encode("utf-8")
+        encoded[name] = (f'W/"{digest}"', body)
+    return encoded
+
+
+def get_payload(name: str) -> tuple[str, bytes]:
+    """Return (etag, json body) for a payload of the current snapshot version."""
+    if name not in PAYLOAD_NAMES:
+        raise KeyError(name)
+    with ReadSessionLocal() as db:
+        token = snapshot_token(db)
+    if _cache["token"] != token:
+        with _lock:
+            if _cache["token"] != token:
+                df = load_market_snapshot(columns=PAYLOAD_COLUMNS)
+                _cache["payloads"] = _encode(token, build_payloads(df))
+                _cache["token"] = token
+    return _cache["payloads"][name]
@@ -3,7 +3,7 @@ import pandas as pd
 
 
 def build_category_distribution_plot(df: pd.DataFrame, metric: str = "avg_price", categories: list[str] | None = None):
-    data = df.copy()
+    data = df
     if categories:
         lowered = {str(c).lower() for c in categories}
         data = data[data["category"].astype(str).str.lower().isin(lowered)]
@@ -0,0 +1,40 @@
+"""Largest-Triangle-Three-Buckets downsampling for line plots.
+
+LTTB keeps the first and last point and, from each of the remaining buckets,
+the point forming the largest triangle with the previously kept point and the
+mean of the next bucket. Peaks and dips survive, so a few thousand points look
+like the full series.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """Positions of the points LTTB keeps when reducing (x, y) to `threshold` points.
+
+    `x` must be sorted. Series at or below the threshold are returned whole.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the interior points; bucket b is [edges[b], edges[b + 1])
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x[: n - 1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y[: n - 1], edges[:-1]) / sizes
+    next_x = np.append(avg_x[1:], x[n - 1])
+    next_y = np.append(avg_y[1:], y[n - 1])
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs((x[a] - next_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[b + 1] = a
+    kept[-1] = n - 1
+    return kept
@@ -0,0 +1,118 @@
+"""Rendered Plotly JSON keyed by (plot, builder inputs, source version).
+
+The source version is a content hash of the analytics export a plot is built
+from (region_summary, category_summary, ...), so a figure only needs to be
+rendered again after run_pandas_mvp wrote different data. On-demand renders
+with user filters are memoized in-process under the same key.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from app.modules.analytics.parquet_store import parquet_available, read_frame
+from app.modules.analytics.plots.plot_registry import PLOTS
+
+ANALYTICS_DIR = Path(__file__).resolve().parents[4] / "data" / "analytics"
+
+PLOT_METRICS = ("avg_price", "min_price", "max_price", "product_count")
+
+MEMO_SIZE = 256
+
+_lock = threading.Lock()
+_memo: OrderedDict[str, str] = OrderedDict()
+_versions: dict[tuple, str] = {}
+_frames: dict[str, tuple[str, pd.DataFrame]] = {}
+
+
+def source_path(source: str, base_dir: Path = ANALYTICS_DIR) -> Path:
+    """The file read_frame would load for `source`."""
+    parquet_path = base_dir / f"{source}.parquet"
+    if parquet_available() and parquet_path.exists():
+        return parquet_path
+    return base_dir / f"{source}.csv"
+
+
+def source_version(source: str, base_dir: Path = ANALYTICS_DIR) -> str:
+    """Content hash of a source export; rehashed only when its mtime or size changes."""
+    path = source_path(source, base_dir)
+    stat = path.stat()
+    stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+    version = _versions.get(stamp)
+    if version is None:
+        digest = hashlib.sha256()
+        with path.open("rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        version = digest.hexdigest()[:16]
+        _versions[stamp] = version
+    return version
+
+
+def normalize_params(name: str, params: dict | None) -> dict:
+    """Validate builder inputs against the registry and put them in canonical form.
+
+    Empty values are dropped and list filters are de-duplicated and sorted, so
+    equivalent requests share one cache entry.
+    """
+    spec = PLOTS[name]
+    out = {}
+    for key, value in (params or {}).items():
+        if value is None or value == "" or value == []:
+            continue
+        if key not in spec["inputs"]:
+            raise ValueError(f"Plot {name} does not accept '{key}'")
+        if key == "metric" and value not in PLOT_METRICS:
+            raise ValueError(f"Unknown metric '{value}', expected one of: {', '.join(PLOT_METRICS)}")
+        if isinstance(value, (list, tuple)):
+            value = sorted({str(v) for v in value}, key=str.lower)
+        out[key] = value
+    return out
+
+
+def cache_key(name: str, params: dict, version: str) -> str:
+    payload = json.dumps({"plot": name, "params": params, "source": version}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def plot_key(name: str, params: dict | None = None, base_dir: Path = ANALYTICS_DIR) -> tuple[str, dict]:
+    """Return (cache key, normalized params) without rendering anything."""
+    params = normalize_params(name, params)
+    return cache_key(name, params, source_version(PLOTS[name]["source"], base_dir)), params
+
+
+def render_plot(name: str, params: dict | None = None, base_dir: Path = ANALYTICS_DIR) -> str:
+    """Load the plot's source and return the figure JSON (process-pool safe)."""
+    spec = PLOTS[name]
+    df = read_frame(base_dir / spec["source"], columns=spec.get("columns"))
+    return spec["builder"](df, **(params or {})).to_json()
+
+
+def _source_frame(name: str, base_dir: Path) -> pd.DataFrame:
+    spec = PLOTS[name]
+    version = source_version(spec["source"], base_dir)
+    cached = _frames.get(spec["source"])
+    if cached is None or cached[0] != version:
+        cached = (version, read_frame(base_dir / spec["source"], columns=spec.get("columns")))
+        _frames[spec["source"]] = cached
+    return cached[1]
+
+
+def get_plot(name: str, params: dict | None = None, base_dir: Path = ANALYTICS_DIR) -> tuple[str, str]:
+    """Return (cache key, figure JSON), rendering only on a memo miss."""
+    key, params = plot_key(name, params, base_dir)
+    with _lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return key, _memo[key]
+
+    body = PLOTS[name]["builder"](_source_frame(name, base_dir), **params).to_json()
+    with _lock:
+        _memo[key] = body
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return key, body
@@ -7,15 +7,19 @@ PLOTS = {
         "label": "Průměrná cena podle regionu",
         "inputs": ["metric", "regions"],
         "builder": build_price_by_region_plot,
+        "source": "region_summary",
     },
     "category_distribution": {
         "label": "Ceny podle kategorií",
         "inputs": ["metric", "categories"],
         "builder": build_category_distribution_plot,
+        "source": "category_summary",
     },
     "price_trend": {
         "label": "Cenový trend (sekvenční)",
-        "inputs": ["category", "region"],
+        "inputs": ["category", "region", "max_points", "x_min", "x_max"],
         "builder": build_price_trend_plot,
+        "source": "price_distribution",
+        "columns": ["region", "category", "price_value"],
     },
 }
@@ -1,12 +1,15 @@
 import plotly.express as px
 import pandas as pd
 
+from app.modules.regions.aliases import load_region_aliases
+
 
 def build_price_by_region_plot(df: pd.DataFrame, metric: str = "avg_price", regions: list[str] | None = None):
-    data = df.copy()
+    data = df
     if regions:
-        lowered = {str(r).lower() for r in regions}
-        data = data[data["region"].astype(str).str.lower().isin(lowered)]
+        aliases = load_region_aliases()
+        wanted = {aliases.key(r) for r in regions}
+        data = data[aliases.keys(data["region"]).isin(wanted)]
     fig = px.bar(
         data,
         x="region",
@@ -1,14 +1,42 @@
 import plotly.express as px
 import pandas as pd
 
+from app.modules.analytics.plots.downsample import lttb_indices
 
-def build_price_trend_plot(df: pd.DataFrame, category: str | None = None, region: str | None = None):
-    data = df.copy()
+# Point budget per colour series; request a narrower x range for more detail.
+DEFAULT_MAX_POINTS = 2000
+
+
+def _downsample(data: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    parts = []
+    for _, series in data.groupby("category", dropna=False, observed=True, sort=False):
+        keep = lttb_indices(series["sequence"], series["price_value"], max_points)
+        parts.append(series.iloc[keep])
+    if not parts:
+        return data
+    return pd.concat(parts).sort_values("sequence", kind="stable")
+
+
+def build_price_trend_plot(
+    df: pd.DataFrame,
+    category: str | None = None,
+    region: str | None = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+    x_min: float | None = None,
+    x_max: float | None = None,
+):
+    # filtering returns a new frame, the input is never mutated
+    data = df
     if category:
         data = data[data["category"].astype(str).str.lower() == str(category).lower()]
     if region:
         data = data[data["region"].astype(str).str.lower() == str(region).lower()]
     data = data.reset_index().rename(columns={"index": "sequence"})
+    if x_min is not None:
+        data = data[data["sequence"] >= x_min]
+    if x_max is not None:
+        data = data[data["sequence"] <= x_max]
+    data = _downsample(data, max_points)
     fig = px.line(
         data,
         x="sequence",
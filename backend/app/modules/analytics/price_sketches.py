@@ -0,0 +1,128 @@
+"""Persisted price quantile sketches per region and per category.
+
+Sketches are built chunk by chunk from market_snapshot, merged with new prices
+by the product parser, and answer p50/p90/p99 without rescanning the table.
+"""
+
+import argparse
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import delete, insert, select, tuple_
+
+from app.db.session import SessionLocal, read_engine
+from app.modules.analytics.models import market_snapshot, price_sketches
+from app.modules.analytics.quantile_sketch import TDigest
+
+# sketch dimension -> market_snapshot column
+DIMENSIONS = {"region": "region", "category": "category"}
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+DEFAULT_CHUNK_SIZE = 100000
+
+SketchKey = tuple[str, str]
+
+
+def sketch_key(dimension: str, value) -> SketchKey:
+    return dimension, "" if value is None or pd.isna(value) else str(value)
+
+
+def add_chunk(digests: dict[SketchKey, TDigest], chunk: pd.DataFrame) -> None:
+    """Fold one chunk of snapshot rows into per-dimension digests."""
+    priced = chunk[chunk["price_value"].notna()]
+    for dimension, column in DIMENSIONS.items():
+        for value, prices in priced.groupby(column, dropna=False, observed=True)["price_value"]:
+            key = sketch_key(dimension, value)
+            digests.setdefault(key, TDigest()).update(prices.to_numpy())
+
+
+def _write(db, digests: dict[SketchKey, TDigest]) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "dimension": dimension,
+            "key": key,
+            "sketch": digest.to_json(),
+            "price_count": int(digest.count),
+            "updated_at": now,
+        }
+        for (dimension, key), digest in digests.items()
+    ]
+    if rows:
+        db.execute(insert(price_sketches), rows)
+
+
+def rebuild_from_snapshot(db, chunksize: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Recompute every sketch from market_snapshot, one chunk at a time."""
+    digests: dict[SketchKey, TDigest] = {}
+    stmt = select(market_snapshot.c.region, market_snapshot.c.category, market_snapshot.c.price_value)
+    with read_engine.connect() as conn:
+        for chunk in pd.read_sql(stmt, conn, chunksize=chunksize):
+            add_chunk(digests, chunk)
+
+    db.execute(delete(price_sketches))
+    _write(db, digests)
+    return len(digests)
+
+
+def load_sketches(db, keys: list[SketchKey] | None = None) -> dict[SketchKey, TDigest]:
+    stmt = select(price_sketches.c.dimension, price_sketches.c.key, price_sketches.c.sketch)
+    if keys is not None:
+        if not keys:
+            return {}
+        stmt = stmt.where(tuple_(price_sketches.c.dimension, price_sketches.c.key).in_(keys))
+    return {(dim, key): TDigest.from_json(sketch) for dim, key, sketch in db.execute(stmt)}
+
+
+def merge_into(db, new_digests: dict[SketchKey, TDigest]) -> int:
+    """Merge freshly built digests into the persisted ones (read-merge-write per key)."""
+    if not new_digests:
+        return 0
+    keys = list(new_digests)
+    merged = load_sketches(db, keys)
+    for key, digest in new_digests.items():
+        if key in merged:
+            merged[key].merge(digest)
+        else:
+            merged[key] = digest
+    db.execute(delete(price_sketches).where(tuple_(price_sketches.c.dimension, price_sketches.c.key).in_(keys)))
+    _write(db, merged)
+    return len(keys)
+
+
+def percentiles(db, dimension: str, quantiles=DEFAULT_QUANTILES) -> pd.DataFrame:
+    """Return [dimension, product_count, p50, p90, p99, ...] for every key of a dimension."""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown sketch dimension: {dimension}")
+    stmt = select(price_sketches.c.key, price_sketches.c.price_count, price_sketches.c.sketch).where(
+        price_sketches.c.dimension == dimension
+    )
+    rows = []
+    for key, count, sketch in db.execute(stmt):
+        digest = TDigest.from_json(sketch)
+        row = {dimension: key or None, "product_count": count}
+        for q in quantiles:
+            row[f"p{round(q * 100):g}"] = digest.quantile(q)
+        rows.append(row)
+    columns = [dimension, "product_count"] + [f"p{round(q * 100):g}" for q in quantiles]
+    return pd.DataFrame(rows, columns=columns).sort_values(dimension, na_position="last", ignore_index=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain price quantile sketches.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all sketches from market_snapshot.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Snapshot rows per chunk.")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.rebuild:
+            keys = rebuild_from_snapshot(db, chunksize=args.chunk_size)
+            db.commit()
+            print(f"price_sketches rebuilt: {keys} keys")
+        for dimension in DIMENSIONS:
+            print(percentiles(db, dimension).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
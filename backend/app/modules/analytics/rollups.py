@@ -0,0 +1,183 @@
+"""Price rollups keyed by (region, region_code, category, brand, day).
+
+Each row holds count, sum, min, max and sum of squares of price_value, which
+are all mergeable, so rows are updated incrementally by the product parser and
+summaries are answered from this small table instead of the full snapshot.
+"""
+
+import argparse
+from collections.abc import Iterable
+
+import pandas as pd
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.session import SessionLocal
+from app.modules.analytics.models import market_snapshot, price_rollups
+
+KEY_COLUMNS = ["region", "region_code", "category", "brand", "day"]
+
+RollupKey = tuple[str, str, str, str, str]
+
+
+def rollup_key(region, region_code, category, brand, day) -> RollupKey:
+    """Build a rollup key; missing values become ''."""
+    return tuple(str(v) if v is not None else "" for v in (region, region_code, category, brand, day))
+
+
+def add_price(deltas: dict[RollupKey, dict], key: RollupKey, price: float | None) -> None:
+    """Fold one price into the in-memory deltas for key."""
+    if price is None:
+        return
+    price = float(price)
+    acc = deltas.get(key)
+    if acc is None:
+        deltas[key] = {
+            "price_count": 1,
+            "price_sum": price,
+            "price_min": price,
+            "price_max": price,
+            "price_sumsq": price * price,
+        }
+        return
+    acc["price_count"] += 1
+    acc["price_sum"] += price
+    acc["price_min"] = min(acc["price_min"], price)
+    acc["price_max"] = max(acc["price_max"], price)
+    acc["price_sumsq"] += price * price
+
+
+def _merge_stmt(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(price_rollups)
+        least, greatest = func.least, func.greatest
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(price_rollups)
+        # SQLite's multi-argument min()/max() are scalar functions
+        least, greatest = func.min, func.max
+    else:
+        raise NotImplementedError(f"price_rollups upsert not supported for dialect {dialect}")
+
+    c = price_rollups.c
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={
+            "price_count": c.price_count + excluded.price_count,
+            "price_sum": c.price_sum + excluded.price_sum,
+            "price_min": least(c.price_min, excluded.price_min),
+            "price_max": greatest(c.price_max, excluded.price_max),
+            "price_sumsq": c.price_sumsq + excluded.price_sumsq,
+        },
+    )
+
+
+def apply_deltas(db, deltas: dict[RollupKey, dict]) -> int:
+    """Merge deltas into price_rollups (one executemany). Returns the number of keys touched."""
+    if not deltas:
+        return 0
+    rows = [{**dict(zip(KEY_COLUMNS, key)), **acc} for key, acc in deltas.items()]
+    db.execute(_merge_stmt(db), rows)
+    return len(rows)
+
+
+def rebuild_from_snapshot(db) -> int:
+    """Recompute all rollups from market_snapshot with one INSERT ... SELECT."""
+    db.execute(delete(price_rollups))
+    s = market_snapshot.c
+    keys = [
+        func.coalesce(s.region, ""),
+        func.coalesce(s.region_code, ""),
+        func.coalesce(s.category, ""),
+        func.coalesce(s.brand_name, ""),
+        func.substr(s.collected_at, 1, 10),
+    ]
+    stmt = (
+        select(
+            *keys,
+            func.count(s.price_value),
+            func.sum(s.price_value),
+            func.min(s.price_value),
+            func.max(s.price_value),
+            func.sum(s.price_value * s.price_value),
+        )
+        .where(s.price_value.isnot(None))
+        .group_by(*keys)
+    )
+    columns = KEY_COLUMNS + ["price_count", "price_sum", "price_min", "price_max", "price_sumsq"]
+    result = db.execute(insert(price_rollups).from_select(columns, stmt))
+    return result.rowcount or 0
+
+
+def _summary(db, keys: Iterable[str]) -> pd.DataFrame:
+    r = price_rollups.c
+    key_cols = [r[k] for k in keys]
+    count = func.sum(r.price_count)
+    stmt = (
+        select(
+            *key_cols,
+            count.label("product_count"),
+            (func.sum(r.price_sum) / count).label("avg_price"),
+            func.min(r.price_min).label("min_price"),
+            func.max(r.price_max).label("max_price"),
+        )
+        .group_by(*key_cols)
+    )
+    df = pd.DataFrame(db.execute(stmt).mappings().all(), columns=[*keys, "product_count", "avg_price", "min_price", "max_price"])
+    # '' is the stored form of a missing key value (region itself is '' in the snapshot)
+    for key in keys:
+        if key != "region":
+            df[key] = df[key].replace("", None)
+    return df.sort_values(list(keys), na_position="last", ignore_index=True)
+
+
+def region_summary(db) -> pd.DataFrame:
+    """Same shape as aggregations.aggregate_by_region, answered from the rollups."""
+    return _summary(db, ["region", "region_code"])
+
+
+def category_summary(db) -> pd.DataFrame:
+    """Same shape as aggregations.aggregate_by_category, answered from the rollups."""
+    return _summary(db, ["category"])
+
+
+def overview(db) -> dict:
+    """Same keys as aggregations.compute_overview_metrics, answered from the rollups."""
+    r = price_rollups.c
+    total, price_sum, price_min, price_max, regions = db.execute(
+        select(
+            func.sum(r.price_count),
+            func.sum(r.price_sum),
+            func.min(r.price_min),
+            func.max(r.price_max),
+            func.count(distinct(r.region)),
+        )
+    ).one()
+    categories = db.execute(select(func.count(distinct(r.category))).where(r.category != "")).scalar_one()
+    total = int(total or 0)
+    return {
+        "total_products": total,
+        "distinct_regions": int(regions or 0) if total else 0,
+        "distinct_categories": int(categories or 0) if total else 0,
+        "avg_price": float(price_sum / total) if total else None,
+        "min_price": float(price_min) if total else None,
+        "max_price": float(price_max) if total else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain price_rollups.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all rollups from market_snapshot.")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.rebuild:
+            keys = rebuild_from_snapshot(db)
+            db.commit()
+            print(f"price_rollups rebuilt: {keys} keys")
+        print(overview(db))
+
+
+if __name__ == "__main__":
+    main()
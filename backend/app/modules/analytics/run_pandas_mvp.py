@@ -1,37 +1,105 @@
+import argparse
 import logging
 from pathlib import Path
 
 import pandas as pd
 
-from app.modules.analytics.aggregations import (
-    aggregate_by_category,
-    aggregate_by_region,
-    compute_overview_metrics,
-    price_distribution,
-)
-from app.modules.analytics.exporters import save_csv, save_json
+from app.db.instrumentation import print_sql_summary
+from app.db.session import SessionLocal
+from app.modules.analytics import outliers, rollups
+from app.modules.analytics.aggregation_engine import compute_metrics
+from app.modules.analytics.exporters import save_csv, save_json, save_parquet
+from app.modules.analytics.histograms import DEFAULT_BINS, DEFAULT_SAMPLE_SIZE, price_histogram, sample_per_group
 from app.modules.analytics.loaders import load_market_snapshot
 
 
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_COLUMNS = ["region", "region_code", "category", "price_value", "price_per_l", "price_per_kg"]
+
+OUT_DIR = Path(__file__).resolve().parents[3] / "data" / "analytics"
+
 
 def main() -> None:
-    df = load_market_snapshot()
-    print(f"Snapshot rows: {len(df)}")
+    parser = argparse.ArgumentParser(description="Compute analytics MVP outputs from market_snapshot.")
+    parser.add_argument(
+        "--from-rollups",
+        action="store_true",
+        help="Take overview/region/category summaries from price_rollups instead of scanning the snapshot.",
+    )
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Histogram bins per (region, category).")
+    parser.add_argument(
+        "--adaptive-bins",
+        action="store_true",
+        help="Use per-group quantile bin edges instead of shared equal-width edges.",
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help="Drill-down sample rows per (region, category) written to price_distribution.",
+    )
+    parser.add_argument(
+        "--outliers",
+        choices=["none", *outliers.METHODS],
+        default="none",
+        help="Per (category, region) price outlier stage applied before aggregation.",
+    )
+    parser.add_argument(
+        "--outlier-action",
+        choices=outliers.ACTIONS,
+        default="drop",
+        help="Drop outliers, or only flag and count them (written to outlier_summary.csv).",
+    )
+    parser.add_argument("--outlier-k", type=float, default=None, help="Bound multiplier (default 1.5 IQR / 3.5 MAD).")
+    args = parser.parse_args()
+    if args.from_rollups and args.outliers != "none" and args.outlier_action == "drop":
+        parser.error("--from-rollups summaries are pre-aggregated; outliers can only be flagged there")
 
-    overview = compute_overview_metrics(df)
-    by_region = aggregate_by_region(df)
-    by_category = aggregate_by_category(df)
-    distribution = price_distribution(df)
+    if args.from_rollups:
+        with SessionLocal() as db:
+            overview = rollups.overview(db)
+            by_region = rollups.region_summary(db)
+            by_category = rollups.category_summary(db)
+        df = load_market_snapshot(columns=["region", "category", "price_value"])
+    else:
+        df = load_market_snapshot(columns=SNAPSHOT_COLUMNS)
+    outlier_summary = None
+    if args.outliers != "none":
+        df, outlier_summary = outliers.filter_outliers(
+            df, method=args.outliers, action=args.outlier_action, k=args.outlier_k
+        )
+        verb = "dropped" if args.outlier_action == "drop" else "flagged"
+        print(f"Price outliers ({args.outliers}): {int(outlier_summary['outliers'].sum())} rows {verb}")
+    if not args.from_rollups:
+        results = compute_metrics(df, ["overview", "by_region", "by_category"])
+        overview = results["overview"]
+        by_region = results["by_region"]
+        by_category = results["by_category"]
+    histogram = price_histogram(df, bins=args.bins, adaptive=args.adaptive_bins)
+    distribution = sample_per_group(df, size=args.sample_size)
+    print(f"Snapshot rows: {len(df)}")
 
-    out_dir = Path(__file__).resolve().parents[3] / "data" / "analytics"
+    out_dir = OUT_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
 
     save_json(overview, out_dir / "overview_metrics.json")
     save_csv(by_region, out_dir / "region_summary.csv")
     save_csv(by_category, out_dir / "category_summary.csv")
+    save_csv(histogram, out_dir / "price_histogram.csv")
     save_csv(distribution, out_dir / "price_distribution.csv")
+    if outlier_summary is not None:
+        save_csv(outlier_summary, out_dir / "outlier_summary.csv")
+    # Parquet copies are what the backend readers load; CSV stays for the frontend/BI tools
+    for name, frame in (
+        ("region_summary", by_region),
+        ("category_summary", by_category),
+        ("price_histogram", histogram),
+        ("price_distribution", distribution),
+    ):
+        if not save_parquet(frame, out_dir / f"{name}.parquet"):
+            logger.info("pyarrow not installed; skipped Parquet output")
+            break
 
     # stdout summary
     def safe_text(val: object) -> str:
@@ -64,3 +132,4 @@ def main() -> None:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     main()
+    print_sql_summary()
@@ -0,0 +1,175 @@
+"""Versioned market_snapshot tables swapped in by rename.
+
+Full builds write into market_snapshot__v{n}. The swap renames the live table
+to its versioned name and the shadow table to market_snapshot in one short
+transaction, so readers never see an empty or half-built snapshot and a
+failed swap leaves everything as it was. The previous version is kept for
+rollback; older ones are dropped.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Index, MetaData, Table, func, insert, inspect, select, text, update
+
+from app.modules.analytics.models import market_snapshot, snapshot_build_state, snapshot_versions
+
+LIVE_TABLE = market_snapshot.name
+
+
+def version_table_name(version: int) -> str:
+    return f"{LIVE_TABLE}__v{version}"
+
+
+def _rename(db, old: str, new: str) -> None:
+    quote = db.get_bind().dialect.identifier_preparer.quote
+    db.execute(text(f"ALTER TABLE {quote(old)} RENAME TO {quote(new)}"))
+
+
+def _drop(db, name: str) -> None:
+    quote = db.get_bind().dialect.identifier_preparer.quote
+    db.execute(text(f"DROP TABLE IF EXISTS {quote(name)}"))
+
+
+def _begin(db) -> None:
+    """Open the database transaction now, before any DDL.
+
+    pysqlite only issues BEGIN ahead of INSERT/UPDATE/DELETE, so DROP and
+    ALTER TABLE ... RENAME would otherwise run in autocommit and a failed swap
+    could leave no market_snapshot, or versions out of step with the tables.
+    SQLite DDL is transactional once it runs inside an explicit BEGIN.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN")
+
+
+def get_version(db, status: str):
+    stmt = select(snapshot_versions).where(snapshot_versions.c.status == status).order_by(snapshot_versions.c.id.desc())
+    return db.execute(stmt).mappings().first()
+
+
+def active_version(db) -> int | None:
+    row = get_version(db, "active")
+    return row["id"] if row else None
+
+
+def snapshot_token(db) -> str:
+    """Identifies the live snapshot contents: active version plus last build time.
+
+    Incremental builds update the live table in place, so the version id
+    alone does not change with them.
+    """
+    version = active_version(db)
+    built_at = db.execute(select(snapshot_build_state.c.built_at).where(snapshot_build_state.c.id == 1)).scalar()
+    return f"v{version or 0}:{built_at.isoformat() if built_at else 'none'}"
+
+
+def _register_legacy_table(db) -> None:
+    """Record a live table built before versioning so it can be kept as 'previous'."""
+    if get_version(db, "active") is not None:
+        return
+    if not inspect(db.connection()).has_table(LIVE_TABLE):
+        return
+    row_count = db.execute(select(func.count()).select_from(market_snapshot)).scalar_one()
+    next_id = (db.execute(select(func.max(snapshot_versions.c.id))).scalar() or 0) + 1
+    db.execute(
+        insert(snapshot_versions).values(
+            id=next_id,
+            table_name=version_table_name(next_id),
+            status="active",
+            mode="legacy",
+            row_count=row_count,
+            created_at=datetime.utcnow(),
+            activated_at=datetime.utcnow(),
+        )
+    )
+
+
+def create_shadow_table(db) -> tuple[int, Table]:
+    """Create an empty market_snapshot__v{n} with the live schema and return (n, table)."""
+    _register_legacy_table(db)
+    version = (db.execute(select(func.max(snapshot_versions.c.id))).scalar() or 0) + 1
+    name = version_table_name(version)
+
+    shadow = market_snapshot.to_metadata(MetaData(), name=name)
+    # index names are global per schema: replace the copies to_metadata() made
+    # under the live names with ones that carry the version too
+    shadow.indexes.clear()
+    for index in market_snapshot.indexes:
+        columns = [shadow.c[column.name] for column in index.columns]
+        Index(index.name.replace(LIVE_TABLE, name, 1), *columns, unique=index.unique)
+    conn = db.connection()
+    shadow.drop(conn, checkfirst=True)
+    shadow.create(conn)
+
+    db.execute(
+        insert(snapshot_versions).values(
+            id=version,
+            table_name=name,
+            status="building",
+            created_at=datetime.utcnow(),
+        )
+    )
+    return version, shadow
+
+
+def swap_in(db, version: int, *, row_count: int, build_seconds: float, mode: str) -> None:
+    """Make version live; the current live table becomes 'previous', older ones are dropped.
+
+    Runs inside the caller's transaction; commit to publish, roll back to
+    leave the live table and versions as they were.
+    """
+    _begin(db)
+    previous = get_version(db, "previous")
+    if previous is not None:
+        _drop(db, previous["table_name"])
+        db.execute(update(snapshot_versions).where(snapshot_versions.c.id == previous["id"]).values(status="retired"))
+
+    current = get_version(db, "active")
+    if current is not None:
+        _rename(db, LIVE_TABLE, current["table_name"])
+        db.execute(update(snapshot_versions).where(snapshot_versions.c.id == current["id"]).values(status="previous"))
+
+    _rename(db, version_table_name(version), LIVE_TABLE)
+    db.execute(
+        update(snapshot_versions)
+        .where(snapshot_versions.c.id == version)
+        .values(
+            status="active",
+            mode=mode,
+            row_count=row_count,
+            build_seconds=build_seconds,
+            activated_at=datetime.utcnow(),
+        )
+    )
+
+
+def update_active_row_count(db, row_count: int) -> None:
+    """Keep the active version's row count current after an in-place incremental build."""
+    db.execute(update(snapshot_versions).where(snapshot_versions.c.status == "active").values(row_count=row_count))
+
+
+def discard(db, version: int) -> None:
+    """Drop a shadow table whose build failed."""
+    _begin(db)
+    _drop(db, version_table_name(version))
+    db.execute(update(snapshot_versions).where(snapshot_versions.c.id == version).values(status="retired"))
+
+
+def rollback(db) -> int:
+    """Swap the previous version back in; the rolled-back one becomes 'previous'. Returns the new active id."""
+    _begin(db)
+    current = get_version(db, "active")
+    previous = get_version(db, "previous")
+    if current is None or previous is None:
+        raise RuntimeError("No previous market_snapshot version to roll back to")
+
+    _rename(db, LIVE_TABLE, current["table_name"])
+    _rename(db, previous["table_name"], LIVE_TABLE)
+    db.execute(update(snapshot_versions).where(snapshot_versions.c.id == current["id"]).values(status="previous"))
+    db.execute(
+        update(snapshot_versions)
+        .where(snapshot_versions.c.id == previous["id"])
+        .values(status="active", activated_at=datetime.utcnow())
+    )
+    return previous["id"]
@@ -0,0 +1,244 @@
+"""Deterministic synthetic source data for benchmarks and load tests.
+
+Fills regions, companies_discovered, retail_offers and retail_products_parsed
+with plausible dairy offers at a configurable scale. The same seed and sizes
+always produce the same rows. A small share of offers carries raw lr codes or
+unknown region names, and a small share has scrape-error prices, so the
+snapshot builder and the aggregations exercise their slow paths too.
+
+    python -m app.modules.analytics.synthetic_data --db data/synthetic.db --offers 1000000
+"""
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.migrations import apply_migrations
+from app.modules.companies.models_discovered import CompanyDiscovered
+from app.modules.regions.models import Region
+from app.modules.retail.parsed_models import retail_products_parsed
+from app.modules.retail.writer import retail_offers
+
+# name, lr code, centre lat, centre lon
+REGIONS = [
+    ("Москва", "213", 55.7558, 37.6173),
+    ("Санкт-Петербург", "2", 59.9386, 30.3141),
+    ("Московская область", "1", 55.5043, 38.0353),
+    ("Ленинградская область", "10174", 60.0793, 31.8927),
+    ("Тверская область", "10819", 56.8587, 35.9176),
+    ("Ярославская область", "10841", 57.6261, 39.8845),
+    ("Владимирская область", "10658", 56.1290, 40.4066),
+    ("Калужская область", "10693", 54.5293, 36.2754),
+    ("Тульская область", "10832", 54.1931, 37.6173),
+    ("Рязанская область", "10776", 54.6269, 39.6916),
+    ("Нижегородская область", "11079", 56.3269, 44.0059),
+    ("Республика Татарстан", "11119", 55.7963, 49.1088),
+    ("Краснодарский край", "10995", 45.0355, 38.9753),
+    ("Ростовская область", "11029", 47.2357, 39.7015),
+    ("Воронежская область", "10672", 51.6720, 39.1843),
+    ("Самарская область", "11131", 53.1959, 50.1002),
+    ("Свердловская область", "11162", 56.8389, 60.6057),
+    ("Челябинская область", "11225", 55.1644, 61.4368),
+    ("Новосибирская область", "11316", 55.0084, 82.9357),
+    ("Красноярский край", "11309", 56.0153, 92.8932),
+    ("Республика Башкортостан", "11111", 54.7388, 55.9721),
+    ("Пермский край", "11108", 58.0105, 56.2502),
+    ("Алтайский край", "11235", 53.3548, 83.7698),
+    ("Омская область", "11318", 54.9885, 73.3242),
+]
+
+# product type, median pack price (RUB), pack size in ml (liquids) or g
+CATEGORIES = [
+    ("молоко", 95.0, "ml", [900, 930, 1000, 1400]),
+    ("кефир", 90.0, "ml", [450, 900, 930, 1000]),
+    ("ряженка", 85.0, "ml", [450, 500, 900]),
+    ("йогурт", 65.0, "g", [110, 130, 270, 290]),
+    ("сметана", 110.0, "g", [180, 300, 315, 400]),
+    ("творог", 140.0, "g", [180, 200, 300, 400]),
+    ("сыр", 260.0, "g", [150, 200, 250, 400]),
+    ("масло", 210.0, "g", [150, 180, 200]),
+    ("сливки", 120.0, "ml", [200, 250, 500]),
+]
+
+BRANDS = [
+    "Простоквашино",
+    "Домик в деревне",
+    "Веселый молочник",
+    "Агуша",
+    "Parmalat",
+    "Савушкин",
+    "Вкуснотеево",
+    "Экомилк",
+    "Брест-Литовск",
+    "Валио",
+    "Село Зеленое",
+    "Братья Чебурашкины",
+    "Молочный знак",
+    "Любимый",
+    "Galbani",
+]
+
+SOURCES = ["wildberries", "yandex_market", "ozon"]
+
+PACKAGES = ["пакет", "бутылка", "тетрапак", "стакан", "пачка"]
+
+FAT_PERCENTS = [0.5, 1.0, 1.5, 2.5, 3.2, 3.5, 5.0, 9.0, 15.0, 20.0, 72.5, 82.5]
+
+# pack sizes padded to a rectangle so they can be drawn with one fancy index
+PACK_SIZES = np.array([(c[3] * 4)[:4] for c in CATEGORIES])
+
+START = datetime(2024, 1, 1)
+
+
+def create_schema(engine) -> None:
+    """Create every table the analytics pipeline reads from in an empty SQLite database."""
+    apply_migrations(engine)
+    Base.metadata.create_all(engine)
+
+
+def _regions(rng: np.random.Generator, size: int) -> np.ndarray:
+    names = np.array([r[0] for r in REGIONS] + [r[1] for r in REGIONS] + ["Неизвестный регион"], dtype=object)
+    n = len(REGIONS)
+    # ~90% names, ~9% raw lr codes, ~1% unresolvable
+    weights = np.r_[np.full(n, 0.90 / n), np.full(n, 0.09 / n), 0.01]
+    return rng.choice(names, size=size, p=weights)
+
+
+def offer_batch(rng: np.random.Generator, start_id: int, size: int, days: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """One batch of (retail_offers rows, retail_products_parsed rows)."""
+    ids = np.arange(start_id, start_id + size)
+    cat_idx = rng.integers(0, len(CATEGORIES), size)
+    medians = np.array([c[1] for c in CATEGORIES])[cat_idx]
+    prices = np.round(medians * rng.lognormal(0.0, 0.25, size), 2)
+    # scrape errors such as concatenated digit groups
+    broken = rng.random(size) < 0.002
+    prices[broken] = prices[broken] * 1000
+    sizes = PACK_SIZES[cat_idx, rng.integers(0, PACK_SIZES.shape[1], size)]
+    is_liquid = np.array([c[2] == "ml" for c in CATEGORIES])[cat_idx]
+    categories = np.array([c[0] for c in CATEGORIES], dtype=object)[cat_idx]
+    brands = rng.choice(np.array(BRANDS, dtype=object), size)
+    units = np.where(is_liquid, "мл", "г")
+    names = pd.Series(categories).str.capitalize() + " «" + brands + "» " + sizes.astype(str) + " " + units
+    regions = _regions(rng, size)
+    sources = rng.choice(np.array(SOURCES, dtype=object), size)
+    collected = pd.Timestamp(START) + pd.to_timedelta(rng.integers(0, days * 86400, size), unit="s")
+    # same text form SQLAlchemy's SQLite DateTime writes
+    collected = collected.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    offers = pd.DataFrame(
+        {
+            "id": ids,
+            "company_id": None,
+            "source": sources,
+            "source_item_id": ids.astype(str),
+            "region": regions,
+            "product_name": names,
+            "price_value": prices,
+            "price_currency": "RUB",
+            "collected_at": collected,
+        }
+    )
+    parsed = pd.DataFrame(
+        {
+            "id": ids,
+            "retail_offer_id": ids,
+            "raw_name": names,
+            "brand": brands,
+            "product_type": categories,
+            "flavor": None,
+            "fat_percent": rng.choice(FAT_PERCENTS, size),
+            "package_type": rng.choice(np.array(PACKAGES, dtype=object), size),
+            "weight_g": np.where(is_liquid, None, sizes),
+            "volume_ml": np.where(is_liquid, sizes, None),
+            "region": regions,
+            "source": sources,
+            "parsed_at": collected,
+        }
+    )
+    return offers, parsed
+
+
+def company_rows(rng: np.random.Generator, size: int) -> pd.DataFrame:
+    idx = rng.integers(0, len(REGIONS), size)
+    lat = np.array([r[2] for r in REGIONS])[idx] + rng.normal(0.0, 0.6, size)
+    lon = np.array([r[3] for r in REGIONS])[idx] + rng.normal(0.0, 1.0, size)
+    # the 2GIS search region, which is sometimes a neighbour of the company's real one
+    searched = np.where(rng.random(size) < 0.1, (idx + 1) % len(REGIONS), idx)
+    companies = pd.DataFrame(
+        {
+            "source": "2gis",
+            "external_id": [f"syn-{i}" for i in range(size)],
+            "name": [f"Молочный завод №{i}" for i in range(size)],
+            "country": "RU",
+            "region": np.array([r[0] for r in REGIONS], dtype=object)[searched],
+            "lat": np.round(lat, 6),
+            "lon": np.round(lon, 6),
+            "query": "молочный завод",
+            "discovered_at": START.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        }
+    )
+    return companies
+
+
+def _insert_frame(db, table, df: pd.DataFrame) -> None:
+    # plain DBAPI executemany over tuples: several times faster than Core with dicts at this volume
+    columns = ", ".join(df.columns)
+    params = ", ".join("?" * len(df.columns))
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    db.connection().connection.executemany(f"INSERT INTO {table.name} ({columns}) VALUES ({params})", rows)
+
+
+def generate(db, offers: int, companies: int, seed: int = 0, days: int = 90, batch_size: int = 50_000) -> dict[str, int]:
+    """Insert synthetic rows into an empty SQLite database and return per-table counts."""
+    rng = np.random.default_rng(seed)
+    db.execute(
+        insert(Region.__table__),
+        [
+            {"id": i + 1, "name": name, "country": "RU", "center_lat": lat, "center_lon": lon}
+            for i, (name, _, lat, lon) in enumerate(REGIONS)
+        ],
+    )
+    _insert_frame(db, CompanyDiscovered.__table__, company_rows(rng, companies))
+    for start in range(0, offers, batch_size):
+        size = min(batch_size, offers - start)
+        offer_frame, parsed_frame = offer_batch(rng, start + 1, size, days)
+        _insert_frame(db, retail_offers, offer_frame)
+        _insert_frame(db, retail_products_parsed, parsed_frame)
+        db.commit()
+    return {
+        "regions": len(REGIONS),
+        "companies_discovered": companies,
+        "retail_offers": offers,
+        "retail_products_parsed": offers,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic SQLite database for benchmarks.")
+    parser.add_argument("--db", type=Path, required=True, help="SQLite file to create (must not exist).")
+    parser.add_argument("--offers", type=int, default=1_000_000, help="retail_offers / retail_products_parsed rows.")
+    parser.add_argument("--companies", type=int, default=20_000, help="companies_discovered rows.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=90, help="Spread of collected_at, starting 2024-01-01.")
+    args = parser.parse_args()
+    if args.db.exists():
+        parser.error(f"{args.db} already exists")
+
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{args.db}")
+    create_schema(engine)
+    with Session(engine) as db:
+        counts = generate(db, args.offers, args.companies, seed=args.seed, days=args.days)
+        db.commit()
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,46 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.deps import get_db
-from app.modules.companies.repository import CompanyRepository
-from app.modules.companies.schemas import CompanyCreate, CompanyRead
+from app.db.deps import get_async_db, get_async_read_db
+from app.modules.companies.repository import AsyncCompanyRepository, AsyncDiscoveredCompanyRepository
+from app.modules.companies.schemas import CompanyCreate, CompanyNearby, CompanyRead
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
 
 @router.post("/", response_model=CompanyRead)
-def create_company(payload: CompanyCreate, db: Session = Depends(get_db)):
-    repo = CompanyRepository(db)
-    return repo.create(**payload.dict())
+async def create_company(payload: CompanyCreate, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncCompanyRepository(db)
+    return await repo.create(**payload.dict())
 
 
 @router.get("/", response_model=list[CompanyRead])
-def list_companies(db: Session = Depends(get_db)):
-    repo = CompanyRepository(db)
-    return repo.list_all()
+async def list_companies(db: AsyncSession = Depends(get_async_read_db)):
+    repo = AsyncCompanyRepository(db)
+    return await repo.list_all()
+
+
+@router.get("/nearby", response_model=list[CompanyNearby])
+async def nearby_companies(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=1000),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    repo = AsyncDiscoveredCompanyRepository(db)
+    return [
+        CompanyNearby(
+            id=company.id,
+            name=company.name,
+            region=company.region,
+            assigned_region=company.assigned_region,
+            address=company.address,
+            lat=company.lat,
+            lon=company.lon,
+            website=company.website,
+            phone=company.phone,
+            distance_km=round(distance, 3),
+        )
+        for company, distance in await repo.nearby(lat, lon, radius_km, limit)
+    ]
@@ -0,0 +1,70 @@
+"""Uniform lat/lon grid index for companies_discovered.
+
+Each company is stored with an integer geo_cell: the 0.1° x 0.1° cell its
+coordinates fall into, numbered row by row from the south-west corner, so a
+row of neighbouring cells is one contiguous integer range. A radius query
+turns the circle's bounding box into a handful of BETWEEN ranges on the
+indexed column and computes exact haversine distances only for the
+companies in those cells.
+"""
+
+import math
+
+CELLS_PER_DEGREE = 10
+
+LAT_ROWS = 180 * CELLS_PER_DEGREE
+
+LON_CELLS = 360 * CELLS_PER_DEGREE
+
+EARTH_RADIUS_KM = 6371.0088
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _lat_row(lat: float) -> int:
+    return min(max(math.floor(lat * CELLS_PER_DEGREE), -LAT_ROWS // 2), LAT_ROWS // 2 - 1) + LAT_ROWS // 2
+
+
+def _lon_col(lon: float) -> int:
+    return (math.floor(lon * CELLS_PER_DEGREE) + LON_CELLS // 2) % LON_CELLS
+
+
+def geo_cell(lat: float | None, lon: float | None) -> int | None:
+    """Grid cell of a point, or None without coordinates."""
+    if lat is None or lon is None:
+        return None
+    return _lat_row(float(lat)) * LON_CELLS + _lon_col(float(lon))
+
+
+def cell_ranges(lat: float, lon: float, radius_km: float) -> list[tuple[int, int]]:
+    """Inclusive geo_cell ranges covering every point within radius_km of (lat, lon)."""
+    dlat = radius_km / KM_PER_DEGREE
+    lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    # the box is widest at the band's most poleward latitude
+    widest = max(abs(lat_lo), abs(lat_hi))
+    if widest >= 89.9 or dlat / math.cos(math.radians(widest)) >= 180:
+        spans = [(0, LON_CELLS - 1)]
+    else:
+        dlon = dlat / math.cos(math.radians(widest))
+        first, last = _lon_col(lon - dlon), _lon_col(lon + dlon)
+        # wrapping past the antimeridian (Chukotka) splits the row in two
+        spans = [(first, last)] if first <= last else [(first, LON_CELLS - 1), (0, last)]
+
+    cells = sorted(
+        (row * LON_CELLS + start, row * LON_CELLS + end)
+        for row in range(_lat_row(lat_lo), _lat_row(lat_hi) + 1)
+        for start, end in spans
+    )
+    ranges: list[tuple[int, int]] = []
+    for lo, hi in cells:
+        if ranges and lo <= ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], hi))
+        else:
+            ranges.append((lo, hi))
+    return ranges
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
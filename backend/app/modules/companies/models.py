@@ -1,5 +1,5 @@
 ﻿from datetime import datetime
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Float, UniqueConstraint
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Float, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -46,6 +46,10 @@ class Product(Base):
     brand: Mapped["Brand"] = relationship(back_populates="products")
     prices: Mapped[list["Price"]] = relationship(back_populates="product")
 
+    __table_args__ = (
+        Index("ux_products_name_brand", "name", "brand_id", unique=True),
+    )
+
 
 class Price(Base):
     __tablename__ = "prices"
@@ -28,6 +28,11 @@ class CompanyDiscovered(Base):
     phone = Column(String(100), nullable=True)
     query = Column(String(255), nullable=True)
     discovered_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # nearest region centre to (lat, lon); `region` is the 2GIS search region
+    assigned_region = Column(String(150), nullable=True, index=True)
+    region_distance_km = Column(Float, nullable=True)
+    # geo_grid.geo_cell(lat, lon), maintained by upsert_company
+    geo_cell = Column(Integer, nullable=True, index=True)
 
     __table_args__ = (
         UniqueConstraint("source", "external_id", name="uq_companies_discovered_source_extid"),
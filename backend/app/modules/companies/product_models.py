@@ -1,4 +1,4 @@
-from sqlalchemy import String, Float, ForeignKey
+from sqlalchemy import String, Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -13,3 +13,7 @@ class Product(Base):
 
     brand_id: Mapped[int] = mapped_column(ForeignKey("brands.id"))
     brand = relationship("Brand", backref="products")
+
+    __table_args__ = (
+        Index("ux_products_name_brand", "name", "brand_id", unique=True),
+    )
@@ -1,5 +1,9 @@
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.modules.companies.geo_grid import cell_ranges, haversine_km
 from app.modules.companies.models import Company
+from app.modules.companies.models_discovered import CompanyDiscovered
 
 
 class CompanyRepository:
@@ -23,3 +27,71 @@ class CompanyRepository:
 
     def list_all(self) -> list[Company]:
         return self.db.query(Company).order_by(Company.name).all()
+
+
+def _nearby_candidates(lat: float, lon: float, radius_km: float):
+    cell = CompanyDiscovered.geo_cell
+    ranges = cell_ranges(lat, lon, radius_km)
+    return select(CompanyDiscovered).where(or_(*(cell.between(lo, hi) for lo, hi in ranges)))
+
+
+def _rank_nearby(companies, lat: float, lon: float, radius_km: float, limit: int) -> list[tuple[CompanyDiscovered, float]]:
+    hits = []
+    for company in companies:
+        distance = haversine_km(lat, lon, company.lat, company.lon)
+        if distance <= radius_km:
+            hits.append((company, distance))
+    hits.sort(key=lambda hit: hit[1])
+    return hits[:limit]
+
+
+class DiscoveredCompanyRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def nearby(self, lat: float, lon: float, radius_km: float, limit: int = 100) -> list[tuple[CompanyDiscovered, float]]:
+        """Companies within radius_km of (lat, lon), nearest first, with their distance in km.
+
+        Candidates come from the geo_cell index; exact distances are computed
+        only for them.
+        """
+        companies = self.db.execute(_nearby_candidates(lat, lon, radius_km)).scalars()
+        return _rank_nearby(companies, lat, lon, radius_km, limit)
+
+
+class AsyncCompanyRepository:
+    """CompanyRepository for async sessions."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, *, name: str, country: str = 'RU', region: str | None = None, website: str | None = None) -> Company:
+        company = Company(
+            name=name,
+            country=country,
+            region=region,
+            website=website,
+        )
+        self.db.add(company)
+        await self.db.commit()
+        await self.db.refresh(company)
+        return company
+
+    async def get_by_name(self, name: str) -> Company | None:
+        result = await self.db.execute(select(Company).where(Company.name == name).limit(1))
+        return result.scalars().first()
+
+    async def list_all(self) -> list[Company]:
+        result = await self.db.execute(select(Company).order_by(Company.name))
+        return list(result.scalars())
+
+
+class AsyncDiscoveredCompanyRepository:
+    """DiscoveredCompanyRepository for async sessions."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def nearby(self, lat: float, lon: float, radius_km: float, limit: int = 100) -> list[tuple[CompanyDiscovered, float]]:
+        result = await self.db.execute(_nearby_candidates(lat, lon, radius_km))
+        return _rank_nearby(result.scalars(), lat, lon, radius_km, limit)
@@ -2,15 +2,19 @@ import os
 import random
 import time
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Tuple
 
 import httpx
 from dotenv import load_dotenv
-from sqlalchemy import select, update, insert
+from sqlalchemy import and_, case, or_
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
+from app.db.upsert import IF_NOT_EMPTY, KEEP, OVERWRITE, bulk_upsert, provided
 from app.modules.regions.models import Region
+from app.modules.regions.nearest_region import assign_company_regions
 from app.modules.scraping.providers.two_gis import TwoGisProvider
+from app.modules.companies.geo_grid import geo_cell
 from app.modules.companies.models_discovered import CompanyDiscovered
 from app.modules.scraping.normalization.company_name import canonical_company_name
 
@@ -19,23 +23,35 @@ def _get_region_point(region: Region) -> Tuple[float | None, float | None]:
     return region.center_lat, region.center_lon
 
 
-def upsert_company(db, item: Dict) -> Tuple[bool, bool]:
-    """Returns (inserted, updated)."""
+# fields an existing company takes from a new item when the item has them
+UPDATABLE = ["region", "address", "lat", "lon", "website", "phone", "canonical_name", "query", "name"]
+
+COMPANY_RULES = {
+    **{key: IF_NOT_EMPTY for key in UPDATABLE},
+    "country": KEEP,
+    "discovered_at": OVERWRITE,
+    "geo_cell": IF_NOT_EMPTY,
+    # moved: let assign_company_regions recompute the nearest region
+    "assigned_region": lambda existing, incoming: case(
+        (
+            and_(
+                incoming.geo_cell.isnot(None),
+                or_(existing.lat.is_distinct_from(incoming.lat), existing.lon.is_distinct_from(incoming.lon)),
+            ),
+            None,
+        ),
+        else_=existing.assigned_region,
+    ),
+}
+
+
+def company_row(item: Dict, now: datetime) -> Dict | None:
+    """companies_discovered row for a 2GIS item, or None without an external id."""
     ext_id = item.get("external_id")
     if not ext_id:
-        return False, False
-
-    source = "2gis"
-
-    stmt = select(CompanyDiscovered).where(
-        CompanyDiscovered.source == source,
-        CompanyDiscovered.external_id == str(ext_id),
-    )
-    existing = db.execute(stmt).scalar_one_or_none()
-
-    now = datetime.utcnow()
-    base_fields = {
-        "source": source,
+        return None
+    return {
+        "source": "2gis",
         "external_id": str(ext_id),
         "name": item.get("name"),
         "canonical_name": canonical_company_name(item.get("name") or "") if item.get("name") else None,
@@ -48,27 +64,34 @@ def upsert_company(db, item: Dict) -> Tuple[bool, bool]:
         "phone": item.get("phone"),
         "query": item.get("query"),
         "discovered_at": now,
+        "geo_cell": geo_cell(item.get("lat"), item.get("lon")),
+        "assigned_region": None,
     }
 
-    if existing:
-        # Update only provided fields if they are non-empty.
-        update_data = {}
-        for key in ["region", "address", "lat", "lon", "website", "phone", "canonical_name", "query", "name"]:
-            val = base_fields.get(key)
-            if val:
-                update_data[key] = val
-        if update_data:
-            update_data["discovered_at"] = now
-            db.execute(
-                update(CompanyDiscovered)
-                .where(CompanyDiscovered.id == existing.id)
-                .values(**update_data)
-            )
-            return False, True
-        return False, False
-
-    db.execute(insert(CompanyDiscovered).values(**base_fields))
-    return True, False
+
+def _has_new_values(existing, incoming):
+    """Existing rows are only touched when the item provides at least one field."""
+    return or_(*(provided(incoming[key]) for key in UPDATABLE))
+
+
+def upsert_companies(db, items: Iterable[Dict]) -> Dict[str, int]:
+    """Bulk upsert 2GIS items on (source, external_id); returns inserted/updated/skipped."""
+    now = datetime.utcnow()
+    items = list(items)
+    rows = [row for row in (company_row(item, now) for item in items) if row is not None]
+    counts = bulk_upsert(
+        db,
+        CompanyDiscovered.__table__,
+        rows,
+        key=["source", "external_id"],
+        rules=COMPANY_RULES,
+        where=_has_new_values,
+    )
+    return {
+        "inserted": counts["inserted"],
+        "updated": counts["updated"],
+        "skipped": counts["unchanged"] + len(items) - len(rows),
+    }
 
 
 def fetch_for_region(region: Region, query: str, max_results: int | None = None) -> Tuple[int, int, int, int]:
@@ -87,10 +110,6 @@ def fetch_for_region(region: Region, query: str, max_results: int | None = None)
     if max_results:
         provider.max_results = max_results
 
-    inserted = 0
-    updated = 0
-    skipped = 0
-
     with SessionLocal() as db:
         # Throttle before request
         time.sleep(random.uniform(0.8, 1.5))
@@ -110,17 +129,10 @@ def fetch_for_region(region: Region, query: str, max_results: int | None = None)
 
         items = run_fetch()
 
-        for item in items:
-            ins, upd = upsert_company(db, item)
-            if ins:
-                inserted += 1
-            elif upd:
-                updated += 1
-            else:
-                skipped += 1
-
+        counts = upsert_companies(db, items)
         db.commit()
 
+    inserted, updated, skipped = counts["inserted"], counts["updated"], counts["skipped"]
     return inserted + updated + skipped, inserted, updated, skipped
 
 
@@ -149,11 +161,16 @@ def main() -> None:
             print(msg)
             continue
 
+    with SessionLocal() as db:
+        assigned = assign_company_regions(db, only_missing=True)
+        db.commit()
+
     print("\n=== SUMMARY ===")
     print(f"Total records processed: {total_all}")
     print(f"Inserted: {inserted_all}")
     print(f"Updated: {updated_all}")
     print(f"Skipped: {skipped_all}")
+    print(f"Nearest region assigned: {assigned['changed']}")
     if errors:
         print("Errors:")
         for e in errors:
@@ -162,3 +179,4 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    print_sql_summary()
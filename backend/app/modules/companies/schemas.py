@@ -17,3 +17,16 @@ class CompanyRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CompanyNearby(BaseModel):
+    id: int
+    name: str
+    region: str | None
+    assigned_region: str | None
+    address: str | None
+    lat: float
+    lon: float
+    website: str | None
+    phone: str | None
+    distance_km: float
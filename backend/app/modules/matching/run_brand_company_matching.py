@@ -5,6 +5,7 @@ from typing import Dict, Iterable, List, Tuple, Set
 
 from sqlalchemy import select, insert
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
 from app.modules.matching.models import brand_company_matches
 from app.modules.companies.models_discovered import CompanyDiscovered
@@ -147,3 +148,4 @@ def main() -> None:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     main()
+    print_sql_summary()
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.db.instrumentation import N_PLUS_ONE_THRESHOLD, SLOW_QUERY_MS, SQL_STATS, query_stats
+
+router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+
+SORT_KEYS = ("total_ms", "count", "avg_ms", "max_ms", "slow", "n_plus_one")
+
+
+@router.get("/sql")
+def sql_stats(
+    top: int = Query(20, ge=1, le=500),
+    sort: str = Query("total_ms"),
+):
+    """Per-statement SQL timings of this process since start (or the last reset)."""
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=422, detail=f"sort must be one of: {', '.join(SORT_KEYS)}")
+    return {
+        "enabled": SQL_STATS,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        "totals": query_stats.totals(),
+        "statements": query_stats.snapshot(top, sort=sort),
+    }
+
+
+@router.delete("/sql", status_code=204)
+def reset_sql_stats() -> None:
+    query_stats.reset()
@@ -0,0 +1,349 @@
+"""One index for every spelling of a region.
+
+Sources, in order of precedence:
+
+- data/region_lr_map.csv: Yandex lr_code -> region name, the only source of codes
+- data/region_aliases.csv: English (Rosstat) names and colloquial short forms
+- the regions table, names only, when a session is passed
+
+Each spelling is folded once into a key (case, ё, dashes, punctuation,
+"обл."/"респ."/"АО", a leading "г.") and stored in a flat dict, so resolving
+a value is one normalisation plus one dict lookup, memoized per raw value.
+The compiled CSV part is cached as JSON under data/cache/ and rebuilt only
+when a source file changes.
+"""
+
+import csv
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from app.modules.regions.models import Region
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+
+SOURCE_FILES = ("region_lr_map.csv", "region_aliases.csv")
+
+CACHE_VERSION = 1
+
+MEMO_SIZE = 100_000
+
+# extended indexes kept per base index (one per distinct regions-table name set)
+EXTENDED_CACHE_SIZE = 8
+
+# expanded token by token, on both sides of a lookup
+ABBREVIATIONS = {
+    "обл": "область",
+    "респ": "республика",
+    "ао": "автономный округ",
+    "obl": "oblast",
+    "resp": "republic",
+    "ao": "autonomous okrug",
+}
+
+# dropped when they lead a name: "г. Москва", "город Севастополь"
+CITY_PREFIXES = {"г", "город", "gorod", "city"}
+
+REPUBLIC_WORDS = ("республика", "republic")
+
+# Russian case endings, longest first; stripped only for free-text mentions
+ENDINGS = sorted(
+    [
+        "ией", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими",
+        "ия", "ии", "ию", "ой", "ей", "ий", "ый", "ая", "яя", "ое", "ее", "ую", "юю",
+        "ом", "ем", "ых", "их", "ам", "ям", "ах", "ях", "ью",
+        "а", "я", "е", "у", "ю", "ы", "и", "о", "ь", "й",
+    ],
+    key=len,
+    reverse=True,
+)
+
+_PUNCT = re.compile(r"[^\w\s-]")
+_DASHES = re.compile(r"\s*[‐-―-]\s*")
+
+
+def normalize_name(value) -> str | None:
+    if value is None:
+        return None
+    s = str(value).strip()
+    if not s:
+        return None
+    s = re.sub(r"\s+", " ", s)
+    return s
+
+
+def _tokens(value) -> list[str]:
+    s = str(value).casefold().replace("ё", "е")
+    s = _PUNCT.sub(" ", _DASHES.sub("-", s))
+    tokens = []
+    for token in s.split():
+        token = token.strip("-")
+        if token:
+            tokens.extend(ABBREVIATIONS.get(token, token).split())
+    return tokens
+
+
+def alias_key(value) -> str | None:
+    """Lookup key of a region spelling, or None for an empty value."""
+    if value is None:
+        return None
+    tokens = _tokens(value)
+    if len(tokens) > 1 and tokens[0] in CITY_PREFIXES:
+        tokens = tokens[1:]
+    return " ".join(tokens) or None
+
+
+def _stem(token: str) -> str:
+    for ending in ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= 3:
+            return token[: -len(ending)]
+    return token
+
+
+def _variants(key: str):
+    """Word-order variants of republic names: "республика X", "X республика", "X"."""
+    tokens = key.split()
+    for word in REPUBLIC_WORDS:
+        if len(tokens) < 2:
+            return
+        if tokens[0] == word:
+            core = tokens[2:] if tokens[1] == "of" else tokens[1:]
+        elif tokens[-1] == word:
+            core = tokens[:-1]
+        else:
+            continue
+        if core:
+            yield " ".join(core)
+            yield " ".join([*core, word])
+            yield " ".join([word, *core])
+
+
+class RegionAliases:
+    """Compiled alias key -> canonical region name index with lr codes."""
+
+    def __init__(self, code_to_name: dict[str, str], aliases: dict[str, str]):
+        self.code_to_name = code_to_name
+        self.name_to_code = {name: code for code, name in code_to_name.items()}
+        self.aliases = aliases
+        self.stems: dict[str, str] = {}
+        for key, name in aliases.items():
+            self.stems.setdefault(" ".join(_stem(t) for t in key.split()), name)
+        self.max_words = max((key.count(" ") + 1 for key in self.stems), default=0)
+        self._memo: dict[str, tuple[str | None, str | None]] = {}
+        self._extended: dict[tuple[str, ...], RegionAliases] = {}
+
+    def __len__(self) -> int:
+        return len(self.aliases)
+
+    def with_names(self, names) -> "RegionAliases":
+        """Index that also knows `names` (spellings without a code).
+
+        Compiled once per distinct tuple of names and shared afterwards, so
+        repeated calls with an unchanged regions table reuse one index.
+        """
+        key = tuple(names)
+        extended = self._extended.get(key)
+        if extended is None:
+            extended = RegionAliases(self.code_to_name, compile_aliases({}, [(n, n) for n in key], base=self.aliases))
+            if len(self._extended) >= EXTENDED_CACHE_SIZE:
+                self._extended.clear()
+            self._extended[key] = extended
+        return extended
+
+    def _resolve(self, raw: str) -> tuple[str | None, str | None]:
+        if raw.isdigit():
+            # unknown codes are kept as both name and code to avoid UNKNOWN
+            return self.code_to_name.get(raw, raw), raw
+        name = self.aliases.get(alias_key(raw))
+        if name is None:
+            return normalize_name(raw), None
+        return name, self.name_to_code.get(name)
+
+    def resolve(self, value) -> tuple[str | None, str | None]:
+        """(region name, lr code) of a raw region value.
+
+        Numeric values are lr codes. Known names resolve to their canonical
+        spelling and code; unknown names come back normalized, without a code.
+        """
+        if value is None:
+            return None, None
+        raw = str(value).strip()
+        if not raw:
+            return None, None
+        hit = self._memo.get(raw)
+        if hit is None:
+            hit = self._resolve(raw)
+            if len(self._memo) < MEMO_SIZE:
+                self._memo[raw] = hit
+        return hit
+
+    def canonical(self, value) -> str | None:
+        return self.resolve(value)[0]
+
+    def key(self, value) -> str | None:
+        """Comparison key: equal for any two spellings of the same region."""
+        return alias_key(self.canonical(value))
+
+    def _per_unique(self, values, fn) -> tuple[pd.Index, np.ndarray, list]:
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        codes, uniques = pd.factorize(series)
+        return series.index, codes, [fn(v) for v in uniques]
+
+    def resolve_many(self, values) -> pd.DataFrame:
+        """Vectorized resolve(): region_name and region_code, one lookup per distinct value."""
+        index, codes, resolved = self._per_unique(values, self.resolve)
+        # the trailing None is picked by factorize's -1 for missing values
+        names = np.array([name for name, _ in resolved] + [None], dtype=object)
+        lr_codes = np.array([code for _, code in resolved] + [None], dtype=object)
+        return pd.DataFrame({"region_name": names[codes], "region_code": lr_codes[codes]}, index=index)
+
+    def keys(self, values) -> pd.Series:
+        """Vectorized key()."""
+        index, codes, keys = self._per_unique(values, self.key)
+        return pd.Series(np.array([*keys, None], dtype=object)[codes], index=index)
+
+    def mentions(self, text: str) -> list[str]:
+        """Canonical names of regions mentioned in free text, in order of appearance.
+
+        Matches the longest known alias at each word, tolerating Russian case
+        endings ("в Тверской области", "по Москве").
+        """
+        tokens = [_stem(t) for t in _tokens(text or "")]
+        found = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.max_words, len(tokens) - i), 0, -1):
+                name = self.stems.get(" ".join(tokens[i : i + n]))
+                if name is not None:
+                    found.append(name)
+                    i += n
+                    break
+            else:
+                i += 1
+        return list(dict.fromkeys(found))
+
+
+def read_lr_map(path: Path) -> dict[str, str]:
+    """Load lr_code -> region_name map from CSV if present."""
+    if not path.exists():
+        logger.info(
+            "region_lr_map.csv not found; numeric region codes will remain as region_code and region_name set to UNKNOWN"
+        )
+        return {}
+    code_to_name = {}
+    with path.open(encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            code = str(row.get("lr_code")).strip()
+            name = normalize_name(row.get("region_name"))
+            if not code or not code.isdigit() or not name:
+                continue
+            code_to_name[code] = name
+    # NOTE:
+    # region_lr_map.csv is generated from official Yandex Market geo source.
+    # This file is the ONLY allowed source for lr_code -> region_name mapping.
+    return code_to_name
+
+
+def read_alias_csv(path: Path) -> list[tuple[str, str]]:
+    """(alias, region name) pairs from region_aliases.csv, if present."""
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as f:
+        return [
+            (row["alias"], row["region_name"])
+            for row in csv.DictReader(f)
+            if normalize_name(row.get("alias")) and normalize_name(row.get("region_name"))
+        ]
+
+
+def compile_aliases(
+    code_to_name: dict[str, str],
+    pairs: list[tuple[str, str]],
+    base: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """Alias key -> canonical name for lr names and (alias, region name) pairs.
+
+    A pair's region name is first resolved against what is already known, so
+    "Республика Северная Осетия — Алания" lands on the lr spelling whatever
+    its dashes. Exact keys win over word-order variants of other names.
+    """
+    aliases = dict(base or {})
+    for name in code_to_name.values():
+        if alias_key(name):
+            aliases.setdefault(alias_key(name), name)
+    entries = []
+    for alias, target in pairs:
+        canonical = aliases.get(alias_key(target)) or normalize_name(target)
+        entries += [(alias_key(target), canonical), (alias_key(alias), canonical)]
+    entries += [(alias_key(name), name) for name in code_to_name.values()]
+    entries = [(key, name) for key, name in entries if key]
+    for key, name in entries:
+        aliases.setdefault(key, name)
+    for key, name in entries:
+        for variant in _variants(key):
+            aliases.setdefault(variant, name)
+    return aliases
+
+
+def _file_token(path: Path) -> list[int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _load_compiled(data_dir: Path, refresh: bool) -> RegionAliases:
+    lr_path, alias_path = (data_dir / name for name in SOURCE_FILES)
+    cache_path = data_dir / "cache" / "region_aliases.json"
+    sources = {"lr_map": _file_token(lr_path), "aliases": _file_token(alias_path)}
+    if not refresh:
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached.get("version") == CACHE_VERSION and cached.get("sources") == sources:
+                return RegionAliases(cached["codes"], cached["aliases"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    code_to_name = read_lr_map(lr_path)
+    aliases = compile_aliases(code_to_name, read_alias_csv(alias_path))
+    payload = {"version": CACHE_VERSION, "sources": sources, "codes": code_to_name, "aliases": aliases}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(cache_path)
+    except OSError as exc:
+        logger.warning("could not write region alias cache %s: %s", cache_path, exc)
+    return RegionAliases(code_to_name, aliases)
+
+
+_loaded: dict = {}
+_lock = threading.Lock()
+
+
+def load_region_aliases(db=None, *, data_dir: Path = DATA_DIR, refresh: bool = False) -> RegionAliases:
+    """The region alias index, compiled once per process and source change.
+
+    With a session, names from the regions table are added on top (compiled
+    once per set of names); without one (API handlers, plot workers) only the
+    CSV sources are used.
+    """
+    data_dir = Path(data_dir)
+    tokens = [_file_token(data_dir / name) for name in SOURCE_FILES]
+    with _lock:
+        loaded = _loaded.get(data_dir)
+        if refresh or loaded is None or loaded[0] != tokens:
+            loaded = _loaded[data_dir] = (tokens, _load_compiled(data_dir, refresh))
+    regions = loaded[1]
+    if db is not None:
+        regions = regions.with_names(db.execute(select(Region.name).order_by(Region.id)).scalars())
+    return regions
@@ -1,4 +1,4 @@
-﻿from sqlalchemy import Column, Integer, String, Float
+﻿from sqlalchemy import Column, Integer, String, Float, Index
 from app.db.base import Base
 
 
@@ -12,3 +12,6 @@ class Region(Base):
 
     center_lat = Column(Float, nullable=True)
     center_lon = Column(Float, nullable=True)
+
+    # conflict key of the bulk region upsert
+    __table_args__ = (Index("ux_regions_name", "name", unique=True),)
@@ -0,0 +1,111 @@
+"""Nearest region centre for points on the sphere.
+
+Points and region centres are mapped to 3D unit vectors; the nearest centre
+by chord length is the nearest by great-circle distance, so a plain KD-tree
+(scipy's cKDTree, `pip install .[geo]`) answers haversine nearest-neighbour
+queries. Without scipy
+the same result comes from chunked numpy dot products against all centres,
+which is cheap for the ~85 Russian regions.
+"""
+
+import numpy as np
+from sqlalchemy import bindparam, select, update
+
+from app.modules.companies.models_discovered import CompanyDiscovered
+from app.modules.regions.models import Region
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - optional dependency
+    cKDTree = None
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def to_unit_vectors(lat, lon) -> np.ndarray:
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    lon = np.radians(np.asarray(lon, dtype="float64"))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0))
+
+
+class RegionIndex:
+    """Nearest-centre lookups over a fixed set of region centres."""
+
+    def __init__(self, names: list[str], center_lat, center_lon):
+        if not names:
+            raise ValueError("RegionIndex needs at least one region centre")
+        self.names = np.asarray(names, dtype=object)
+        self.centers = to_unit_vectors(center_lat, center_lon)
+        self.tree = cKDTree(self.centers) if cKDTree is not None else None
+
+    def nearest(self, lat, lon, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[np.ndarray, np.ndarray]:
+        """Return (region names, great-circle distance in km) for each point."""
+        points = to_unit_vectors(lat, lon)
+        if self.tree is not None:
+            chord, idx = self.tree.query(points)
+            return self.names[idx], chord_to_km(chord)
+
+        idx = np.empty(len(points), dtype=np.int64)
+        for start in range(0, len(points), chunk_size):
+            block = points[start : start + chunk_size]
+            # max dot product == min angle
+            idx[start : start + chunk_size] = np.argmax(block @ self.centers.T, axis=1)
+        chord = np.linalg.norm(points - self.centers[idx], axis=1)
+        return self.names[idx], chord_to_km(chord)
+
+
+def load_region_index(db) -> RegionIndex | None:
+    """Index over regions with known centres, or None when there are none."""
+    rows = db.execute(
+        select(Region.name, Region.center_lat, Region.center_lon).where(
+            Region.center_lat.isnot(None), Region.center_lon.isnot(None)
+        )
+    ).all()
+    if not rows:
+        return None
+    names, lat, lon = zip(*rows)
+    return RegionIndex(list(names), lat, lon)
+
+
+def assign_company_regions(db, only_missing: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, int]:
+    """Set companies_discovered.assigned_region to the nearest region centre.
+
+    Assignments are computed and written chunk by chunk; only rows whose
+    assignment changes are updated. Companies without coordinates are skipped.
+    """
+    index = load_region_index(db)
+    if index is None:
+        return {"companies": 0, "changed": 0}
+    table = CompanyDiscovered.__table__
+    c = table.c
+    stmt = select(c.id, c.lat, c.lon, c.assigned_region).where(c.lat.isnot(None), c.lon.isnot(None))
+    if only_missing:
+        stmt = stmt.where(c.assigned_region.is_(None))
+    set_region = (
+        update(table)
+        .where(c.id == bindparam("_id"))
+        .values(assigned_region=bindparam("_region"), region_distance_km=bindparam("_km"))
+    )
+
+    # fetched up front: the updates below would otherwise run under an open SQLite cursor
+    rows = db.execute(stmt).all()
+    changed = 0
+    for start in range(0, len(rows), chunk_size):
+        ids, lat, lon, current = zip(*rows[start : start + chunk_size])
+        names, km = index.nearest(lat, lon)
+        updates = [
+            {"_id": row_id, "_region": name, "_km": round(float(dist), 3)}
+            for row_id, name, dist, old in zip(ids, names, km, current)
+            if name != old
+        ]
+        if updates:
+            db.execute(set_region, updates)
+        changed += len(updates)
+    return {"companies": len(rows), "changed": changed}
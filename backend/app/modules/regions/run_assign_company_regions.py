@@ -0,0 +1,30 @@
+import argparse
+import time
+
+from app.db.instrumentation import print_sql_summary
+from app.db.session import SessionLocal
+from app.modules.regions.nearest_region import DEFAULT_CHUNK_SIZE, assign_company_regions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Assign companies_discovered to their nearest region centre.")
+    parser.add_argument(
+        "--missing",
+        action="store_true",
+        help="Only companies without an assigned_region (default: re-check all).",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        stats = assign_company_regions(db, only_missing=args.missing, chunk_size=args.chunk_size)
+        db.commit()
+    print(f"Companies checked: {stats['companies']}")
+    print(f"Assignments changed: {stats['changed']}")
+    print(f"Elapsed: {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
+    print_sql_summary()
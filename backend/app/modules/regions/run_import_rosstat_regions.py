@@ -1,40 +1,30 @@
 import csv
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
+from app.db.upsert import IF_NOT_EMPTY, bulk_upsert
 from app.modules.regions.models import Region
 
 # Adjusted path to top-level data/ directory.
 DATA_PATH = Path(__file__).resolve().parents[3] / "data" / "rosstat_regions.csv"
 
 
-def upsert_region(db, row: Dict) -> None:
-    name = row.get("name")
-    if not name:
-        return
-
-    region = db.query(Region).filter(Region.name == name).first()
-    if region:
-        # update basic fields if changed
-        changed = False
-        for field in ["country", "federal_district", "center_lat", "center_lon"]:
-            if field in row and row[field] is not None:
-                if getattr(region, field, None) != row[field]:
-                    setattr(region, field, row[field])
-                    changed = True
-        if changed:
-            db.add(region)
-        return
-
-    new_region = Region(
-        name=name,
-        country=row.get("country") or "RU",
-        federal_district=row.get("federal_district"),
-        center_lat=row.get("center_lat"),
-        center_lon=row.get("center_lon"),
-    )
-    db.add(new_region)
+def upsert_regions(db, rows: Iterable[Dict]) -> Dict[str, int]:
+    """Bulk upsert regions on name; provided (non-empty) fields overwrite stored ones."""
+    rows = [
+        {
+            "name": row["name"],
+            "country": row.get("country") or "RU",
+            "federal_district": row.get("federal_district"),
+            "center_lat": row.get("center_lat"),
+            "center_lon": row.get("center_lon"),
+        }
+        for row in rows
+        if row.get("name")
+    ]
+    return bulk_upsert(db, Region.__table__, rows, key=["name"], default_rule=IF_NOT_EMPTY)
 
 
 def load_csv() -> list[Dict]:
@@ -58,21 +48,13 @@ def load_csv() -> list[Dict]:
 
 def main() -> None:
     rows = load_csv()
-    inserted = 0
-    updated = 0
     with SessionLocal() as db:
-        for r in rows:
-            before = db.query(Region).filter(Region.name == r["name"]).first()
-            upsert_region(db, r)
-            after = db.query(Region).filter(Region.name == r["name"]).first()
-            if before is None and after is not None:
-                inserted += 1
-            elif before is not None and after is not None:
-                updated += 1
+        counts = upsert_regions(db, rows)
         db.commit()
     print(f"Regions processed: {len(rows)}")
-    print(f"Inserted: {inserted}, Updated: {updated}")
+    print(f"Inserted: {counts['inserted']}, Updated: {counts['updated']}")
 
 
 if __name__ == "__main__":
     main()
+    print_sql_summary()
@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
-from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
+from app.db.upsert import bulk_upsert
 from app.modules.companies.models import Company  # only for FK reference
 from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData
 
@@ -48,17 +48,9 @@ def _normalize_status(status_raw: Optional[str]) -> str:
     return "UNKNOWN"
 
 
-def write_registry_entry(db: Session, company_id: int, source: str, data: Dict) -> None:
-    """
-    Upsert registry entry for a single company.
-    - Uses (company_id, source) as uniqueness.
-    - Maps status_raw -> status_norm.
-    - Writes fetched_at = now.
-    """
+def registry_row(company_id: int, source: str, data: Dict, fetched_at: datetime) -> Dict:
     status_raw = data.get("status")
-    status_norm = _normalize_status(status_raw)
-
-    row = {
+    return {
         "company_id": company_id,
         "source": source,
         "source_url": data.get("source_url"),
@@ -67,26 +59,32 @@ def write_registry_entry(db: Session, company_id: int, source: str, data: Dict)
         "ogrn": data.get("ogrn"),
         "inn": data.get("inn"),
         "status_raw": status_raw,
-        "status_norm": status_norm,
+        "status_norm": _normalize_status(status_raw),
         "address_raw": data.get("address"),
         "address_norm": data.get("address"),  # placeholder until normalization is added
-        "fetched_at": datetime.utcnow(),
+        "fetched_at": fetched_at,
     }
 
-    stmt_select = select(company_registry.c.id).where(
-        (company_registry.c.company_id == company_id) & (company_registry.c.source == source)
-    )
-    existing = db.execute(stmt_select).scalar_one_or_none()
-
-    if existing:
-        stmt_update = (
-            update(company_registry)
-            .where(company_registry.c.id == existing)
-            .values(**row)
-        )
-        db.execute(stmt_update)
-    else:
-        stmt_insert = insert(company_registry).values(**row)
-        db.execute(stmt_insert)
 
+def write_registry_entries(db: Session, source: str, entries: Iterable[Tuple[int, Dict]]) -> Dict[str, int]:
+    """
+    Upsert registry entries for many companies in batches.
+    - entries are (company_id, data) pairs; (company_id, source) is the conflict key.
+    - Existing entries are overwritten; fetched_at = now.
+    Returns inserted/updated counts.
+    """
+    now = datetime.utcnow()
+    rows = [registry_row(company_id, source, data, now) for company_id, data in entries]
+    counts = bulk_upsert(db, company_registry, rows, key=["company_id", "source"])
     db.flush()
+    return counts
+
+
+def write_registry_entry(db: Session, company_id: int, source: str, data: Dict) -> None:
+    """
+    Upsert registry entry for a single company.
+    - Uses (company_id, source) as uniqueness.
+    - Maps status_raw -> status_norm.
+    - Writes fetched_at = now.
+    """
+    write_registry_entries(db, source, [(company_id, data)])
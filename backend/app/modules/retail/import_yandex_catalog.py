@@ -3,9 +3,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterable, List
 
-from sqlalchemy import insert, select
+from sqlalchemy import insert
 
 from app.db.session import SessionLocal
+from app.db.upsert import existing_keys
 from app.modules.retail.writer import retail_offers
 
 
@@ -30,82 +31,77 @@ def load_items(path: Path) -> List[Dict]:
     return items
 
 
-def dedupe_exists(
-    db,
-    *,
-    source: str,
-    region: str | None,
-    product_name: str,
-    price_value: float,
-) -> bool:
-    stmt = (
-        select(retail_offers.c.id)
-        .where(
-            retail_offers.c.source == source,
-            retail_offers.c.region == region,
-            retail_offers.c.product_name == product_name,
-            retail_offers.c.price_value == price_value,
-        )
-        .limit(1)
-    )
-    return db.execute(stmt).scalar_one_or_none() is not None
+DEDUPE_KEY = ["source", "region", "product_name", "price_value"]
+
+BATCH_SIZE = 500
+
+
+def _offer_payload(item: Dict) -> Dict | None:
+    """retail_offers row for a catalog item, or None when name or price is missing."""
+    name = str(item.get("name") or "").strip()
+    if not name:
+        return None
+
+    price_value = item.get("price_value")
+    if price_value is None:
+        return None
+    try:
+        price_value = float(price_value)
+    except Exception:
+        return None
+
+    return {
+        "company_id": None,
+        "source": "yandex_market_catalog",
+        "source_item_id": item.get("product_id"),
+        "region": str(item.get("region") or "").strip() or None,
+        "product_name": name,
+        "price_value": price_value,
+        "price_currency": item.get("price_currency") or "RUB",
+        "collected_at": datetime.utcnow(),
+    }
 
 
 def import_items(items: Iterable[Dict]) -> Dict[str, int]:
+    """Insert catalog items, skipping offers already stored with the same source+region+name+price.
+
+    Existing keys are looked up once per batch and new offers inserted with a
+    single executemany.
+    """
     inserted = 0
-    skipped = 0
     total = 0
+    seen: set[tuple] = set()
 
     with SessionLocal() as db:
-        for item in items:
-            total += 1
+        batch: List[Dict] = []
 
-            name = str(item.get("name") or "").strip()
-            if not name:
-                skipped += 1
-                continue
+        def flush() -> int:
+            stored = existing_keys(db, retail_offers, DEDUPE_KEY, batch)
+            new = [p for p in batch if tuple(p[k] for k in DEDUPE_KEY) not in stored]
+            if new:
+                db.execute(insert(retail_offers), new)
+            batch.clear()
+            return len(new)
 
-            price_value = item.get("price_value")
-            if price_value is None:
-                skipped += 1
+        for item in items:
+            total += 1
+            payload = _offer_payload(item)
+            if payload is None:
                 continue
-            try:
-                price_value = float(price_value)
-            except Exception:
-                skipped += 1
+            # duplicates within the file itself
+            key = tuple(payload[k] for k in DEDUPE_KEY)
+            if key in seen:
                 continue
+            seen.add(key)
+            batch.append(payload)
+            if len(batch) >= BATCH_SIZE:
+                inserted += flush()
 
-            source = "yandex_market_catalog"
-            price_currency = item.get("price_currency") or "RUB"
-            region = str(item.get("region") or "").strip() or None
-
-            if dedupe_exists(
-                db,
-                source=source,
-                region=region,
-                product_name=name,
-                price_value=price_value,
-            ):
-                skipped += 1
-                continue
-
-            payload = {
-                "company_id": None,
-                "source": source,
-                "source_item_id": item.get("product_id"),
-                "region": region,
-                "product_name": name,
-                "price_value": price_value,
-                "price_currency": price_currency,
-                "collected_at": datetime.utcnow(),
-            }
-
-            db.execute(insert(retail_offers).values(payload))
-            inserted += 1
-
+        if batch:
+            inserted += flush()
         db.commit()
 
-    return {"total": total, "inserted": inserted, "skipped": skipped}
+    return {"total": total, "inserted": inserted, "skipped": total - inserted}
 
 
 def main() -> None:
@@ -4,6 +4,7 @@ from typing import Dict, List
 
 from sqlalchemy import select, insert
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
 from app.modules.retail.brand_models import brands_raw
 from app.modules.retail.parsed_models import retail_products_parsed
@@ -81,3 +82,4 @@ def main() -> None:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     main()
+    print_sql_summary()
@@ -4,10 +4,14 @@ from typing import Dict, List
 
 from sqlalchemy import select, insert
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
+from app.modules.analytics import price_sketches, rollups
+from app.modules.analytics.quantile_sketch import TDigest
 from app.modules.retail.writer import retail_offers
 from app.modules.retail.parsers.product_name_parser import parse_product_name
 from app.modules.retail.parsed_models import retail_products_parsed
+from app.modules.regions.aliases import load_region_aliases
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +36,9 @@ def main() -> None:
     with SessionLocal() as db:
         existing_ids = fetch_existing_offer_ids(db)
         offers = fetch_offers(db)
+        regions = load_region_aliases(db)
+        rollup_deltas: dict = {}
+        new_prices: dict = {}
 
         for row in offers:
             total += 1
@@ -61,6 +68,24 @@ def main() -> None:
             db.execute(insert(retail_products_parsed).values(payload))
             inserted += 1
 
+            region_name, region_code = regions.resolve(payload["region"])
+            key = rollups.rollup_key(
+                region_name or "",
+                region_code,
+                payload["product_type"],
+                payload["brand"],
+                payload["parsed_at"].date().isoformat(),
+            )
+            rollups.add_price(rollup_deltas, key, row.get("price_value"))
+            if row.get("price_value") is not None:
+                for sk in (
+                    price_sketches.sketch_key("region", region_name or ""),
+                    price_sketches.sketch_key("category", payload["product_type"]),
+                ):
+                    new_prices.setdefault(sk, []).append(row.get("price_value"))
+
+        rollups.apply_deltas(db, rollup_deltas)
+        price_sketches.merge_into(db, {key: TDigest().update(values) for key, values in new_prices.items()})
         db.commit()
 
     print(f"Offers processed: {total}")
@@ -71,3 +96,4 @@ def main() -> None:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     main()
+    print_sql_summary()
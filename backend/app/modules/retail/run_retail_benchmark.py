@@ -4,6 +4,7 @@ import time
 from pathlib import Path
 from typing import List, Dict
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
 from app.modules.retail.providers.wildberries import WildberriesRetailProvider
 from app.modules.retail.writer import write_retail_offers
@@ -58,3 +59,4 @@ def main() -> None:
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     main()
+    print_sql_summary()
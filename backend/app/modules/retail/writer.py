@@ -21,7 +21,11 @@ retail_offers = Table(
 
 
 def write_retail_offers(db: Session, offers: List[Dict]) -> None:
-    """Insert offers into retail_offers (time-series; duplicates allowed)."""
+    """Insert offers into retail_offers (time-series; duplicates allowed).
+
+    price_rollups are not touched here: their category/brand keys only exist
+    once run_product_parsing parses the offer, which is where they are updated.
+    """
     if not offers:
         return
     stmt = insert(retail_offers)
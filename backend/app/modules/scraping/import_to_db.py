@@ -1,7 +1,9 @@
-﻿from sqlalchemy.orm import Session
+﻿from sqlalchemy import insert
+from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.db.session import SessionLocal
+from app.db.upsert import get_or_create_ids
 from app.modules.scraping.pipeline import ScrapingPipeline
 from app.modules.companies.models import (
     Company,
@@ -11,70 +13,30 @@ from app.modules.companies.models import (
 )
 
 
-def get_or_create_company(
-    db: Session,
-    name: str,
-    country: str | None,
-    region: str | None,
-    website: str | None,
-) -> Company:
-    company = db.query(Company).filter_by(name=name).first()
-    if company:
-        return company
-
-    company = Company(
-        name=name,
-        country=country or "RU",
-        region=region,
-        website=website,
-    )
-    db.add(company)
-    db.flush()
-    return company
-
-
-def get_or_create_brand(db: Session, name: str, company: Company) -> Brand:
-    brand = (
-        db.query(Brand)
-        .filter_by(name=name, company_id=company.id)
-        .first()
-    )
-    if brand:
-        return brand
-
-    brand = Brand(
-        name=name,
-        company_id=company.id,
-    )
-    db.add(brand)
-    db.flush()
-    return brand
-
-
-def get_or_create_product(
-    db: Session,
-    name: str,
-    brand: Brand,
-    volume_liters: float | None,
-    fat_percent: float | None,
-) -> Product:
-    product = (
-        db.query(Product)
-        .filter_by(name=name, brand_id=brand.id)
-        .first()
-    )
-    if product:
-        return product
-
-    product = Product(
-        name=name,
-        brand_id=brand.id,
-        volume_liters=volume_liters,
-        fat_percent=fat_percent,
-    )
-    db.add(product)
-    db.flush()
-    return product
+def get_or_create_companies(db: Session, items: list[dict]) -> dict[str, int]:
+    """Company id per name, creating missing companies in bulk."""
+    rows = [
+        {
+            "name": item["name"],
+            "country": item.get("country") or "RU",
+            "region": item.get("region"),
+            "website": item.get("website"),
+        }
+        for item in items
+    ]
+    ids = get_or_create_ids(db, Company.__table__, rows, key=["name"])
+    return {name: company_id for (name,), company_id in ids.items()}
+
+
+def get_or_create_brands(db: Session, keys: list[tuple[str, int]]) -> dict[tuple[str, int], int]:
+    """Brand id per (name, company_id), creating missing brands in bulk."""
+    rows = [{"name": name, "company_id": company_id} for name, company_id in keys]
+    return get_or_create_ids(db, Brand.__table__, rows, key=["name", "company_id"])
+
+
+def get_or_create_products(db: Session, rows: list[dict]) -> dict[tuple[str, int], int]:
+    """Product id per (name, brand_id), creating missing products in bulk."""
+    return get_or_create_ids(db, Product.__table__, rows, key=["name", "brand_id"])
 
 
 def main() -> None:
@@ -83,39 +45,37 @@ def main() -> None:
     try:
         items = ScrapingPipeline().run()
 
-        for item in items:
-            company = get_or_create_company(
-                db,
-                name=item["name"],
-                country=item.get("country"),
-                region=item.get("region"),
-                website=item.get("website"),
-            )
-
-            brand = get_or_create_brand(
-                db,
-                name=item.get("brand", company.name),
-                company=company,
-            )
-
-            product = get_or_create_product(
-                db,
-                name=item.get("product_name", "UNKNOWN_PRODUCT"),
-                brand=brand,
-                volume_liters=item.get("volume_liters"),
-                fat_percent=item.get("fat_percent"),
-            )
-
-            if item.get("price_value") is not None:
-                price = Price(
-                    product_id=product.id,
-                    value=item["price_value"],
-                    currency=item.get("price_currency", "RUB"),
-                    source=item.get("market", "local"),
-                    region=item.get("region"),
-                    scraped_at=datetime.utcnow(),
-                )
-                db.add(price)
+        company_ids = get_or_create_companies(db, items)
+        brand_keys = [
+            (item.get("brand", item["name"]), company_ids[item["name"]])
+            for item in items
+        ]
+        brand_ids = get_or_create_brands(db, brand_keys)
+        product_rows = [
+            {
+                "name": item.get("product_name", "UNKNOWN_PRODUCT"),
+                "brand_id": brand_ids[brand_key],
+                "volume_liters": item.get("volume_liters"),
+                "fat_percent": item.get("fat_percent"),
+            }
+            for item, brand_key in zip(items, brand_keys)
+        ]
+        product_ids = get_or_create_products(db, product_rows)
+
+        prices = [
+            {
+                "product_id": product_ids[(product["name"], product["brand_id"])],
+                "value": item["price_value"],
+                "currency": item.get("price_currency", "RUB"),
+                "source": item.get("market", "local"),
+                "region": item.get("region"),
+                "scraped_at": datetime.utcnow(),
+            }
+            for item, product in zip(items, product_rows)
+            if item.get("price_value") is not None
+        ]
+        if prices:
+            db.execute(insert(Price), prices)
 
         db.commit()
         print("IMPORT OK")
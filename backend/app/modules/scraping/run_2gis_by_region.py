@@ -1,4 +1,5 @@
-﻿from app.db.session import SessionLocal
+﻿from app.db.instrumentation import print_sql_summary
+from app.db.session import SessionLocal
 from app.modules.regions.models import Region
 from app.modules.scraping.pipeline import ScrapingPipeline
 import os
@@ -28,3 +29,4 @@ def main():
 
 if __name__ == '__main__':
     main()
+    print_sql_summary()
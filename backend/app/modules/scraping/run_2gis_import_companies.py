@@ -1,4 +1,5 @@
-﻿from app.db.session import SessionLocal
+﻿from app.db.instrumentation import print_sql_summary
+from app.db.session import SessionLocal
 from app.modules.regions.models import Region
 from app.modules.companies.models import Company
 from app.modules.scraping.pipeline import ScrapingPipeline
@@ -70,3 +71,4 @@ def main():
 
 if __name__ == '__main__':
     main()
+    print_sql_summary()
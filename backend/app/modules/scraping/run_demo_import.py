@@ -1,5 +1,6 @@
 ﻿from sqlalchemy.orm import Session
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
 from app.modules.scraping.pipeline import ScrapingPipeline
 from app.modules.companies.models import Company
@@ -35,3 +36,4 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    print_sql_summary()
@@ -1,9 +1,11 @@
 import argparse
 import json
+import sys
 from typing import Iterable
 
 from sqlalchemy.orm import Session
 
+from app.db.instrumentation import print_sql_summary
 from app.db.session import SessionLocal
 from app.modules.companies.models import Company
 from app.modules.scraping.providers.registry import RegistryEnrichmentProvider
@@ -48,3 +50,4 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    print_sql_summary(file=sys.stderr)
@@ -2,7 +2,9 @@ from fastapi import APIRouter, HTTPException
 import logging
 
 from app.modules.monitoring.health import router as health_router
+from app.modules.monitoring.sql_stats import router as sql_stats_router
 from app.modules.companies.api import router as companies_router
+from app.modules.analytics.api import router as analytics_router
 
 # AI router is optional; provide a stub if deps are missing to avoid 404s.
 try:
@@ -34,7 +36,9 @@ except ImportError:
 api_router = APIRouter()
 
 api_router.include_router(health_router, prefix="/api/v1")
+api_router.include_router(sql_stats_router, prefix="/api/v1")
 api_router.include_router(companies_router, prefix="/api/v1")
+api_router.include_router(analytics_router, prefix="/api/v1")
 if ai_router:
     api_router.include_router(ai_router, prefix="/api/v1")
 if report_router:
@@ -0,0 +1,2 @@
+ALTER TABLE market_snapshot ADD COLUMN source_parsed_id INTEGER;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_market_snapshot_source_parsed_id ON market_snapshot (source_parsed_id);
@@ -0,0 +1,12 @@
+CREATE TABLE IF NOT EXISTS snapshot_build_state (
+    id INTEGER PRIMARY KEY,
+    last_offer_id INTEGER,
+    last_parsed_at DATETIME,
+    mode TEXT,
+    built_at DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS snapshot_region_counts (
+    region TEXT PRIMARY KEY,
+    companies_count INTEGER
+);
@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS snapshot_versions (
+    id INTEGER PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    mode TEXT,
+    row_count INTEGER,
+    build_seconds REAL,
+    created_at DATETIME,
+    activated_at DATETIME
+);
@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS price_rollups (
+    region TEXT NOT NULL DEFAULT '',
+    region_code TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    brand TEXT NOT NULL DEFAULT '',
+    day TEXT NOT NULL,
+    price_count INTEGER NOT NULL,
+    price_sum REAL NOT NULL,
+    price_min REAL,
+    price_max REAL,
+    price_sumsq REAL NOT NULL,
+    PRIMARY KEY (region, region_code, category, brand, day)
+);
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS price_sketches (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sketch TEXT NOT NULL,
+    price_count INTEGER NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (dimension, key)
+);
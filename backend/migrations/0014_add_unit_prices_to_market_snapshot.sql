@@ -0,0 +1,3 @@
+-- Pack price normalized to 1 l / 1 kg from retail_products_parsed.volume_ml / weight_g.
+ALTER TABLE market_snapshot ADD COLUMN price_per_l REAL;
+ALTER TABLE market_snapshot ADD COLUMN price_per_kg REAL;
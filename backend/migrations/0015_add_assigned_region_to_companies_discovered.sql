@@ -0,0 +1,5 @@
+-- Region whose centre is nearest to the company's coordinates (regions.nearest_region);
+-- companies_discovered.region stays the region whose search point found the company.
+ALTER TABLE companies_discovered ADD COLUMN assigned_region TEXT;
+ALTER TABLE companies_discovered ADD COLUMN region_distance_km REAL;
+CREATE INDEX IF NOT EXISTS ix_companies_discovered_assigned_region ON companies_discovered (assigned_region);
@@ -0,0 +1,11 @@
+-- 0.1 degree grid cell of (lat, lon), see app/modules/companies/geo_grid.py:
+-- geo_cell = (floor(lat * 10) + 900) * 3600 + (floor(lon * 10) + 1800) % 3600
+ALTER TABLE companies_discovered ADD COLUMN geo_cell INTEGER;
+CREATE INDEX IF NOT EXISTS ix_companies_discovered_geo_cell ON companies_discovered (geo_cell);
+
+-- SQLite has no floor() in older builds: CAST truncates toward zero, so subtract 1 for negative fractions
+UPDATE companies_discovered
+SET geo_cell =
+    (max(min(CAST(lat * 10 AS INTEGER) - (lat * 10 < CAST(lat * 10 AS INTEGER)), 899), -900) + 900) * 3600
+    + (CAST(lon * 10 AS INTEGER) - (lon * 10 < CAST(lon * 10 AS INTEGER)) + 1800) % 3600
+WHERE lat IS NOT NULL AND lon IS NOT NULL;
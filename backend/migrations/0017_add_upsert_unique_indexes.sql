@@ -0,0 +1,24 @@
+-- Unique keys backing INSERT ... ON CONFLICT in app/db/upsert.py.
+-- regions and products are ORM tables; create them here if the app has not yet.
+CREATE TABLE IF NOT EXISTS regions (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(150) NOT NULL,
+    country VARCHAR(50) NOT NULL,
+    federal_district VARCHAR(100),
+    center_lat FLOAT,
+    center_lon FLOAT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_regions_name ON regions (name);
+
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    volume_liters FLOAT,
+    fat_percent FLOAT,
+    brand_id INTEGER NOT NULL REFERENCES brands (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_products_name ON products (name);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_products_name_brand ON products (name, brand_id);
@@ -0,0 +1,23 @@
+-- Indexes for the hot read paths; tests/test_query_plans.py checks the plans.
+
+-- run_brand_company_matching.load_brands: brand IS NOT NULL, reads (brand, region) from the index only
+CREATE INDEX IF NOT EXISTS ix_retail_products_parsed_brand_region ON retail_products_parsed (brand, region);
+
+-- build_market_snapshot: SELECT DISTINCT region, join to the region map on region
+CREATE INDEX IF NOT EXISTS ix_retail_products_parsed_region ON retail_products_parsed (region);
+
+-- refresh_company_counts (UPDATE ... WHERE region = ?), per-region reads and olap region filters;
+-- price_value makes the price_sketches scan index-only
+CREATE INDEX IF NOT EXISTS ix_market_snapshot_region_category ON market_snapshot (region, category, price_value);
+
+-- olap category filters
+CREATE INDEX IF NOT EXISTS ix_market_snapshot_category_region ON market_snapshot (category, region);
+
+-- region lookups, and build_company_counts groups by coalesce(assigned_region, region)
+CREATE INDEX IF NOT EXISTS ix_companies_discovered_region ON companies_discovered (region);
+CREATE INDEX IF NOT EXISTS ix_companies_discovered_company_region
+    ON companies_discovered (coalesce(assigned_region, region));
+
+-- import_yandex_catalog dedupe key lookup (app.db.upsert.existing_keys)
+CREATE INDEX IF NOT EXISTS ix_retail_offers_dedupe
+    ON retail_offers (source, region, product_name, price_value);
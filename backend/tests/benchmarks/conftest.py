@@ -0,0 +1,125 @@
+"""Analytics stage benchmarks over a synthetic database.
+
+Opt-in: set BENCH_ROWS (e.g. 1000000) to run them.
+
+    BENCH_ROWS=1000000 python -m pytest tests/benchmarks -s
+
+Every stage runs in a fresh spawned process whose working directory holds the
+synthetic app.db, so peak RSS is the stage's own. DATABASE_URL and
+READ_DATABASE_URL are set to that file and SNAPSHOT_PARQUET_DIR to the same
+directory in the child, whatever the shell or .env say. Results are appended to
+BENCH_OUTPUT (default data/benchmarks/results.jsonl). With BENCH_BASELINE
+pointing at an earlier results file, a stage fails when its wall time or peak
+RSS exceeds the baseline for the same row count by more than BENCH_TOLERANCE
+(default 1.25).
+"""
+
+import importlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+BENCH_ROWS = int(os.environ.get("BENCH_ROWS", "0"))
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+OUTPUT = Path(os.environ.get("BENCH_OUTPUT", BACKEND_DIR / "data" / "benchmarks" / "results.jsonl"))
+
+TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", "1.25"))
+
+_results: list[dict] = []
+
+
+def _redirect_outputs(module, workdir: Path) -> None:
+    # keep exports inside the benchmark directory instead of backend/data
+    analytics_dir = workdir / "analytics"
+    if module.__name__.endswith("run_pandas_mvp"):
+        module.OUT_DIR = analytics_dir
+    if module.__name__.endswith("export_plotly_graphs"):
+        module.BASE_DIR = analytics_dir
+        module.OUT_DIR = analytics_dir / "plots"
+
+
+def _child(target: str, argv: list[str], workdir: str, queue) -> None:
+    os.chdir(workdir)
+    # explicit, so DATABASE_URL from the shell or .env never points a stage at a real database
+    database_url = f"sqlite:///{Path(workdir) / 'app.db'}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["READ_DATABASE_URL"] = database_url
+    os.environ["SNAPSHOT_PARQUET_DIR"] = str(Path(workdir) / "market_snapshot")
+    sys.argv = [target, *argv]
+    module = importlib.import_module(target)
+    _redirect_outputs(module, Path(workdir))
+    start = time.perf_counter()
+    module.main()
+    seconds = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux
+    queue.put({"seconds": seconds, "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024})
+
+
+def _baseline() -> dict[tuple[str, int], dict]:
+    path = os.environ.get("BENCH_BASELINE")
+    if not path:
+        return {}
+    rows = [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines() if line.strip()]
+    # the latest entry per (stage, rows) wins
+    return {(r["stage"], r["rows"]): r for r in rows}
+
+
+@pytest.fixture(scope="session")
+def bench_rows() -> int:
+    return BENCH_ROWS
+
+
+@pytest.fixture(scope="session")
+def bench_workdir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("bench")
+
+
+@pytest.fixture(scope="session")
+def run_stage(bench_workdir):
+    """Run `python -m <target> <argv>` in a fresh process and record wall time and peak RSS."""
+    ctx = multiprocessing.get_context("spawn")
+    baseline = _baseline()
+
+    def run(stage: str, target: str, argv: list[str] | None = None) -> dict:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_child, args=(target, argv or [], str(bench_workdir), queue))
+        proc.start()
+        proc.join()
+        assert proc.exitcode == 0, f"{stage} failed with exit code {proc.exitcode}"
+        result = {
+            "stage": stage,
+            "rows": BENCH_ROWS,
+            **queue.get(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        _results.append(result)
+        OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+        with OUTPUT.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(result) + "\n")
+
+        previous = baseline.get((stage, BENCH_ROWS))
+        if previous:
+            for metric in ("seconds", "peak_rss_mib"):
+                limit = previous[metric] * TOLERANCE
+                assert result[metric] <= limit, f"{stage} {metric} regressed: {result[metric]:.1f} > {limit:.1f}"
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.section(f"analytics benchmarks ({BENCH_ROWS} rows)")
+    for r in _results:
+        terminalreporter.write_line(f"{r['stage']:<28} {r['seconds']:>9.2f} s {r['peak_rss_mib']:>9.1f} MiB")
+    terminalreporter.write_line(f"appended to {OUTPUT}")
@@ -0,0 +1,36 @@
+"""Stages run in pipeline order; each one reads what the previous one wrote."""
+
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.environ.get("BENCH_ROWS"), reason="set BENCH_ROWS to run the analytics benchmarks")
+
+
+def test_generate(run_stage, bench_rows):
+    companies = max(bench_rows // 50, 100)
+    run_stage(
+        "generate",
+        "app.modules.analytics.synthetic_data",
+        ["--db", "app.db", "--offers", str(bench_rows), "--companies", str(companies)],
+    )
+
+
+def test_build_snapshot_full(run_stage):
+    run_stage("build_market_snapshot_full", "app.modules.analytics.build_market_snapshot", ["--full"])
+
+
+def test_build_snapshot_full_sql(run_stage):
+    run_stage("build_market_snapshot_sql", "app.modules.analytics.build_market_snapshot", ["--full", "--sql"])
+
+
+def test_build_snapshot_incremental_noop(run_stage):
+    run_stage("build_market_snapshot_incr", "app.modules.analytics.build_market_snapshot")
+
+
+def test_run_pandas_mvp(run_stage):
+    run_stage("run_pandas_mvp", "app.modules.analytics.run_pandas_mvp")
+
+
+def test_export_plotly_graphs(run_stage):
+    run_stage("export_plotly_graphs", "app.modules.analytics.export_plotly_graphs", ["--force", "--workers", "1"])
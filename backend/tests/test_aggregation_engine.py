@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from app.modules.analytics.aggregation_engine import compute_metrics
+
+
+def _snapshot() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "region": ["Москва", "Москва", None, "213", "213"],
+            "region_code": [None, None, None, "213", "213"],
+            "category": ["молоко", None, "молоко", "кефир", "кефир"],
+            "price_value": [80.0, np.nan, 95.5, 60.0, 70.0],
+        }
+    ).astype({"region": "category", "category": "category"})
+
+
+def test_single_pass_matches_per_metric_groupby():
+    df = _snapshot()
+    results = compute_metrics(df)
+
+    priced = df[df["price_value"].notna()]
+    expected = (
+        priced.groupby(["region", "region_code"], dropna=False, observed=True)["price_value"]
+        .agg(["count", "mean", "min", "max"])
+        .reset_index()
+    )
+    by_region = results["by_region"]
+    assert list(by_region.columns) == ["region", "region_code", "product_count", "avg_price", "min_price", "max_price"]
+    assert by_region["product_count"].tolist() == expected["count"].tolist()
+    assert np.allclose(by_region["avg_price"], expected["mean"])
+
+    assert results["overview"] == {
+        "total_products": 4,
+        "distinct_regions": 2,
+        "distinct_categories": 2,
+        "avg_price": 76.375,
+        "min_price": 60.0,
+        "max_price": 95.5,
+    }
+    assert len(results["price_distribution"]) == 4
+
+
+def test_unit_prices_are_averaged_over_rows_with_a_pack_size():
+    df = _snapshot().assign(
+        price_per_l=[80.0, np.nan, np.nan, 120.0, 70.0],
+        price_per_kg=[np.nan, np.nan, np.nan, np.nan, np.nan],
+    )
+    by_category = compute_metrics(df, ["by_category"])["by_category"].set_index("category")
+
+    assert by_category.loc["кефир", "avg_price_per_l"] == 95.0
+    assert by_category.loc["молоко", "avg_price_per_l"] == 80.0
+    assert by_category["avg_price_per_kg"].isna().all()
+    assert list(by_category.columns)[:4] == ["product_count", "avg_price", "min_price", "max_price"]
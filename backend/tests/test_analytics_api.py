@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.main import app
+from app.modules.analytics import loaders, payloads
+from app.modules.analytics.aggregations import compute_overview_metrics
+from app.modules.analytics.build_market_snapshot import build_full
+from app.modules.analytics.synthetic_data import create_schema, generate
+
+client = TestClient(app)
+
+
+def use_database(monkeypatch, engine) -> None:
+    monkeypatch.setattr(payloads, "ReadSessionLocal", sessionmaker(engine))
+    monkeypatch.setattr(loaders, "read_engine", engine)
+    monkeypatch.setattr(payloads, "_cache", {"token": None, "payloads": {}})
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    create_schema(engine)
+    with Session(engine) as db:
+        generate(db, offers=300, companies=20, seed=1)
+        db.commit()
+        build_full(db)
+    use_database(monkeypatch, engine)
+    return engine
+
+
+def test_overview_etag_and_conditional_get(engine):
+    response = client.get('/api/v1/analytics/overview')
+    assert response.status_code == 200
+    etag = response.headers['etag']
+    assert 'must-revalidate' in response.headers['cache-control']
+    body = response.json()
+    with Session(engine) as db:
+        assert body['snapshot_version'] == payloads.snapshot_token(db)
+    expected = compute_overview_metrics(loaders.load_market_snapshot(columns=payloads.PAYLOAD_COLUMNS))
+    assert body['data'] == pytest.approx(expected)
+    assert body['data']['total_products'] == 300
+
+    cached = client.get('/api/v1/analytics/overview', headers={'If-None-Match': f'"other", {etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b''
+    assert cached.headers['etag'] == etag
+
+
+def test_etags_follow_the_payload_data_not_the_snapshot_version(engine):
+    before = {name: client.get(f'/api/v1/analytics/{name}') for name in payloads.PAYLOAD_NAMES}
+    assert all(response.status_code == 200 for response in before.values())
+    assert set(before['price-distribution'].json()['data']) == {'bins', 'sample'}
+    # same version: served from the per-process cache, byte for byte
+    assert client.get('/api/v1/analytics/regions').content == before['regions'].content
+    etag = before['regions'].headers['etag']
+
+    # a new version with the same rows keeps the ETag
+    with Session(engine) as db:
+        build_full(db)
+    rebuilt = client.get('/api/v1/analytics/regions', headers={'If-None-Match': etag})
+    assert rebuilt.status_code == 304
+    assert rebuilt.headers['etag'] == etag
+
+    with Session(engine) as db:
+        db.execute(text("UPDATE retail_offers SET price_value = price_value * 2"))
+        db.commit()
+        build_full(db)
+    changed = client.get('/api/v1/analytics/regions', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['etag'] != etag
+    assert changed.json()['data'] != before['regions'].json()['data']
+
+
+def test_payload_without_a_snapshot_is_unavailable(tmp_path, monkeypatch):
+    use_database(monkeypatch, create_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+    assert client.get('/api/v1/analytics/overview').status_code == 503
@@ -0,0 +1,81 @@
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, UniqueConstraint, create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import IF_NOT_EMPTY, KEEP, bulk_upsert, existing_keys, get_or_create_ids
+from app.modules.companies.models_discovered import CompanyDiscovered
+from app.modules.companies.run_2gis_discovered_ingest import upsert_companies
+
+metadata = MetaData()
+
+items = Table(
+    "items",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("source", String, nullable=False),
+    Column("code", String),
+    Column("name", String),
+    Column("price", Float),
+    Column("note", String),
+    UniqueConstraint("source", "code"),
+)
+
+
+def _db():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    CompanyDiscovered.__table__.create(engine)
+    return Session(engine)
+
+
+def test_bulk_upsert_merges_per_column_and_counts():
+    with _db() as db:
+        first = [
+            {"source": "a", "code": "1", "name": "Молоко", "price": 90.0, "note": "x"},
+            {"source": "a", "code": "2", "name": "Кефир", "price": 80.0, "note": "y"},
+        ]
+        assert bulk_upsert(db, items, first, key=["source", "code"]) == {"inserted": 2, "updated": 0, "unchanged": 0}
+
+        second = [
+            {"source": "a", "code": "1", "name": "", "price": 95.0, "note": "new"},
+            {"source": "a", "code": "3", "name": "Сыр", "price": None, "note": None},
+        ]
+        counts = bulk_upsert(
+            db, items, second, key=["source", "code"], rules={"name": IF_NOT_EMPTY, "note": KEEP}, batch_size=1
+        )
+        assert counts == {"inserted": 1, "updated": 1, "unchanged": 0}
+        rows = db.execute(select(items.c.code, items.c.name, items.c.price, items.c.note).order_by(items.c.code)).all()
+        assert rows == [("1", "Молоко", 95.0, "x"), ("2", "Кефир", 80.0, "y"), ("3", "Сыр", None, None)]
+
+        # the WHERE clause leaves rows alone when nothing new came in
+        counts = bulk_upsert(
+            db, items, [{"source": "a", "code": "2", "price": None}], key=["source", "code"],
+            default_rule=IF_NOT_EMPTY, where=lambda existing, incoming: incoming.price.isnot(None),
+        )
+        assert counts == {"inserted": 0, "updated": 0, "unchanged": 1}
+
+
+def test_get_or_create_ids_and_existing_keys_with_nulls():
+    with _db() as db:
+        ids = get_or_create_ids(db, items, [{"source": "a", "code": "1"}, {"source": "b", "code": None}], key=["source", "code"])
+        again = get_or_create_ids(db, items, [{"source": "a", "code": "1"}, {"source": "a", "code": "9"}], key=["source", "code"])
+        assert again[("a", "1")] == ids[("a", "1")]
+        assert len(set(again.values()) | set(ids.values())) == 3
+
+        rows = [{"source": "b", "code": None}, {"source": "b", "code": "1"}, {"source": "a", "code": "9"}]
+        assert existing_keys(db, items, ["source", "code"], rows) == {("b", None), ("a", "9")}
+
+
+def test_upsert_companies_keeps_known_fields_and_clears_region_on_move():
+    with _db() as db:
+        item = {"external_id": 7, "name": "Молзавод", "phone": "+7 900", "lat": 55.7, "lon": 37.6}
+        assert upsert_companies(db, [item, {"name": "без id"}]) == {"inserted": 1, "updated": 0, "skipped": 1}
+        db.execute(CompanyDiscovered.__table__.update().values(assigned_region="Москва"))
+
+        moved = {"external_id": 7, "name": "", "phone": None, "lat": 56.86, "lon": 35.92, "website": "milk.ru"}
+        assert upsert_companies(db, [moved]) == {"inserted": 0, "updated": 1, "skipped": 0}
+        assert upsert_companies(db, [{"external_id": 7, "name": ""}]) == {"inserted": 0, "updated": 0, "skipped": 1}
+
+        company = db.execute(select(CompanyDiscovered)).scalar_one()
+        assert (company.name, company.phone, company.website) == ("Молзавод", "+7 900", "milk.ru")
+        assert company.assigned_region is None
+        assert company.geo_cell is not None
@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.async_session import create_async_db_engine
+from app.db.base import Base
+from app.db.deps import get_async_db, get_async_read_db
+from app.main import app
+
+
+@pytest.fixture()
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    Base.metadata.create_all(create_engine(url))
+    Session = async_sessionmaker(create_async_db_engine(url), expire_on_commit=False)
+    ReadSession = async_sessionmaker(create_async_db_engine(url, read_only=True), expire_on_commit=False)
+
+    async def get_db():
+        async with Session() as db:
+            yield db
+
+    async def get_read_db():
+        async with ReadSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = get_db
+    app.dependency_overrides[get_async_read_db] = get_read_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_create_then_list_companies(client):
+    for name in ["Савушкин продукт", "Агрокомплекс"]:
+        response = client.post("/api/v1/companies/", json={"name": name, "region": "Москва"})
+        assert response.status_code == 200
+        assert response.json()["name"] == name
+
+    listed = client.get("/api/v1/companies/").json()
+    assert [c["name"] for c in listed] == ["Агрокомплекс", "Савушкин продукт"]
+    assert listed[0]["country"] == "RU"
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.async_session import create_async_db_engine
+from app.db.deps import get_async_read_db
+from app.main import app
+from app.modules.companies.geo_grid import geo_cell
+from app.modules.companies.models_discovered import CompanyDiscovered
+
+COMPANIES = [
+    ("Молочный завод Москва", 55.76, 37.62),
+    ("Ферма Подольск", 55.43, 37.54),  # ~37 km from the centre of Moscow
+    ("Завод Тверь", 56.86, 35.92),  # ~160 km
+    ("Молзавод Анадырь", 64.73, 177.5),
+    ("Чукотка восток", 65.0, -179.9),  # across the antimeridian, ~130 km from Anadyr
+]
+
+
+@pytest.fixture()
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    CompanyDiscovered.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(CompanyDiscovered),
+            [
+                {"external_id": str(i), "name": name, "lat": lat, "lon": lon, "geo_cell": geo_cell(lat, lon)}
+                for i, (name, lat, lon) in enumerate(COMPANIES)
+            ],
+        )
+    Session = async_sessionmaker(create_async_db_engine(url, read_only=True), expire_on_commit=False)
+
+    async def override():
+        async with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_async_read_db] = override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_nearby_returns_companies_within_radius_nearest_first(client):
+    response = client.get("/api/v1/companies/nearby", params={"lat": 55.7558, "lon": 37.6173, "radius_km": 50})
+    assert response.status_code == 200
+    body = response.json()
+    assert [c["name"] for c in body] == ["Молочный завод Москва", "Ферма Подольск"]
+    assert body[0]["distance_km"] < body[1]["distance_km"] < 50
+
+    across = client.get("/api/v1/companies/nearby", params={"lat": 64.73, "lon": 177.5, "radius_km": 200}).json()
+    assert [c["name"] for c in across] == ["Молзавод Анадырь", "Чукотка восток"]
+
+    assert client.get("/api/v1/companies/nearby", params={"lat": 95, "lon": 0, "radius_km": 5}).status_code == 422
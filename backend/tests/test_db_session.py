@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.session import create_db_engine
+
+
+def test_sqlite_engines_use_wal_and_read_only_refuses_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    writer = create_db_engine(url)
+    reader = create_db_engine(url, read_only=True)
+
+    with writer.begin() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    # an open write transaction does not block readers under WAL
+    with writer.connect() as busy, reader.connect() as conn:
+        busy.execute(text("INSERT INTO t VALUES (2)"))
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (3)"))
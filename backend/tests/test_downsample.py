@@ -0,0 +1,20 @@
+import numpy as np
+
+from app.modules.analytics.plots.downsample import lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10_000)
+    y = np.zeros(10_000)
+    y[4321] = 50.0
+    y[7000] = -30.0
+
+    kept = lttb_indices(x, y, 100)
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 9_999
+    assert np.all(np.diff(kept) > 0)
+    assert 4321 in kept and 7000 in kept
+
+
+def test_lttb_returns_short_series_whole():
+    assert list(lttb_indices([1, 2, 3], [3, 1, 2], 10)) == [0, 1, 2]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.modules.analytics.aggregations import price_distribution
+from app.modules.analytics.histograms import HISTOGRAM_COLUMNS, price_histogram, sample_per_group
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    n = 5000
+    prices = np.round(rng.lognormal(4.5, 0.4, n), 2)
+    prices[::50] = np.nan
+    return pd.DataFrame(
+        {
+            "region": rng.choice(["Москва", "Тверская область", None], n, p=[0.6, 0.3, 0.1]),
+            "category": rng.choice(["молоко", "кефир", "сыр"], n),
+            "price_value": prices,
+        }
+    )
+
+
+def group_sizes(df):
+    return df[df["price_value"].notna()].groupby(["region", "category"], dropna=False).size()
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_histogram_counts_every_priced_row_once(df, adaptive):
+    bins = price_histogram(df, bins=20, adaptive=adaptive)
+
+    assert list(bins.columns) == HISTOGRAM_COLUMNS
+    counts = bins.groupby(["region", "category"], dropna=False)["count"].sum()
+    pd.testing.assert_series_equal(counts, group_sizes(df), check_names=False)
+    # size depends on the bins, not on the 5000 rows
+    assert len(bins) <= 9 * 20
+    assert (bins["count"] > 0).all()
+    assert (bins["bin_left"] <= bins["bin_right"]).all()
+
+
+def test_fixed_histogram_shares_edges_across_groups(df):
+    bins = price_histogram(df, bins=10)
+    edges = np.histogram_bin_edges(df["price_value"].dropna(), bins=10)
+    assert set(bins["bin_left"]) <= set(edges[:-1])
+    assert bins["bin_right"].max() == edges[-1]
+
+
+def test_histogram_of_unpriced_rows_is_empty(df):
+    bins = price_histogram(df.assign(price_value=np.nan))
+    assert bins.empty and list(bins.columns) == HISTOGRAM_COLUMNS
+
+
+def test_sample_is_bounded_per_group_and_deterministic(df):
+    sample = sample_per_group(df, size=25, seed=1)
+
+    assert list(sample.columns) == list(price_distribution(df).columns)
+    assert sample["price_value"].notna().all()
+    sizes = sample.groupby(["region", "category"], dropna=False).size()
+    pd.testing.assert_series_equal(sizes, group_sizes(df).clip(upper=25), check_names=False)
+    pd.testing.assert_frame_equal(sample, sample_per_group(df, size=25, seed=1))
+    assert not sample.equals(sample_per_group(df, size=25, seed=2))
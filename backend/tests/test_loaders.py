@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine, insert
+
+from app.modules.analytics import loaders
+from app.modules.analytics.models import market_snapshot
+
+
+def test_load_market_snapshot_keeps_prices_exact(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    market_snapshot.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(market_snapshot),
+            [
+                {"region": "Москва", "category": "молоко", "price_value": 27.57, "price_per_l": 29.64,
+                 "companies_count_region": 3, "source_parsed_id": 1, "collected_at": "2024-01-02T03:04:05"},
+                {"region": "Москва", "category": "кефир", "price_value": 89.9, "price_per_l": None,
+                 "companies_count_region": 3, "source_parsed_id": 2, "collected_at": "2024-01-03T00:00:00"},
+            ],
+        )
+    monkeypatch.setattr(loaders, "read_engine", engine)
+
+    df = loaders.load_market_snapshot()
+
+    assert df["price_value"].dtype == "float64"
+    assert df["price_value"].min() == 27.57
+    assert df["price_per_l"].iloc[0] == 29.64
+    assert df["region"].dtype == "category"
+    assert df["companies_count_region"].dtype == "uint8"
+    assert df["source_parsed_id"].dtype == "uint8"
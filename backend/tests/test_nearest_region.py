@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from app.modules.regions import nearest_region
+from app.modules.regions.nearest_region import EARTH_RADIUS_KM, RegionIndex
+
+NAMES = ["Москва", "Санкт-Петербург", "Новосибирская область", "Приморский край"]
+LAT = np.array([55.7558, 59.9386, 55.0084, 43.1155])
+LON = np.array([37.6173, 30.3141, 82.9357, 131.8855])
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def test_nearest_matches_brute_force_haversine():
+    index = RegionIndex(NAMES, LAT, LON)
+
+    rng = np.random.default_rng(1)
+    plat = rng.uniform(42, 62, 2000)
+    plon = rng.uniform(28, 140, 2000)
+    got, km = index.nearest(plat, plon, chunk_size=300)
+
+    distances = _haversine_km(plat[:, None], plon[:, None], LAT[None, :], LON[None, :])
+    expected = np.asarray(NAMES, dtype=object)[distances.argmin(axis=1)]
+    assert (got == expected).all()
+    assert np.allclose(km, distances.min(axis=1), atol=1e-6)
+
+
+@pytest.mark.skipif(nearest_region.cKDTree is None, reason="scipy not installed")
+def test_kd_tree_and_brute_force_agree(monkeypatch):
+    tree_index = RegionIndex(NAMES, LAT, LON)
+    monkeypatch.setattr(nearest_region, "cKDTree", None)
+    brute_index = RegionIndex(NAMES, LAT, LON)
+    assert tree_index.tree is not None and brute_index.tree is None
+
+    rng = np.random.default_rng(2)
+    # the whole globe, plus the centres themselves (distance 0)
+    plat = np.concatenate([rng.uniform(-90, 90, 5000), LAT])
+    plon = np.concatenate([rng.uniform(-180, 180, 5000), LON])
+    tree_names, tree_km = tree_index.nearest(plat, plon)
+    brute_names, brute_km = brute_index.nearest(plat, plon, chunk_size=777)
+
+    assert (tree_names == brute_names).all()
+    np.testing.assert_allclose(tree_km, brute_km, atol=1e-6)
+    np.testing.assert_allclose(tree_km[-len(LAT):], 0.0, atol=1e-6)
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import Session
+
+from app.modules.analytics import olap
+from app.modules.analytics.models import market_snapshot
+from app.modules.analytics.parquet_store import parquet_available, write_snapshot
+
+ROWS = [
+    ("Молоко 1 л", "Простоквашино", "молоко", 100.0, "Москва", "213", "2024-01-01T10:00:00"),
+    ("Молоко 1 л", "Простоквашино", "молоко", 120.0, "Москва", "213", "2024-01-02T10:00:00"),
+    ("Кефир 1 л", "Савушкин", "кефир", 90.0, "Москва", "213", "2024-01-02T11:00:00"),
+    ("Молоко 0.9 л", "Агуша", "молоко", 80.0, "Тверская область", "10819", "2024-01-03T09:00:00"),
+    ("Сыр 200 г", "Валио", "сыр", None, "Тверская область", "10819", "2024-01-03T09:30:00"),
+]
+
+COLUMNS = ["product_name", "brand_name", "category", "price_value", "region", "region_code", "collected_at"]
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite://")
+    market_snapshot.create(engine)
+    with Session(engine) as session:
+        session.execute(insert(market_snapshot), [dict(zip(COLUMNS, row)) for row in ROWS])
+        yield session
+
+
+def test_sql_backend_groups_and_filters(db):
+    df = olap.query(["region", "category"], ["count", "avg_price", "max_price"], {"category": "молоко"}, backend="sql", db=db)
+    assert df.to_dict(orient="records") == [
+        {"region": "Москва", "category": "молоко", "count": 2, "avg_price": 110.0, "max_price": 120.0},
+        {"region": "Тверская область", "category": "молоко", "count": 1, "avg_price": 80.0, "max_price": 80.0},
+    ]
+
+    by_day = olap.query(["collected_date"], ["count"], date_from="2024-01-02", date_to="2024-01-02", backend="sql", db=db)
+    assert by_day.to_dict(orient="records") == [{"collected_date": "2024-01-02", "count": 2}]
+
+
+def test_unknown_names_are_rejected(db):
+    with pytest.raises(ValueError):
+        olap.query(["price_value; --"], ["count"], backend="sql", db=db)
+    with pytest.raises(ValueError):
+        olap.query(["region"], ["median"], backend="sql", db=db)
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow not installed")
+def test_arrow_backend_matches_sql(db, tmp_path):
+    write_snapshot([pd.DataFrame(ROWS, columns=COLUMNS)], root=tmp_path / "snapshot")
+    args = (["region_code", "category"], ["count", "sum_price", "distinct_products"], {"region_code": ["213", "10819"]})
+
+    arrow = olap.query(*args, backend="arrow", root=tmp_path / "snapshot")
+    sql = olap.query(*args, backend="sql", db=db)
+    pd.testing.assert_frame_equal(arrow, sql, check_dtype=False)
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow not installed")
+@pytest.mark.parametrize(
+    "backend",
+    ["arrow", pytest.param("duckdb", marks=pytest.mark.skipif(olap.duckdb is None, reason="duckdb not installed"))],
+)
+def test_parquet_backends_match_sql_for_every_measure(db, tmp_path, backend):
+    frame = pd.DataFrame(ROWS, columns=COLUMNS).assign(
+        price_per_l=[100.0, 120.0, 90.0, 88.89, None],
+        price_per_kg=[None, None, None, None, 1250.0],
+    )
+    db.execute(delete(market_snapshot))
+    db.execute(insert(market_snapshot), frame.astype(object).where(frame.notna(), None).to_dict(orient="records"))
+    write_snapshot([frame], root=tmp_path / "snapshot")
+    args = (["region", "category"], list(olap.MEASURES), {"category": ["молоко", "сыр"]})
+
+    parquet = olap.query(*args, date_from="2024-01-02", backend=backend, root=tmp_path / "snapshot")
+    sql = olap.query(*args, date_from="2024-01-02", backend="sql", db=db)
+    assert len(sql) == 3
+    pd.testing.assert_frame_equal(parquet, sql, check_dtype=False)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from app.modules.analytics.outliers import filter_outliers
+
+
+def _prices() -> pd.DataFrame:
+    milk = [90.0, 92.0, 95.0, 97.0, 99.0, 100.0, 101.0, 103.0, 105.0, 98000.0]
+    kefir = [60.0, 61.0, 62.0, 900.0]  # too small a group to judge
+    return pd.DataFrame(
+        {
+            "category": ["молоко"] * len(milk) + ["кефир"] * len(kefir),
+            "region": "Москва",
+            "price_value": milk + kefir,
+        }
+    )
+
+
+def test_drop_removes_only_outliers_of_large_enough_groups():
+    df = _prices()
+    for method in ("iqr", "mad"):
+        kept, summary = filter_outliers(df, method=method)
+        assert 98000.0 not in kept["price_value"].values
+        assert 900.0 in kept["price_value"].values
+        assert summary[["category", "rows", "outliers"]].to_dict(orient="records") == [
+            {"category": "молоко", "rows": 10, "outliers": 1}
+        ]
+
+
+def test_flag_keeps_rows_and_ignores_missing_prices():
+    df = _prices()
+    df.loc[0, "price_value"] = np.nan
+    flagged, _ = filter_outliers(df, method="iqr", action="flag")
+    assert len(flagged) == len(df)
+    assert flagged["is_outlier"].tolist().count(True) == 1
+    assert not flagged.loc[0, "is_outlier"]
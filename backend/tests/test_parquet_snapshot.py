@@ -0,0 +1,88 @@
+import sys
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.modules.analytics import build_market_snapshot, export_market_snapshot_parquet, loaders, olap
+from app.modules.analytics.build_market_snapshot import build_full
+from app.modules.analytics.parquet_store import parquet_available
+from app.modules.analytics.synthetic_data import create_schema, generate
+
+pytestmark = pytest.mark.skipif(not parquet_available(), reason="pyarrow not installed")
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    create_schema(engine)
+    with Session(engine) as db:
+        generate(db, offers=300, companies=20, seed=1)
+        db.commit()
+        build_full(db)
+    monkeypatch.setattr(export_market_snapshot_parquet, "read_engine", engine)
+    monkeypatch.setattr(loaders, "read_engine", engine)
+    return engine
+
+
+def test_loader_reads_the_export_of_the_live_snapshot(engine, tmp_path, monkeypatch):
+    root = tmp_path / "market_snapshot"
+    from_table = loaders.load_market_snapshot(root=root)
+    assert export_market_snapshot_parquet.export_snapshot(root) == len(from_table) == 300
+
+    read_snapshot = loaders.read_snapshot
+    reads = []
+    monkeypatch.setattr(loaders, "read_snapshot", lambda **kwargs: reads.append(kwargs) or read_snapshot(**kwargs))
+
+    from_parquet = loaders.load_market_snapshot(root=root)
+    assert len(reads) == 1
+    pd.testing.assert_frame_equal(from_parquet, from_table, check_categorical=False)
+
+    columns = ["region", "category", "price_value"]
+    projected = loaders.load_market_snapshot(columns, root=root)
+    assert reads[-1]["columns"] == ["id", *columns]
+    pd.testing.assert_frame_equal(projected, from_table[columns], check_categorical=False)
+    with Session(engine) as db:
+        assert olap.choose_backend("auto", root, db) in ("duckdb", "arrow")
+
+
+def test_stale_export_falls_back_to_the_table(engine, tmp_path, monkeypatch):
+    root = tmp_path / "market_snapshot"
+    export_market_snapshot_parquet.export_snapshot(root)
+    with Session(engine) as db:
+        build_full(db)
+        assert not export_market_snapshot_parquet.parquet_snapshot_current(db, root)
+        assert olap.choose_backend("auto", root, db) == "sql"
+
+    monkeypatch.setattr(loaders, "read_snapshot", lambda **kwargs: pytest.fail("read a stale export"))
+    assert len(loaders.load_market_snapshot(root=root)) == 300
+
+
+def test_cli_exports_only_after_builds_that_change_the_snapshot(engine, tmp_path, monkeypatch):
+    root = tmp_path / "market_snapshot"
+    exports = []
+    monkeypatch.setattr(build_market_snapshot, "SessionLocal", sessionmaker(engine))
+    monkeypatch.setattr(build_market_snapshot, "SNAPSHOT_DIR", root)
+    monkeypatch.setattr(build_market_snapshot, "export_snapshot", lambda root: exports.append(root) or 0)
+
+    def run(*argv):
+        monkeypatch.setattr(sys, "argv", ["build_market_snapshot", *argv])
+        build_market_snapshot.main()
+        return len(exports)
+
+    assert run("--full") == 1
+    export_market_snapshot_parquet.export_snapshot(root)
+    # nothing new: no export, and the existing one stays current
+    assert run("--parquet") == 1
+    with Session(engine) as db:
+        assert export_market_snapshot_parquet.parquet_snapshot_current(db, root)
+        db.execute(text("UPDATE retail_products_parsed SET brand = 'Новый бренд', parsed_at = '2030-01-01' WHERE id = 5"))
+        db.commit()
+    # incremental builds export only on request
+    assert run() == 1
+    with Session(engine) as db:
+        db.execute(text("UPDATE retail_products_parsed SET parsed_at = '2030-01-02' WHERE id = 5"))
+        db.commit()
+    assert run("--parquet") == 2
+    assert run("--full", "--no-parquet") == 2
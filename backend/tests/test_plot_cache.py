@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from app.modules.analytics.plots import plot_cache
+
+
+def _write_region_summary(base_dir, avg_price):
+    pd.DataFrame(
+        {
+            "region": ["Москва", "Тверская область"],
+            "region_code": ["213", "14"],
+            "product_count": [10, 4],
+            "avg_price": [avg_price, 80.0],
+            "min_price": [50.0, 60.0],
+            "max_price": [200.0, 95.0],
+        }
+    ).to_csv(base_dir / "region_summary.csv", index=False)
+
+
+def test_params_are_canonical_and_validated():
+    a = plot_cache.normalize_params("price_by_region", {"regions": ["b", "A", "b"], "metric": None})
+    b = plot_cache.normalize_params("price_by_region", {"regions": ["A", "b"]})
+    assert a == b == {"regions": ["A", "b"]}
+
+    with pytest.raises(ValueError):
+        plot_cache.normalize_params("price_by_region", {"categories": ["milk"]})
+    with pytest.raises(ValueError):
+        plot_cache.normalize_params("price_by_region", {"metric": "price_value; drop"})
+
+
+def test_get_plot_memoizes_until_source_changes(tmp_path, monkeypatch):
+    _write_region_summary(tmp_path, 100.0)
+    renders = []
+    builder = plot_cache.PLOTS["price_by_region"]["builder"]
+
+    def counting_builder(df, **params):
+        renders.append(params)
+        return builder(df, **params)
+
+    monkeypatch.setitem(plot_cache.PLOTS["price_by_region"], "builder", counting_builder)
+
+    key, body = plot_cache.get_plot("price_by_region", {"regions": ["москва"]}, base_dir=tmp_path)
+    again, cached = plot_cache.get_plot("price_by_region", {"regions": ["москва"]}, base_dir=tmp_path)
+    assert (again, cached) == (key, body)
+    assert len(renders) == 1
+
+    _write_region_summary(tmp_path, 1234.5)
+    changed, _ = plot_cache.get_plot("price_by_region", {"regions": ["москва"]}, base_dir=tmp_path)
+    assert changed != key
+    assert len(renders) == 2
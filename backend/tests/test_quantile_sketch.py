@@ -0,0 +1,27 @@
+import numpy as np
+
+from app.modules.analytics.quantile_sketch import TDigest
+
+
+def test_chunked_and_merged_digests_track_exact_quantiles():
+    rng = np.random.default_rng(42)
+    prices = rng.lognormal(mean=4.5, sigma=0.5, size=200_000)
+
+    chunked = TDigest()
+    for chunk in np.array_split(prices, 20):
+        chunked.update(chunk)
+
+    left, right = TDigest().update(prices[:50_000]), TDigest().update(prices[50_000:])
+    merged = TDigest.from_json(left.merge(right).to_json())
+
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(prices, q)
+        assert abs(chunked.quantile(q) - exact) / exact < 0.01
+        assert abs(merged.quantile(q) - exact) / exact < 0.01
+    assert merged.count == len(prices)
+    assert len(merged.weights) <= merged.compression / 2 + 1
+
+
+def test_empty_and_single_value():
+    assert TDigest().quantile(0.5) is None
+    assert TDigest().update([42.0, np.nan]).quantile(0.99) == 42.0
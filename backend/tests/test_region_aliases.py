@@ -0,0 +1,62 @@
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.modules.regions.aliases import load_region_aliases
+from app.modules.regions.models import Region
+
+LR_MAP = "lr_code,region_name\n213,Москва\n1,Московская область\n10819,Тверская область\n11119,Республика Татарстан\n"
+
+ALIASES = "alias,region_name\nMoscow,Москва\nTver Oblast,Тверская область\nRepublic of Tatarstan,Республика Татарстан\nМск,Москва\n"
+
+
+def _aliases(tmp_path, **kwargs):
+    (tmp_path / "region_lr_map.csv").write_text(LR_MAP, encoding="utf-8")
+    (tmp_path / "region_aliases.csv").write_text(ALIASES, encoding="utf-8")
+    return load_region_aliases(data_dir=tmp_path, **kwargs)
+
+
+def test_spellings_resolve_to_one_region(tmp_path):
+    regions = _aliases(tmp_path)
+    for value in ["Москва", " г. МОСКВА ", "Moscow", "Мск", "213"]:
+        assert regions.resolve(value) == ("Москва", "213")
+    assert regions.resolve("Тверская обл.") == ("Тверская область", "10819")
+    assert regions.resolve("Tatarstan") == ("Республика Татарстан", "11119")
+    assert regions.resolve("999") == ("999", "999")
+    assert regions.resolve("Неизвестный  регион") == ("Неизвестный регион", None)
+    assert regions.resolve("") == (None, None)
+
+    batch = regions.resolve_many(pd.Series(["Moscow", None, "Tver Oblast", "Moscow"]))
+    assert batch["region_code"].tolist()[::2] == ["213", "10819"]
+    assert batch["region_name"].isna().tolist() == [False, True, False, False]
+
+
+def test_mentions_tolerate_case_endings(tmp_path):
+    regions = _aliases(tmp_path)
+    text = "Сравни цены в Тверской области и по Москве, Татарстан не нужен"
+    assert regions.mentions(text) == ["Тверская область", "Москва", "Республика Татарстан"]
+
+
+def test_compiled_index_is_cached_on_disk(tmp_path):
+    _aliases(tmp_path)
+    assert (tmp_path / "cache" / "region_aliases.json").exists()
+    (tmp_path / "region_lr_map.csv").unlink()
+    (tmp_path / "region_aliases.csv").unlink()
+    # source files changed (removed): the cache is not reused
+    assert load_region_aliases(data_dir=tmp_path).resolve("Moscow") == ("Moscow", None)
+
+
+def test_regions_table_names_are_compiled_once_per_name_set(tmp_path):
+    engine = create_engine("sqlite://")
+    Region.__table__.create(engine)
+    with Session(engine) as db:
+        db.execute(insert(Region), [{"name": "Москва", "country": "RU"}, {"name": "Новая область", "country": "RU"}])
+        first = _aliases(tmp_path, db=db)
+        assert first.resolve("новая обл.") == ("Новая область", None)
+        assert load_region_aliases(db, data_dir=tmp_path) is first
+
+        db.execute(insert(Region).values(name="Ещё одна область", country="RU"))
+        second = load_region_aliases(db, data_dir=tmp_path)
+    assert second is not first
+    assert second.resolve("еще одна обл") == ("Ещё одна область", None)
+    assert load_region_aliases(data_dir=tmp_path).resolve("новая обл.") == ("новая обл.", None)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.modules.analytics import aggregations, loaders, rollups
+from app.modules.analytics.build_market_snapshot import build_full, build_incremental, load_build_state
+from app.modules.analytics.models import price_rollups
+from app.modules.analytics.synthetic_data import _insert_frame, create_schema, generate, offer_batch
+from app.modules.retail import run_product_parsing
+from app.modules.retail.writer import retail_offers
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    create_schema(engine)
+    with Session(engine) as db:
+        generate(db, offers=300, companies=20, seed=1)
+        db.commit()
+        build_full(db)
+        rollups.rebuild_from_snapshot(db)
+        db.commit()
+    return engine
+
+
+def rollup_rows(db) -> list[tuple]:
+    return db.execute(select(price_rollups).order_by(*(price_rollups.c[k] for k in rollups.KEY_COLUMNS))).all()
+
+
+def test_apply_deltas_merges_into_existing_keys():
+    engine = create_engine("sqlite://")
+    price_rollups.create(engine)
+    milk = rollups.rollup_key("Москва", "213", "молоко", "Агуша", "2024-01-01")
+    kefir = rollups.rollup_key("Москва", None, "кефир", None, "2024-01-01")
+    assert kefir == ("Москва", "", "кефир", "", "2024-01-01")
+
+    with Session(engine) as db:
+        deltas: dict = {}
+        for price in (10.0, 30.0, None):
+            rollups.add_price(deltas, milk, price)
+        assert rollups.apply_deltas(db, deltas) == 1
+
+        deltas = {}
+        rollups.add_price(deltas, milk, 5.0)
+        rollups.add_price(deltas, kefir, 7.0)
+        assert rollups.apply_deltas(db, deltas) == 2
+        rows = {row[:5]: row[5:] for row in rollup_rows(db)}
+
+    assert rows[milk] == (3, 45.0, 5.0, 30.0, 1025.0)
+    assert rows[kefir] == (1, 7.0, 7.0, 7.0, 49.0)
+
+
+def test_parsing_new_offers_updates_rollups_like_a_rebuild(engine, monkeypatch):
+    offers, _ = offer_batch(np.random.default_rng(7), start_id=301, size=40, days=90)
+    with Session(engine) as db:
+        _insert_frame(db, retail_offers, offers)
+        db.commit()
+    monkeypatch.setattr(run_product_parsing, "SessionLocal", sessionmaker(engine))
+
+    run_product_parsing.main()
+
+    with Session(engine) as db:
+        maintained = rollup_rows(db)
+        build_incremental(db, load_build_state(db))
+        rollups.rebuild_from_snapshot(db)
+        rebuilt = rollup_rows(db)
+    assert sum(row.price_count for row in maintained) == 340
+    assert [row[:6] for row in maintained] == [row[:6] for row in rebuilt]
+    assert [row[6:] for row in maintained] == pytest.approx([row[6:] for row in rebuilt])
+
+
+def test_summaries_match_the_pandas_aggregations(engine, monkeypatch):
+    monkeypatch.setattr(loaders, "read_engine", engine)
+    df = loaders.load_market_snapshot()
+
+    with Session(engine) as db:
+        assert rollups.overview(db) == pytest.approx(aggregations.compute_overview_metrics(df))
+        summaries = {
+            "by_region": (rollups.region_summary(db), aggregations.aggregate_by_region(df)),
+            "by_category": (rollups.category_summary(db), aggregations.aggregate_by_category(df)),
+        }
+    for name, (from_rollups, from_snapshot) in summaries.items():
+        expected = from_snapshot[from_rollups.columns].astype({c: str for c in from_rollups.columns[:-4]})
+        pd.testing.assert_frame_equal(from_rollups, expected, check_dtype=False, obj=name)
@@ -0,0 +1,200 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.modules.analytics import snapshot_versions
+from app.modules.analytics.build_market_snapshot import build_full, build_incremental, load_build_state, unit_prices
+from app.modules.analytics.models import market_snapshot
+from app.modules.analytics.synthetic_data import _insert_frame, create_schema, generate, offer_batch
+from app.modules.companies.models_discovered import CompanyDiscovered
+from app.modules.retail.parsed_models import retail_products_parsed
+from app.modules.retail.writer import retail_offers
+
+SNAPSHOT_COLUMNS = [c for c in market_snapshot.c if c.name != "id"]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    create_schema(engine)
+    with Session(engine) as db:
+        generate(db, offers=300, companies=20, seed=1)
+        db.commit()
+    return engine
+
+
+def snapshot_rows(db) -> list[tuple]:
+    rows = db.execute(select(*SNAPSHOT_COLUMNS)).all()
+    return sorted(rows, key=lambda row: row.source_parsed_id)
+
+
+def add_source_changes(db) -> None:
+    """50 new offers, one re-parsed offer and one more company in Москва."""
+    offers, parsed = offer_batch(np.random.default_rng(7), start_id=301, size=50, days=90)
+    _insert_frame(db, retail_offers, offers)
+    _insert_frame(db, retail_products_parsed, parsed)
+    db.execute(
+        text(
+            "UPDATE retail_products_parsed SET brand = 'Новый бренд', parsed_at = '2025-01-01 00:00:00.000000' "
+            "WHERE id = 5"
+        )
+    )
+    db.execute(
+        insert(CompanyDiscovered.__table__).values(
+            source="2gis", external_id="extra-1", name="Новый завод", region="Москва", discovered_at=datetime(2024, 1, 1)
+        )
+    )
+    db.commit()
+
+
+def versions(db) -> dict[int, str]:
+    stmt = select(snapshot_versions.snapshot_versions.c.id, snapshot_versions.snapshot_versions.c.status)
+    return dict(db.execute(stmt).all())
+
+
+@pytest.mark.parametrize("earlier_builds", [0, 1])
+def test_failed_swap_leaves_live_snapshot_and_versions_unchanged(engine, monkeypatch, earlier_builds):
+    with Session(engine) as db:
+        for _ in range(earlier_builds):
+            build_full(db)
+        rows_before, versions_before = snapshot_rows(db), versions(db)
+
+        rename = snapshot_versions._rename
+
+        def failing_rename(db, old, new):
+            if new == snapshot_versions.LIVE_TABLE:
+                raise RuntimeError("crash mid-swap")
+            rename(db, old, new)
+
+        monkeypatch.setattr(snapshot_versions, "_rename", failing_rename)
+        with pytest.raises(RuntimeError, match="mid-swap"):
+            build_full(db)
+        db.rollback()
+
+    with Session(engine) as db:
+        assert inspect(db.connection()).has_table("market_snapshot")
+        assert snapshot_rows(db) == rows_before
+        # the failed build's shadow table stays 'building' (and a first build has
+        # registered the migration-created table as the legacy 'active' one)
+        after = versions(db)
+        assert {v: s for v, s in after.items() if v in versions_before} == versions_before
+        added = sorted(s for v, s in after.items() if v not in versions_before)
+        assert added == (["building"] if earlier_builds else ["active", "building"])
+        previous = snapshot_versions.get_version(db, "previous")
+        if previous is not None:
+            assert inspect(db.connection()).has_table(previous["table_name"])
+
+
+def test_sql_build_matches_streamed_build(engine):
+    with Session(engine) as db:
+        # whole seconds everywhere else
+        db.execute(text("UPDATE retail_products_parsed SET parsed_at = '2024-01-02 03:04:05.250000' WHERE id = 1"))
+        db.commit()
+        build_full(db)
+        streamed = snapshot_rows(db)
+        build_full(db, sql=True)
+        assert snapshot_rows(db) == streamed
+
+    collected = {row.source_parsed_id: row.collected_at for row in streamed}
+    assert collected[1] == "2024-01-02T03:04:05.250000"
+    assert collected[2] == datetime.fromisoformat(collected[2]).replace(microsecond=0).isoformat()
+
+
+@pytest.mark.parametrize("sql", [False, True])
+def test_incremental_build_matches_full_rebuild(engine, sql):
+    with Session(engine) as db:
+        build_full(db, sql=sql)
+        add_source_changes(db)
+
+        stats = build_incremental(db, load_build_state(db), sql=sql)
+        assert (stats["inserted"], stats["updated"], stats["regions_refreshed"]) == (50, 1, 1)
+        incremental = snapshot_rows(db)
+
+        build_full(db, sql=sql)
+        assert incremental == snapshot_rows(db)
+
+        # nothing new since the watermark
+        stats = build_incremental(db, load_build_state(db), sql=sql)
+        assert (stats["inserted"], stats["updated"], stats["regions_refreshed"]) == (0, 0, 0)
+        assert stats["total"] == 350
+
+
+def test_unit_prices():
+    per_l, per_kg = unit_prices([90.0, 90.0, 90.0, None], [None, 250, 0, 500], [900, None, 0, 1000])
+    np.testing.assert_array_equal(per_l, [100.0, np.nan, np.nan, np.nan])
+    np.testing.assert_array_equal(per_kg, [np.nan, 360.0, np.nan, np.nan])
+
+
+@pytest.mark.parametrize("sql", [False, True])
+def test_build_computes_unit_prices_from_pack_sizes(engine, sql):
+    sizes = {1: (None, 900), 2: (250, None), 3: (None, None), 4: (0, 0)}
+    with Session(engine) as db:
+        for parsed_id, (weight_g, volume_ml) in sizes.items():
+            db.execute(
+                retail_products_parsed.update()
+                .where(retail_products_parsed.c.id == parsed_id)
+                .values(weight_g=weight_g, volume_ml=volume_ml)
+            )
+        db.commit()
+        build_full(db, sql=sql)
+        s = market_snapshot.c
+        rows = db.execute(
+            select(s.source_parsed_id, s.price_value, s.price_per_l, s.price_per_kg).where(s.source_parsed_id.in_(sizes))
+        ).all()
+
+    units = {row.source_parsed_id: (row.price_per_l, row.price_per_kg) for row in rows}
+    prices = {row.source_parsed_id: row.price_value for row in rows}
+    assert units[1] == (pytest.approx(prices[1] * 1000 / 900), None)
+    assert units[2] == (None, pytest.approx(prices[2] * 4))
+    assert units[3] == units[4] == (None, None)
+
+
+def test_streamed_build_does_not_depend_on_batch_size(engine):
+    with Session(engine) as db:
+        stats = build_full(db, batch_size=7)
+        small_batches = snapshot_rows(db)
+        build_full(db, batch_size=5000)
+        assert snapshot_rows(db) == small_batches
+    assert stats["total"] == len(small_batches) == 300
+    assert sum(count for _, count in stats["top_regions"]) <= 300
+
+
+def test_full_builds_swap_in_and_keep_one_previous_version(engine):
+    with Session(engine) as db:
+        first = build_full(db)["version"]
+        second = build_full(db)["version"]
+        statuses = versions(db)
+        assert statuses[second] == "active" and statuses[first] == "previous"
+        assert list(statuses.values()).count("retired") == 1
+
+        tables = set(inspect(db.connection()).get_table_names())
+        assert snapshot_versions.version_table_name(first) in tables
+        assert snapshot_versions.version_table_name(second) not in tables
+        assert not any(snapshot_versions.version_table_name(v) in tables for v, s in statuses.items() if s == "retired")
+
+
+def test_rollback_swaps_the_previous_snapshot_back(engine):
+    with Session(engine) as db:
+        with pytest.raises(RuntimeError):
+            snapshot_versions.rollback(db)
+        db.rollback()
+
+        first = build_full(db)["version"]
+        before = snapshot_rows(db)
+        add_source_changes(db)
+        second = build_full(db)["version"]
+        after = snapshot_rows(db)
+        assert len(after) == len(before) + 50
+
+        assert snapshot_versions.rollback(db) == first
+        db.commit()
+        assert snapshot_rows(db) == before
+        assert versions(db)[second] == "previous"
+
+        # and forward again
+        assert snapshot_versions.rollback(db) == second
+        db.commit()
+        assert snapshot_rows(db) == after
@@ -0,0 +1,82 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.db import instrumentation
+from app.db.instrumentation import N_PLUS_ONE_THRESHOLD, instrument, query_stats, statement_shape
+from app.main import app
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    instrument(engine)
+    instrument(engine)  # idempotent
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)"))
+    return engine
+
+
+def test_statement_shape_folds_literals_and_list_lengths():
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'a''b'") == statement_shape(
+        "SELECT * FROM t WHERE id IN (?)  AND name = 'c'"
+    )
+    multi_row = statement_shape("INSERT INTO t (id, name) VALUES (?, ?), (?, ?)")
+    assert multi_row == "INSERT INTO t (id, name) VALUES (?, ...), ..."
+    assert statement_shape("SELECT t1.id FROM t1 LIMIT 10") == "SELECT t1.id FROM t1 LIMIT ?"
+
+
+def test_counts_executions_per_shape():
+    engine = _engine()
+    query_stats.reset()
+    with engine.begin() as conn:
+        for i in range(3):
+            conn.execute(text(f"SELECT name FROM t WHERE id = {i}"))
+    [row] = query_stats.snapshot()
+    assert row["statement"] == "SELECT name FROM t WHERE id = ?"
+    assert row["count"] == 3
+    assert sum(row["histogram"].values()) == 3
+    assert row["n_plus_one"] == 0
+
+
+def test_flags_n_plus_one_once_per_transaction():
+    engine = _engine()
+    query_stats.reset()
+    for _ in range(2):
+        with engine.begin() as conn:
+            for i in range(N_PLUS_ONE_THRESHOLD + 5):
+                conn.execute(text("SELECT name FROM t WHERE id = :id"), {"id": i})
+    # executemany batches are not N+1
+    with engine.begin() as conn:
+        for _ in range(N_PLUS_ONE_THRESHOLD + 5):
+            conn.execute(text("INSERT INTO t (name) VALUES (:name)"), [{"name": "a"}, {"name": "b"}])
+    stats = {row["statement"]: row for row in query_stats.snapshot()}
+    assert stats["SELECT name FROM t WHERE id = ?"]["n_plus_one"] == 2
+    assert stats["INSERT INTO t (name) VALUES (?, ...)"]["n_plus_one"] == 0
+    assert "Possible N+1" in query_stats.summary()
+
+
+def test_logs_slow_queries(monkeypatch, caplog):
+    engine = _engine()
+    query_stats.reset()
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0.0)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT count(*) FROM t"))
+    assert query_stats.totals()["slow"] == 1
+    assert "slow query" in caplog.text
+
+
+def test_sql_stats_endpoint():
+    engine = _engine()
+    query_stats.reset()
+    with engine.begin() as conn:
+        conn.execute(text("SELECT count(*) FROM t"))
+    client = TestClient(app)
+
+    response = client.get("/api/v1/monitoring/sql", params={"top": 5, "sort": "count"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["totals"]["executions"] == 1
+    assert body["statements"][0]["statement"] == "SELECT count(*) FROM t"
+
+    assert client.get("/api/v1/monitoring/sql", params={"sort": "bogus"}).status_code == 422
+    assert client.delete("/api/v1/monitoring/sql").status_code == 204
+    assert query_stats.totals()["executions"] == 0